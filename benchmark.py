@@ -0,0 +1,251 @@
+"""
+End-to-end throughput and latency benchmark for the tournament pipeline.
+
+Runs full round-robin tournaments through stage_one.run_all_debates against the
+local mock OpenRouter server, for every combination of model count and
+concurrency level, and writes the measurements as JSON:
+
+    python benchmark.py --models 3 5 --concurrency 1 4 16 --output bench_results.json
+
+Each case runs in a fresh process so peak RSS and CPU time are not shared
+between cases.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+import json
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+import platform
+import random
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from mock_openrouter import MockOpenRouterServer, MockSettings, find_root_tag, get_synthetic_models, is_judge_request
+
+logger = logging.getLogger(__name__)
+
+ROUND_NAMES = {"speech": "opening", "rebuttal": "rebuttal", "finalSpeech": "closing"}
+
+
+@dataclass
+class BenchmarkCase:
+    model_count: int
+    concurrency: int
+    judge_count: int
+    base_url: str
+    seed: int
+    stream: bool = False
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"count": 0, "p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def at(q: float) -> float:
+        position = q * (len(ordered) - 1)
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+    return {
+        "count": len(ordered),
+        "p50": round(at(0.5), 4),
+        "p90": round(at(0.9), 4),
+        "p99": round(at(0.99), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def run_case(case: BenchmarkCase) -> dict:
+    """Runs one tournament in this (fresh) process and returns its measurements."""
+    os.environ["OPENROUTER_BASE_URL"] = case.base_url
+    os.environ.setdefault("OPENROUTER_API_KEY", "mock")
+    logging.basicConfig(level=logging.WARNING)
+    random.seed(case.seed)
+
+    from debate_journal import JournalWriter
+    from debate_prompts import get_debate_prompt
+    from load_topics import get_all_topics
+    from models import DebateTotal
+    from openrouter_client import CallRecord, add_call_listener
+    import stage_one
+
+    lock = threading.Lock()
+    round_latencies: Dict[str, List[float]] = {}
+    judge_latencies: Dict[str, List[float]] = {}
+    first_token_latencies: Dict[str, List[float]] = {}
+    status_counts: Dict[str, int] = {}
+    save_cpu_seconds = 0.0
+
+    def on_call(record: CallRecord) -> None:
+        messages = record.payload.get("messages", [])
+        with lock:
+            status = str(record.status_code) if record.status_code is not None else "error"
+            status_counts[status] = status_counts.get(status, 0) + 1
+            if record.status_code != 200:
+                return
+            if is_judge_request(messages):
+                judge_latencies.setdefault(record.model, []).append(record.latency)
+            else:
+                round_name = ROUND_NAMES[find_root_tag(messages)]
+                round_latencies.setdefault(round_name, []).append(record.latency)
+                if record.time_to_first_token is not None:
+                    first_token_latencies.setdefault(round_name, []).append(record.time_to_first_token)
+
+    add_call_listener(on_call)
+
+    # Persistence runs on debate threads (serialising events) and on the journal
+    # writer thread (disk writes); thread CPU time counts each call exactly once
+    def time_thread_cpu(owner: type, name: str) -> None:
+        original = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            nonlocal save_cpu_seconds
+            start = time.thread_time()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = time.thread_time() - start
+                with lock:
+                    save_cpu_seconds += elapsed
+
+        setattr(owner, name, timed)
+
+    for name in ("append", "reset", "compact", "_process"):
+        time_thread_cpu(JournalWriter, name)
+    time_thread_cpu(DebateTotal, "to_dict")
+
+    models = get_synthetic_models(case.model_count)
+    judges = get_synthetic_models(case.judge_count, prefix="mock/judge")
+    pairs = stage_one.get_debate_pairs(models, get_all_topics())
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        results = stage_one.run_all_debates(
+            debate_pairs=pairs,
+            debate_prompt=get_debate_prompt(),
+            base_path=Path(output_dir),
+            judge_models=judges,
+            max_concurrent_debates=case.concurrency,
+            max_concurrent_calls=max(16, case.concurrency * 4),
+            max_calls_per_model=max(4, case.concurrency * 2),
+            stream=case.stream,
+        )
+        wall_seconds = time.perf_counter() - wall_start
+        cpu_seconds = time.process_time() - cpu_start
+
+        load_start = time.process_time()
+        for path in Path(output_dir).glob("*.json"):
+            DebateTotal.load_from_json(path)
+        load_cpu_seconds = time.process_time() - load_start
+
+    failed_calls = sum(
+        usage.failed_calls
+        for debate in results
+        for counts in (debate.debator_token_counts, debate.judge_token_counts)
+        for usage in counts.model_usages.values()
+    )
+
+    return {
+        "model_count": case.model_count,
+        "concurrency": case.concurrency,
+        "judge_count": case.judge_count,
+        "stream": case.stream,
+        "debates_planned": len(pairs),
+        "debates_completed": len(results),
+        "wall_seconds": round(wall_seconds, 3),
+        "debates_per_hour": round(len(results) / wall_seconds * 3600, 1) if wall_seconds else None,
+        "process_cpu_seconds": round(cpu_seconds, 3),
+        "json_save_cpu_seconds": round(save_cpu_seconds, 4),
+        "json_load_cpu_seconds": round(load_cpu_seconds, 4),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "http_status_counts": status_counts,
+        "retries": sum(count for status, count in status_counts.items() if status != "200") + failed_calls,
+        "failed_calls": failed_calls,
+        "round_latency_seconds": {name: percentiles(values) for name, values in round_latencies.items()},
+        "judge_latency_seconds": {name: percentiles(values) for name, values in judge_latencies.items()},
+        "time_to_first_token_seconds": {name: percentiles(values) for name, values in first_token_latencies.items()},
+    }
+
+
+def get_git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark tournament throughput against the mock backend")
+    parser.add_argument("--models", type=int, nargs="+", default=[3, 5])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--judges", type=int, default=3)
+    parser.add_argument("--latency-median", type=float, default=2.0)
+    parser.add_argument("--latency-scale", type=float, default=0.05)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-empty-choices", type=float, default=0.0)
+    parser.add_argument("--rate-off-format", type=float, default=0.0)
+    parser.add_argument("--stream", action="store_true", help="Stream speeches and abort malformed ones early")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    settings = MockSettings(
+        latency_median=args.latency_median,
+        latency_scale=args.latency_scale,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        rate_empty_choices=args.rate_empty_choices,
+        rate_off_format=args.rate_off_format,
+        seed=args.seed,
+    )
+
+    results = []
+    for model_count in args.models:
+        for concurrency in args.concurrency:
+            with MockOpenRouterServer(settings) as server:
+                case = BenchmarkCase(
+                    model_count=model_count,
+                    concurrency=concurrency,
+                    judge_count=args.judges,
+                    base_url=server.base_url,
+                    seed=args.seed,
+                    stream=args.stream,
+                )
+                logger.info(f"Running case {model_count} models at concurrency {concurrency}")
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                    result = pool.submit(run_case, case).result()
+                result["mock_requests"] = server.backend.requests
+            logger.info(
+                f"{model_count} models, concurrency {concurrency}: "
+                f"{result['debates_per_hour']} debates/hour, peak RSS {result['peak_rss_mb']} MB"
+            )
+            results.append(result)
+
+    report = {
+        "benchmark": "tournament_throughput",
+        "git_revision": get_git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "mock_settings": asdict(settings),
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    logger.info(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
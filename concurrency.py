@@ -0,0 +1,118 @@
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+import logging
+import threading
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CallLimiter:
+    """
+    Caps the number of in-flight OpenRouter calls, both across the whole process
+    and per model. Shared by every debate running in a tournament.
+
+    The semaphores are shared by threaded and asyncio callers. Coroutines never
+    block on them: they register a future and are woken through their event loop
+    whenever any caller releases a slot.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_calls: int = 16,
+        max_calls_per_model: int = 4,
+        per_model_limits: Optional[Dict[str, int]] = None,
+    ):
+        self.max_concurrent_calls = max_concurrent_calls
+        self.max_calls_per_model = max_calls_per_model
+        self.per_model_limits = per_model_limits or {}
+        self._global = threading.BoundedSemaphore(max_concurrent_calls)
+        self._models: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._async_waiters: Dict[asyncio.Future, asyncio.AbstractEventLoop] = {}
+
+    def _model_semaphore(self, model: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if model not in self._models:
+                limit = self.per_model_limits.get(model, self.max_calls_per_model)
+                self._models[model] = threading.BoundedSemaphore(limit)
+            return self._models[model]
+
+    def _notify_waiters(self) -> None:
+        """Wakes every waiting coroutine so it retries its acquire. Call without self._lock held."""
+        with self._lock:
+            waiters, self._async_waiters = self._async_waiters, {}
+        for future, loop in waiters.items():
+            loop.call_soon_threadsafe(_wake, future)
+
+    def _release(self, semaphore: threading.BoundedSemaphore) -> None:
+        semaphore.release()
+        self._notify_waiters()
+
+    async def _acquire_async(self, try_acquire: Callable[[], Optional[float]]) -> None:
+        """
+        Calls try_acquire until it returns 0. It otherwise returns how long to wait
+        before retrying at the latest, or None to wait for the next release.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            # Register before trying, so a release in between still wakes us
+            future = loop.create_future()
+            with self._lock:
+                self._async_waiters[future] = loop
+            try:
+                wait = try_acquire()
+                if wait == 0:
+                    return
+                if wait is None:
+                    await future
+                else:
+                    await asyncio.wait([future], timeout=wait)
+            finally:
+                with self._lock:
+                    self._async_waiters.pop(future, None)
+
+    @contextmanager
+    def slot(self, model: str) -> Iterator[None]:
+        # Take the model slot first so a saturated model never holds a global slot
+        # that other models could be using
+        model_semaphore = self._model_semaphore(model)
+        model_semaphore.acquire()
+        try:
+            self._global.acquire()
+            try:
+                yield
+            finally:
+                self._release(self._global)
+        finally:
+            self._release(model_semaphore)
+
+    @asynccontextmanager
+    async def aslot(self, model: str) -> AsyncIterator[None]:
+        model_semaphore = self._model_semaphore(model)
+        await self._acquire_async(lambda: 0.0 if model_semaphore.acquire(blocking=False) else None)
+        try:
+            await self._acquire_async(lambda: 0.0 if self._global.acquire(blocking=False) else None)
+            try:
+                yield
+            finally:
+                self._release(self._global)
+        finally:
+            self._release(model_semaphore)
+
+    def record_response(
+        self,
+        model: str,
+        status_code: Optional[int],
+        latency: float,
+        estimated_tokens: float = 0,
+        used_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Feedback hook for limiters that adapt to responses. Fixed caps ignore it."""
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -7,3 +7,7 @@ class Config:
     topics_data_path: Path = Path("topics.json")
     api_pricing_path: Path = Path("api_pricing.json")
     judge_pricing_path: Path = Path("judge_models.json")
+    openrouter_base_url: str = "https://openrouter.ai/api/v1"
+    connect_timeout: float = 10.0
+    read_timeout: float = 300.0
+    connection_pool_size: int = 32
@@ -0,0 +1,105 @@
+"""
+Streaming, projection-only access to a folder of DebateTotal files.
+
+Each file is decoded and immediately cut down to the requested fields, so memory
+stays flat however large the corpus is and no pydantic models are built. With
+processes set, files are decoded in a worker pool and only the projections
+travel back to the caller.
+"""
+from functools import partial
+import json
+import logging
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence, Union
+
+from models import DebateOutcome, JudgeVerdict
+
+logger = logging.getLogger(__name__)
+
+OUTCOME_FIELDS = (
+    "motion.topic_description",
+    "proposition_model",
+    "opposition_model",
+    "judge_results.model",
+    "judge_results.winner",
+    "judge_results.confidence",
+    "skipped_judges",
+)
+
+
+def get_field(data: Any, field: str) -> Any:
+    """Follows a dotted field path; stepping into a list maps over its items."""
+    value = data
+    for part in field.split("."):
+        if isinstance(value, list):
+            value = [item.get(part) if isinstance(item, dict) else None for item in value]
+        elif isinstance(value, dict):
+            value = value.get(part)
+        else:
+            return None
+    return value
+
+
+def read_projection(path: Union[str, Path], fields: Sequence[str]) -> Optional[dict]:
+    """Returns {field: value} for one file plus its "path", or None if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            data = json.loads(f.read())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Skipping {path}: {e}")
+        return None
+    projection = {field: get_field(data, field) for field in fields}
+    projection["path"] = str(path)
+    return projection
+
+
+def iter_projections(
+    folder: Union[str, Path],
+    fields: Sequence[str],
+    pattern: str = "*.json",
+    processes: Optional[int] = None,
+    chunksize: int = 32,
+) -> Iterator[dict]:
+    """Yields the projection of every file in the folder, in path order."""
+    paths = sorted(Path(folder).glob(pattern))
+    reader = partial(read_projection, fields=tuple(fields))
+
+    if not processes or processes <= 1:
+        for path in paths:
+            projection = reader(path)
+            if projection is not None:
+                yield projection
+        return
+
+    with Pool(processes) as pool:
+        for projection in pool.imap(reader, paths, chunksize=chunksize):
+            if projection is not None:
+                yield projection
+
+
+def iter_outcomes(
+    folder: Union[str, Path],
+    pattern: str = "*.json",
+    processes: Optional[int] = None,
+) -> Iterator[DebateOutcome]:
+    """Judged debates as DebateOutcome records, in path order."""
+    for projection in iter_projections(folder, OUTCOME_FIELDS, pattern=pattern, processes=processes):
+        judge_models = projection["judge_results.model"] or []
+        if not judge_models:
+            continue
+        yield DebateOutcome(
+            path=projection["path"],
+            topic_description=projection["motion.topic_description"],
+            proposition_model=projection["proposition_model"],
+            opposition_model=projection["opposition_model"],
+            judge_results=[
+                JudgeVerdict(model=model, winner=winner, confidence=confidence)
+                for model, winner, confidence in zip(
+                    judge_models,
+                    projection["judge_results.winner"],
+                    projection["judge_results.confidence"],
+                )
+            ],
+            skipped_judges=len(projection["skipped_judges"] or []),
+        )
@@ -0,0 +1,202 @@
+"""
+Live dollar accounting for OpenRouter calls.
+
+Prices come from api_pricing.json and judge_models.json, which map each model to
+[input, output] dollars per million tokens. The OpenRouterClient reserves the
+estimated cost of every call before making it and reports the real usage after
+it, so spending is known as calls complete. The hard limit refuses calls that
+could take spending past it; the soft limit tells the tournament to stop
+starting new debates.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from models import DebateTotal, ModelTokenUsage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRICING_FILES = ("api_pricing.json", "judge_models.json")
+
+# Used to project debates before any call to a model has completed
+DEFAULT_PROMPT_TOKENS_PER_CALL = 4000
+DEFAULT_COMPLETION_TOKENS_PER_CALL = 1500
+SPEECHES_PER_SIDE = 3
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised instead of making a call that could take spending past the hard limit."""
+
+
+class ModelPrice(NamedTuple):
+    input: float
+    output: float
+
+
+def load_prices(paths: Iterable[Union[str, Path]] = DEFAULT_PRICING_FILES) -> Dict[str, ModelPrice]:
+    """Merges pricing files of {model: [input, output]} in dollars per million tokens."""
+    prices: Dict[str, ModelPrice] = {}
+    for path in paths:
+        with open(path, "r") as f:
+            for model, (input_price, output_price) in json.load(f).items():
+                prices[model] = ModelPrice(float(input_price), float(output_price))
+    return prices
+
+
+class CostEngine:
+    """
+    Tracks spend per model and enforces soft and hard budget limits in dollars.
+
+    Models without a price are charged at the most expensive known price, so a
+    missing entry can never let a call slip under the hard limit.
+
+    When several processes share one budget, set_spend_sharing installs a callback
+    that publishes this process's spent and reserved dollars and returns the
+    others'. It runs before every reservation, so the limits apply to the total.
+    """
+
+    def __init__(
+        self,
+        prices: Dict[str, ModelPrice],
+        soft_limit: Optional[float] = None,
+        hard_limit: Optional[float] = None,
+    ):
+        self.prices = prices
+        self.soft_limit = soft_limit
+        self.hard_limit = hard_limit
+        self.fallback_price = ModelPrice(
+            max((price.input for price in prices.values()), default=0.0),
+            max((price.output for price in prices.values()), default=0.0),
+        )
+        self.spent_by_model: Dict[str, float] = {}
+        self.calls_by_model: Dict[str, int] = {}
+        self.reserved = 0.0
+        # Spent or reserved by other processes sharing the limits
+        self.external_spent = 0.0
+        self.share_spend: Optional[Callable[[float, float], float]] = None
+        self.refused_calls = 0
+        self._warned_models: set = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, pricing_files: Iterable[Union[str, Path]] = DEFAULT_PRICING_FILES) -> "CostEngine":
+        """Limits come from DEBATEBET_SOFT_BUDGET and DEBATEBET_HARD_BUDGET, in dollars."""
+        soft_limit = os.environ.get("DEBATEBET_SOFT_BUDGET")
+        hard_limit = os.environ.get("DEBATEBET_HARD_BUDGET")
+        return cls(
+            load_prices(pricing_files),
+            soft_limit=float(soft_limit) if soft_limit else None,
+            hard_limit=float(hard_limit) if hard_limit else None,
+        )
+
+    @property
+    def spent(self) -> float:
+        with self._lock:
+            return sum(self.spent_by_model.values())
+
+    def get_price(self, model: str) -> ModelPrice:
+        price = self.prices.get(model)
+        if price is None:
+            if model not in self._warned_models:
+                self._warned_models.add(model)
+                logger.warning(f"No price for {model}, charging it at {self.fallback_price}")
+            return self.fallback_price
+        return price
+
+    def get_call_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        price = self.get_price(model)
+        return (prompt_tokens * price.input + completion_tokens * price.output) / 1_000_000
+
+    def get_usage_cost(self, model: str, usage: ModelTokenUsage) -> float:
+        """Dollars paid for a ModelTokenUsage; cache hits are free."""
+        return self.get_call_cost(model, usage.total_prompt_tokens, usage.total_completion_tokens)
+
+    def get_debate_cost(self, debate: DebateTotal) -> float:
+        return sum(
+            self.get_usage_cost(model, usage)
+            for counts in (debate.debator_token_counts, debate.judge_token_counts)
+            for model, usage in counts.model_usages.items()
+        )
+
+    def reserve(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """
+        Sets aside the estimated cost of a call and returns it, or raises
+        BudgetExceededError if that could take spending past the hard limit.
+        """
+        estimate = self.get_call_cost(model, prompt_tokens, completion_tokens)
+        if self.share_spend is not None and self.hard_limit is not None:
+            with self._lock:
+                spent, reserved = sum(self.spent_by_model.values()), self.reserved
+            self.set_external_spent(self.share_spend(spent, reserved + estimate))
+        with self._lock:
+            if self.hard_limit is not None:
+                committed = sum(self.spent_by_model.values()) + self.reserved + self.external_spent
+                if committed + estimate > self.hard_limit:
+                    self.refused_calls += 1
+                    raise BudgetExceededError(
+                        f"Call to {model} could cost ${estimate:.4f}, which would take "
+                        f"${committed:.4f} past the ${self.hard_limit:.2f} hard limit"
+                    )
+            self.reserved += estimate
+        return estimate
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int, reservation: float = 0.0) -> float:
+        """Charges a finished call, releases its reservation and returns its cost."""
+        cost = self.get_call_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            self.reserved = max(0.0, self.reserved - reservation)
+            self.spent_by_model[model] = self.spent_by_model.get(model, 0.0) + cost
+            if prompt_tokens or completion_tokens:
+                self.calls_by_model[model] = self.calls_by_model.get(model, 0) + 1
+        return cost
+
+    def set_spend_sharing(self, share_spend: Optional[Callable[[float, float], float]]) -> None:
+        self.share_spend = share_spend
+
+    def set_external_spent(self, amount: float) -> None:
+        with self._lock:
+            self.external_spent = amount
+
+    def is_soft_limit_reached(self) -> bool:
+        return self.soft_limit is not None and self.spent + self.external_spent >= self.soft_limit
+
+    def is_hard_limit_reached(self) -> bool:
+        return self.hard_limit is not None and self.spent + self.external_spent >= self.hard_limit
+
+    def get_cost_per_call(self, model: str) -> float:
+        """Average observed cost of one call to the model, or a default-size call if none finished yet."""
+        with self._lock:
+            calls = self.calls_by_model.get(model, 0)
+            if calls:
+                return self.spent_by_model[model] / calls
+        return self.get_call_cost(model, DEFAULT_PROMPT_TOKENS_PER_CALL, DEFAULT_COMPLETION_TOKENS_PER_CALL)
+
+    def estimate_debate_cost(
+        self,
+        proposition_model: str,
+        opposition_model: str,
+        judge_models: List[str],
+        proposition_speeches: int = SPEECHES_PER_SIDE,
+        opposition_speeches: int = SPEECHES_PER_SIDE,
+    ) -> float:
+        """Projected cost of the speeches and judges a debate still needs."""
+        return (
+            proposition_speeches * self.get_cost_per_call(proposition_model)
+            + opposition_speeches * self.get_cost_per_call(opposition_model)
+            + sum(self.get_cost_per_call(model) for model in judge_models)
+        )
+
+    def get_summary(self) -> dict:
+        with self._lock:
+            return {
+                "spent": round(sum(self.spent_by_model.values()), 6),
+                "reserved": round(self.reserved, 6),
+                "external_spent": round(self.external_spent, 6),
+                "soft_limit": self.soft_limit,
+                "hard_limit": self.hard_limit,
+                "refused_calls": self.refused_calls,
+                "spent_by_model": {model: round(cost, 6) for model, cost in sorted(self.spent_by_model.items())},
+            }
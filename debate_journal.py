@@ -0,0 +1,261 @@
+from concurrent.futures import Future
+import json
+import logging
+from pathlib import Path
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from models import (
+    DebateTotal,
+    JudgeResult,
+    ModelTokenUsage,
+    Side,
+    SpeechType,
+    TokenCount,
+    write_json_atomically,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLostError(RuntimeError):
+    """Another process took over the debate, so this one must stop writing it."""
+
+
+def get_journal_path(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ".journal")
+
+
+class JournalWriter:
+    """
+    Single background thread that does every journal append and compaction.
+
+    Callers only enqueue work. Whatever has piled up while the thread was busy is
+    written in one go, one open and flush per journal, so a burst of events from
+    concurrent debates costs a handful of writes.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Tuple[str, Path, object, Optional[Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, journal_path: Path, event: dict) -> None:
+        self._queue.put(("append", journal_path, json.dumps(event), None))
+
+    def reset(self, journal_path: Path, event: dict) -> None:
+        """Replaces the journal with a single event."""
+        self._queue.put(("reset", journal_path, json.dumps(event), None))
+
+    def compact(self, journal_path: Path, document_path: Path, data: dict) -> Future:
+        done: Future = Future()
+        self._queue.put(("compact", journal_path, (document_path, data), done))
+        return done
+
+    def flush(self) -> None:
+        done: Future = Future()
+        self._queue.put(("flush", Path(), None, done))
+        done.result()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch: List[Tuple[str, Path, object, Optional[Future]]]) -> None:
+        pending: Dict[Path, List[str]] = {}
+        truncate: Set[Path] = set()
+
+        def write_pending(journal_path: Path) -> None:
+            lines = pending.pop(journal_path, [])
+            mode = "w" if journal_path in truncate else "a"
+            truncate.discard(journal_path)
+            if not lines:
+                return
+            try:
+                with open(journal_path, mode) as f:
+                    f.write("\n".join(lines) + "\n")
+            except OSError as e:
+                logger.error(f"Failed to append to {journal_path}: {e}")
+
+        for kind, journal_path, payload, done in batch:
+            if kind == "append":
+                pending.setdefault(journal_path, []).append(payload)  # type: ignore[arg-type]
+            elif kind == "reset":
+                pending[journal_path] = [payload]  # type: ignore[list-item]
+                truncate.add(journal_path)
+            elif kind == "compact":
+                # The compacted document supersedes anything still queued for this journal
+                pending.pop(journal_path, None)
+                truncate.discard(journal_path)
+                document_path, data = payload  # type: ignore[misc]
+                try:
+                    write_json_atomically(document_path, data)
+                    journal_path.unlink(missing_ok=True)
+                    logger.info(f"Saved to {document_path}")
+                    done.set_result(None)  # type: ignore[union-attr]
+                except Exception as e:
+                    logger.error(f"Failed to compact {journal_path}: {e}")
+                    done.set_exception(e)  # type: ignore[union-attr]
+            else:
+                for path in list(pending):
+                    write_pending(path)
+                done.set_result(None)  # type: ignore[union-attr]
+
+        for path in list(pending):
+            write_pending(path)
+
+
+_default_writer: Optional[JournalWriter] = None
+_default_writer_lock = threading.Lock()
+
+
+def get_journal_writer() -> JournalWriter:
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = JournalWriter()
+        return _default_writer
+
+
+class DebateJournal:
+    """
+    Write-behind checkpoint log for one debate.
+
+    Instead of rewriting the whole DebateTotal after every speech and judge, each
+    change is appended as one JSON line to <path>.journal by the background writer.
+    compact() folds the debate into the usual JSON document with a temp-file
+    rename and deletes the journal. After a crash, load_journaled_debate replays
+    the journal on top of whatever document exists.
+
+    With is_owner, every write first checks that this process still owns the
+    debate (e.g. still holds its work queue lease). Once it does not, writes raise
+    LeaseLostError and compact() leaves the files to the new owner.
+    """
+
+    def __init__(
+        self,
+        debate: DebateTotal,
+        writer: Optional[JournalWriter] = None,
+        is_owner: Optional[Callable[[], bool]] = None,
+    ):
+        self.debate = debate
+        self.path = Path(debate.path_to_store)
+        self.journal_path = get_journal_path(self.path)
+        self.writer = writer or get_journal_writer()
+        self.is_owner = is_owner
+        self.abandoned = False
+
+    def check_owner(self) -> None:
+        if not self.abandoned and self.is_owner is not None and not self.is_owner():
+            self.abandoned = True
+        if self.abandoned:
+            raise LeaseLostError(f"{self.path} is no longer owned by this process, stopped writing it")
+
+    def start(self) -> None:
+        """
+        Begins journaling from a snapshot of the debate as it stands. Replacing the
+        journal also clears a stale one, or one with a torn last line left by a
+        crash, once a resumed debate has been replayed from it.
+        """
+        self.check_owner()
+        self.writer.reset(self.journal_path, {"event": "created", "debate": self.debate.to_dict()})
+
+    def speech_added(self, side: Side, speech_type: SpeechType, speech: str) -> None:
+        self.check_owner()
+        self.writer.append(self.journal_path, {
+            "event": "speech_added",
+            "side": side.value,
+            "speech_type": speech_type.value,
+            "speech": speech,
+        })
+
+    def judge_result_added(self, result: JudgeResult) -> None:
+        self.check_owner()
+        self.writer.append(self.journal_path, {"event": "judge_result_added", "result": result.model_dump()})
+
+    def judges_skipped(self, models: List[str]) -> None:
+        self.check_owner()
+        self.writer.append(self.journal_path, {"event": "skipped_judges", "models": models})
+
+    def usage_updated(self) -> None:
+        self.check_owner()
+        self.writer.append(self.journal_path, {
+            "event": "usage_updated",
+            "debator_token_counts": {
+                model: usage.model_dump() for model, usage in self.debate.debator_token_counts.model_usages.items()
+            },
+            "judge_token_counts": {
+                model: usage.model_dump() for model, usage in self.debate.judge_token_counts.model_usages.items()
+            },
+        })
+
+    def compact(self, wait: bool = True) -> None:
+        try:
+            self.check_owner()
+        except LeaseLostError as e:
+            logger.warning(f"Not compacting: {e}")
+            return
+        done = self.writer.compact(self.journal_path, self.path, self.debate.to_dict())
+        if wait:
+            done.result()
+
+
+def load_journaled_debate(path: Union[str, Path]) -> DebateTotal:
+    """
+    Loads a debate, replaying its journal if a crash left one behind. A torn last
+    line in the journal is ignored.
+    """
+    path = Path(path)
+    journal_path = get_journal_path(path)
+    if not journal_path.exists():
+        return DebateTotal.load_from_json(path)
+
+    debate = DebateTotal.load_from_json(path) if path.exists() else None
+    with open(journal_path) as f:
+        lines = f.read().splitlines()
+
+    for line_number, line in enumerate(lines):
+        try:
+            event = json.loads(line)
+        except ValueError:
+            if line_number == len(lines) - 1:
+                logger.warning(f"Ignoring torn last line of {journal_path}")
+                break
+            raise
+
+        kind = event["event"]
+        if kind == "created":
+            debate = DebateTotal.from_dict(event["debate"])
+            continue
+        if debate is None:
+            raise ValueError(f"{journal_path} has events before the debate was created")
+
+        if kind == "speech_added":
+            side = Side(event["side"])
+            target = debate.proposition_output if side == Side.PROPOSITION else debate.opposition_output
+            target.speeches[SpeechType(event["speech_type"])] = event["speech"]
+        elif kind == "judge_result_added":
+            debate.judge_results.append(JudgeResult(**event["result"]))
+        elif kind == "skipped_judges":
+            debate.skipped_judges.extend(model for model in event["models"] if model not in debate.skipped_judges)
+        elif kind == "usage_updated":
+            for field_name in ("debator_token_counts", "judge_token_counts"):
+                counts = TokenCount()
+                for model, usage in event[field_name].items():
+                    counts.model_usages[model] = ModelTokenUsage(**usage)
+                setattr(debate, field_name, counts)
+        else:
+            raise ValueError(f"Unknown journal event {kind} in {journal_path}")
+
+    if debate is None:
+        raise ValueError(f"{journal_path} is empty")
+    debate.path_to_store = path
+    return debate
@@ -1,22 +1,79 @@
-import glob
-import os
-from typing import Dict, List
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
 
-from models import DebateTotal
+import corpus_loader
+from models import DebateOutcome
+from results_index import DEFAULT_INDEX_PATH, ResultsIndex
 
-def compute_elo_ratings(debates: List[DebateTotal], k_factor: int = 32) -> Dict[str, float]:
+def expected_score(rating_a, rating_b):
+    """Expected score of A against B; works on floats and NumPy arrays alike."""
+    return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
+
+
+def get_debate_result(debate: DebateOutcome) -> Optional[Tuple[bool, float]]:
+    """
+    Aggregates the judge panel of one debate.
+
+    Returns:
+        Optional[Tuple[bool, float]]: (proposition_won, average_confidence), or None if the panel is tied.
+    """
+    if not debate.judge_results:
+        raise ValueError(f"No judge results found for debate: {debate.topic_description}")
+
+    # Aggregate judge results to determine the winner and average confidence
+    winner_counts = {"proposition": 0, "opposition": 0}
+    total_confidence = 0
+
+    for result in debate.judge_results:
+        winner_counts[result.winner] += 1
+        total_confidence += result.confidence
+
+    # If it's a tie, there is no result to rate
+    if winner_counts["proposition"] == winner_counts["opposition"]:
+        return None
+
+    # Calculate average confidence for this debate
+    average_confidence = total_confidence / len(debate.judge_results)
+    return winner_counts["proposition"] > winner_counts["opposition"], average_confidence
+
+
+def get_rating_changes(proposition_rating, opposition_rating, proposition_won, average_confidence, k_factor):
     """
-    Computes Elo ratings for models based on a list of DebateTotal objects, scaling Elo changes by judge confidence.
+    Elo changes for both sides of one debate, with the K-factor scaled by judge confidence.
+    Works on floats and on NumPy arrays of debates alike.
+    """
+    expected_proposition = expected_score(proposition_rating, opposition_rating)
+    expected_opposition = expected_score(opposition_rating, proposition_rating)
+
+    # Scale the K-factor by confidence (normalized to 0-1)
+    confidence_scale = average_confidence / 100  # Confidence is 0-100, so divide by 100
+    scaled_k_factor = k_factor * confidence_scale
+
+    proposition_score = 1 * proposition_won
+    opposition_score = 1 - proposition_score
+    return (
+        scaled_k_factor * (proposition_score - expected_proposition),
+        scaled_k_factor * (opposition_score - expected_opposition),
+    )
+
+
+def compute_elo_ratings(
+    debates: Iterable[DebateOutcome], k_factor: int = 32, ratings: Optional[Dict[str, float]] = None
+) -> Dict[str, float]:
+    """
+    Computes Elo ratings for models based on debate outcomes, scaling Elo changes by judge confidence.
 
     Args:
-        debates (List[DebateTotal]): List of DebateTotal objects containing debate results.
+        debates (Iterable[DebateOutcome]): Debate outcomes, e.g. from ResultsIndex.iter_outcomes or DebateOutcome.from_debate.
         k_factor (int): The base K-factor for Elo rating updates (default is 32).
+        ratings (Optional[Dict[str, float]]): Ratings to continue from, e.g. a saved snapshot.
 
     Returns:
         Dict[str, float]: A dictionary mapping model names to their Elo ratings.
     """
     # Initialize Elo ratings for all models
-    elo_ratings: Dict[str, float] = {}
+    elo_ratings: Dict[str, float] = dict(ratings or {})
 
     for debate in debates:
         # Get the models and their sides
@@ -29,68 +86,40 @@ def compute_elo_ratings(debates: List[DebateTotal], k_factor: int = 32) -> Dict[
         if opposition_model not in elo_ratings:
             elo_ratings[opposition_model] = 1200  # Default starting rating
 
-        # Get the current ratings
-        proposition_rating = elo_ratings[proposition_model]
-        opposition_rating = elo_ratings[opposition_model]
-
         # Determine the winner based on judge results
-        if not debate.judge_results:
-            raise ValueError(f"No judge results found for debate: {debate.motion.topic_description}")
-
-        # Aggregate judge results to determine the winner and average confidence
-        winner_counts = {"proposition": 0, "opposition": 0}
-        total_confidence = 0
-
-        for result in debate.judge_results:
-            winner_counts[result.winner] += 1
-            total_confidence += result.confidence
-
-        # Determine the overall winner
-        if winner_counts["proposition"] > winner_counts["opposition"]:
-            winner = "proposition"
-            loser = "opposition"
-        elif winner_counts["opposition"] > winner_counts["proposition"]:
-            winner = "opposition"
-            loser = "proposition"
-        else:
+        result = get_debate_result(debate)
+        if result is None:
             # If it's a tie, skip updating ratings
             continue
+        proposition_won, average_confidence = result
 
-        # Calculate average confidence for this debate
-        average_confidence = total_confidence / len(debate.judge_results)
-
-        # Calculate expected scores
-        def expected_score(rating_a: float, rating_b: float) -> float:
-            return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
-
-        expected_proposition = expected_score(proposition_rating, opposition_rating)
-        expected_opposition = expected_score(opposition_rating, proposition_rating)
-
-        # Scale the K-factor by confidence (normalized to 0-1)
-        confidence_scale = average_confidence / 100  # Confidence is 0-100, so divide by 100
-        scaled_k_factor = k_factor * confidence_scale
-
-        # Update ratings based on the winner and scaled K-factor
-        if winner == "proposition":
-            proposition_rating += scaled_k_factor * (1 - expected_proposition)
-            opposition_rating += scaled_k_factor * (0 - expected_opposition)
-        else:
-            proposition_rating += scaled_k_factor * (0 - expected_proposition)
-            opposition_rating += scaled_k_factor * (1 - expected_opposition)
+        proposition_change, opposition_change = get_rating_changes(
+            elo_ratings[proposition_model], elo_ratings[opposition_model], proposition_won, average_confidence, k_factor
+        )
 
         # Update the Elo ratings dictionary
-        elo_ratings[proposition_model] = proposition_rating
-        elo_ratings[opposition_model] = opposition_rating
+        elo_ratings[proposition_model] += proposition_change
+        elo_ratings[opposition_model] += opposition_change
 
     return elo_ratings
 
 
-folder_to_search = "debate_test_judges"
-json_files = glob.glob(os.path.join(folder_to_search, "*.json"))
+def main():
+    parser = argparse.ArgumentParser(description="Compute Elo ratings from judged debates")
+    parser.add_argument("folder", nargs="?", type=Path, default=Path("debate_test_judges"))
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX_PATH)
+    parser.add_argument("--stream", action="store_true", help="Stream the JSON files instead of using the index")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes for --stream parsing")
+    args = parser.parse_args()
+
+    if args.stream:
+        outcomes = corpus_loader.iter_outcomes(args.folder, processes=args.processes)
+    else:
+        index = ResultsIndex(args.index)
+        index.sync(args.folder)
+        outcomes = index.iter_outcomes(args.folder)
+    print(compute_elo_ratings(outcomes))
 
-debate_list: List[DebateTotal] = []
-for file in json_files:
-    debate_total = DebateTotal.load_from_json(file)
-    debate_list.append(debate_total)
 
-print(compute_elo_ratings(debate_list))
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
-from typing import List
+import asyncio
+from typing import List, Optional
+from cost_engine import CostEngine
+from matchmaking import get_scheduler, run_scheduled_tournament
 from models import DebatePrompts, DebateTopic, DebateTotal
-from run_debate import run_debate
+from response_cache import ResponseCache
+from telemetry import start_telemetry_from_env
+from tournament import DebateJob, get_debate_path, run_tournament
 from pathlib import Path
 import json
+import os
 from debate_prompts import get_debate_prompt
 from load_topics import get_all_topics
 from dotenv import load_dotenv
@@ -14,8 +20,6 @@ def setup_logging():
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
 
-NUM_DEBATER_MODELS: int = 5
-
 def load_models_pricing(file_path: str) -> dict[str, List[float]]:
     logging.info(f"Loading pricing from {file_path}")
     with open(file_path, 'r') as f:
@@ -30,62 +34,50 @@ def get_judge_models(file_path:str) -> List[str]:
 
     return list(judge_pricing.keys())
 
-def get_debate_combinations(models_pricing: dict[str, float]) -> List[tuple[str, str]]:
-    """Returns list of (proposition_model, opposition_model) pairs for debates"""
-    models_list = list(models_pricing.keys())
-    # Ensuring we have exactly 5 models
-    assert len(models_list) == 5, f"Expected 5 models but got {len(models_list)}"
-
-    # A, B, C, D, E mapping to actual model names
-    A, B, C, D, E = models_list
-
-    # Our balanced 8 debates from earlier
-    debates = [
-        (A, B),  # A prop vs B opp
-        (B, C),  # B prop vs C opp
-        (C, D),  # C prop vs D opp
-        (D, E),  # D prop vs E opp
-        (E, A),  # E prop vs A opp
-        (C, A),  # C prop vs A opp
-        (D, B),  # D prop vs B opp
-        (E, C),  # E prop vs C opp
-    ]
-
-    return debates
-
 def run_all_debates(
     debates: List[tuple[str, str]],
     topic_list: List[DebateTopic],
     debate_prompt: DebatePrompts,
     base_path: Path,
-    judge_models: List[str]
+    judge_models: List[str],
+    max_concurrent_debates: int = 4,
+    max_concurrent_calls: int = 16,
+    max_calls_per_model: int = 4,
+    cache: Optional[ResponseCache] = None,
+    resume: bool = False,
+    budget: Optional[CostEngine] = None,
+    stream: bool = False,
+    structured_judging: bool = False,
+    adaptive_judging: bool = False,
+    stop_confidence: Optional[float] = None,
 ) -> List[DebateTotal]:
-    """Runs all debates with given combinations"""
-    results = []
+    """Runs all debates with given combinations, several at a time"""
+    jobs = []
     for i, (prop_model, opp_model) in enumerate(debates):
         # Use topic_list[i % len(topic_list)] to cycle through topics if needed
         topic = topic_list[i % len(topic_list)]
-        safe_prop_name = prop_model.replace('/', '_')
-        safe_opp_name = opp_model.replace('/', '_')
-        debate_path = base_path / f"{safe_prop_name}_{safe_opp_name}.json"
-        if debate_path.exists():
-            logging.info(f"{debate_path} already exists. SKIPPING")
-            continue
-
-
-
-        logging.info(f"Running debate {i+1}/8: {prop_model} (prop) vs {opp_model} (opp)")
-        result = run_debate(
+        jobs.append(DebateJob(
             proposition_model=prop_model,
             opposition_model=opp_model,
             motion=topic,
-            prompts=debate_prompt,
-            path=debate_path,
-            judge_models=judge_models
-        )
-        results.append(result)
-
-    return results
+            path=get_debate_path(base_path, prop_model, opp_model),
+        ))
+
+    return asyncio.run(run_tournament(
+        jobs=jobs,
+        prompts=debate_prompt,
+        judge_models=judge_models,
+        max_concurrent_debates=max_concurrent_debates,
+        max_concurrent_calls=max_concurrent_calls,
+        max_calls_per_model=max_calls_per_model,
+        cache=cache,
+        resume=resume,
+        budget=budget,
+        stream=stream,
+        structured_judging=structured_judging,
+        adaptive_judging=adaptive_judging,
+        stop_confidence=stop_confidence,
+    ))
 
 
 def main():
@@ -93,15 +85,14 @@ def main():
 
     # Setup logging
     setup_logging()
+    start_telemetry_from_env()
 
     # Get prompts and topic
     logging.info("Loading debate prompts and topic")
     topic_list = get_all_topics()
     debate_prompt = get_debate_prompt()
     models_pricing = load_models_pricing('api_pricing.json')
-    assert len(models_pricing.keys()) == NUM_DEBATER_MODELS, f"Expected {NUM_DEBATER_MODELS} but got {len(models_pricing.keys())}"
 
-    debates = get_debate_combinations(models_pricing=models_pricing)
     output_path = Path("debate_test_judges")
     output_path.mkdir(exist_ok=True)
 
@@ -109,12 +100,21 @@ def main():
 
     judge_models = get_judge_models('judge_models.json')
 
-    results = run_all_debates(
-    debates=debates,
+    # Rounds of rating-aware matchups instead of a fixed schedule, for any number of models
+    results = run_scheduled_tournament(
+    models=list(models_pricing.keys()),
     topic_list=topic_list,
-    debate_prompt=debate_prompt,
+    prompts=debate_prompt,
     base_path=output_path,
-    judge_models=judge_models  # You'll need to define this list
+    judge_models=judge_models,
+    scheduler=get_scheduler(os.environ.get("DEBATEBET_SCHEDULER", "swiss")),
+    cache=ResponseCache.from_env(),
+    resume=True,
+    budget=CostEngine.from_env(),
+    stream=os.environ.get("DEBATEBET_STREAM") == "1",
+    structured_judging=os.environ.get("DEBATEBET_STRUCTURED_JUDGING") == "1",
+    adaptive_judging=os.environ.get("DEBATEBET_ADAPTIVE_JUDGING") == "1",
+    stop_confidence=float(os.environ["DEBATEBET_STOP_CONFIDENCE"]) if os.environ.get("DEBATEBET_STOP_CONFIDENCE") else None,
     )
 
     print(results)
@@ -0,0 +1,312 @@
+"""
+Rating-aware matchup scheduling.
+
+Instead of every pair in both directions (O(n^2) debates), debates are played in
+rounds where each model debates at most once. After every round the
+Bradley-Terry ratings and their uncertainty are refitted from the finished
+debates, and a scheduler picks the next round's matchups from them:
+
+- SwissScheduler pairs models with the nearest rating they have not met yet.
+- InformationGainScheduler pairs the models whose result is least predictable,
+  weighted by how uncertain their ratings still are.
+
+With about log2(n) + 3 rounds of n / 2 debates, a leaderboard settles after
+O(n log n) debates. The run also stops early once the ranking has not changed
+for a few rounds.
+"""
+from abc import ABC, abstractmethod
+import asyncio
+from dataclasses import dataclass
+import logging
+import math
+from pathlib import Path
+import random
+from typing import Dict, List, Optional, Set, Tuple, Type
+
+import numpy as np
+
+from corpus_loader import iter_outcomes
+from models import DebateOutcome, DebatePrompts, DebateTopic, DebateTotal
+from ratings import BASE_RATING, RATING_SCALE, collect_votes, fit_bradley_terry, get_win_matrix
+from telemetry import span
+from debate_journal import get_journal_path
+from tournament import DebateJob, get_debate_path, is_debate_complete, make_tournament_client, run_tournament
+
+logger = logging.getLogger(__name__)
+
+# Rating uncertainty, on the Elo scale, of a model that has not debated yet
+DEFAULT_UNCERTAINTY = 350.0
+
+Matchup = Tuple[str, str]
+
+# run_tournament options that configure its client, which every round shares
+CLIENT_OPTIONS = (
+    "max_concurrent_calls",
+    "max_calls_per_model",
+    "per_model_limits",
+    "requests_per_minute",
+    "tokens_per_minute",
+    "per_model_rates",
+)
+
+
+@dataclass
+class Standings:
+    models: List[str]
+    ratings: np.ndarray
+    # Standard error of each rating on the Elo scale
+    uncertainty: np.ndarray
+    # debates[i, j] counts finished debates between models i and j, either side
+    debates: np.ndarray
+    # (proposition, opposition) pairs that already have a debate file
+    played: Set[Matchup]
+
+    def get_proposition_count(self, model: str) -> int:
+        return sum(proposition == model for proposition, _ in self.played)
+
+    def get_open_sides(self, model_a: str, model_b: str) -> List[Matchup]:
+        """The side orders of this pair that have not been debated yet."""
+        return [pair for pair in ((model_a, model_b), (model_b, model_a)) if pair not in self.played]
+
+    def get_ranking(self) -> List[str]:
+        return [self.models[i] for i in np.argsort(-self.ratings, kind="stable")]
+
+
+def get_win_probability(rating: float, opponent_rating: float) -> float:
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / RATING_SCALE))
+
+
+def get_standings(
+    models: List[str],
+    outcomes: List[DebateOutcome],
+    played: Set[Matchup],
+    prior: float = 0.5,
+) -> Standings:
+    """
+    Fits Bradley-Terry ratings to the outcomes and estimates each rating's
+    standard error from the Fisher information of its debates.
+    """
+    model_ids = {model: i for i, model in enumerate(models)}
+    n = len(models)
+    outcomes = [
+        outcome for outcome in outcomes
+        if outcome.proposition_model in model_ids and outcome.opposition_model in model_ids
+    ]
+
+    wins = np.zeros((n, n))
+    debates = np.zeros((n, n))
+    if outcomes:
+        votes = collect_votes(outcomes)
+        ids = np.array([model_ids[model] for model in votes.models])
+        wins[np.ix_(ids, ids)] = get_win_matrix(votes)
+    for outcome in outcomes:
+        i, j = model_ids[outcome.proposition_model], model_ids[outcome.opposition_model]
+        debates[i, j] += 1
+        debates[j, i] += 1
+
+    ratings = fit_bradley_terry(wins, prior=prior) if outcomes else np.full(n, BASE_RATING)
+    probabilities = 1 / (1 + 10 ** ((ratings[None, :] - ratings[:, None]) / RATING_SCALE))
+    information = (debates * probabilities * (1 - probabilities)).sum(axis=1)
+    uncertainty = np.where(
+        information > 0,
+        RATING_SCALE / math.log(10) / np.sqrt(np.maximum(information, 1e-12)),
+        DEFAULT_UNCERTAINTY,
+    )
+    return Standings(
+        models=list(models),
+        ratings=ratings,
+        uncertainty=np.minimum(uncertainty, DEFAULT_UNCERTAINTY),
+        debates=debates,
+        played=set(played),
+    )
+
+
+def choose_sides(standings: Standings, model_a: str, model_b: str) -> Optional[Matchup]:
+    """An unplayed side order for the pair, proposition going to the model that had it less."""
+    open_sides = standings.get_open_sides(model_a, model_b)
+    if not open_sides:
+        return None
+    return min(open_sides, key=lambda pair: standings.get_proposition_count(pair[0]))
+
+
+class MatchupScheduler(ABC):
+    """Picks the next round of matchups; every model appears at most once per round."""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.random = random.Random(seed)
+
+    @abstractmethod
+    def next_round(self, standings: Standings) -> List[Matchup]:
+        """Matchups for the next round; an empty list means nothing is left to play."""
+
+
+class SwissScheduler(MatchupScheduler):
+    """
+    Swiss pairing: walks down the ranking and pairs each model with the nearest
+    rated model it can still meet. With an odd field the last model sits out.
+    """
+
+    def next_round(self, standings: Standings) -> List[Matchup]:
+        order = list(range(len(standings.models)))
+        # Break rating ties at random so a fresh field is not paired in file order
+        self.random.shuffle(order)
+        order.sort(key=lambda i: -standings.ratings[i])
+
+        unpaired = [standings.models[i] for i in order]
+        rating = dict(zip(standings.models, standings.ratings))
+        matchups = []
+        while unpaired:
+            model = unpaired.pop(0)
+            candidates = sorted(
+                (other for other in unpaired if choose_sides(standings, model, other)),
+                key=lambda other: abs(rating[model] - rating[other]),
+            )
+            if not candidates:
+                continue
+            opponent = candidates[0]
+            unpaired.remove(opponent)
+            matchups.append(choose_sides(standings, model, opponent))
+        return matchups
+
+
+class InformationGainScheduler(MatchupScheduler):
+    """
+    Scores every pair by p (1 - p) (s_a^2 + s_b^2): close predicted results between
+    models with uncertain ratings teach the most. Pairs are taken greedily by score,
+    discounted by how often they already met.
+    """
+
+    def next_round(self, standings: Standings) -> List[Matchup]:
+        scored = []
+        n = len(standings.models)
+        for i in range(n):
+            for j in range(i + 1, n):
+                model_a, model_b = standings.models[i], standings.models[j]
+                if not choose_sides(standings, model_a, model_b):
+                    continue
+                p = get_win_probability(standings.ratings[i], standings.ratings[j])
+                gain = p * (1 - p) * (standings.uncertainty[i] ** 2 + standings.uncertainty[j] ** 2)
+                gain /= 1 + standings.debates[i, j]
+                # A little jitter keeps ties from always favouring the first models
+                scored.append((gain * (1 + 1e-6 * self.random.random()), model_a, model_b))
+
+        matchups = []
+        busy: Set[str] = set()
+        for _, model_a, model_b in sorted(scored, reverse=True):
+            if model_a in busy or model_b in busy:
+                continue
+            busy.update((model_a, model_b))
+            matchups.append(choose_sides(standings, model_a, model_b))
+        return matchups
+
+
+SCHEDULERS: Dict[str, Type[MatchupScheduler]] = {
+    "swiss": SwissScheduler,
+    "information_gain": InformationGainScheduler,
+}
+
+
+def get_scheduler(name: str, seed: Optional[int] = None) -> MatchupScheduler:
+    if name not in SCHEDULERS:
+        raise ValueError(f"Unknown scheduler {name}, expected one of {', '.join(SCHEDULERS)}")
+    return SCHEDULERS[name](seed=seed)
+
+
+def get_default_rounds(model_count: int) -> int:
+    return math.ceil(math.log2(max(2, model_count))) + 3
+
+
+def get_played_matchups(
+    base_path: Path, models: List[str], judge_models: List[str]
+) -> Tuple[Set[Matchup], List[Matchup]]:
+    """
+    The pairings whose debate is complete, and those whose debate was started but
+    not finished, e.g. after a budget refusal or exhausted retries.
+    """
+    played: Set[Matchup] = set()
+    unfinished: List[Matchup] = []
+    for proposition in models:
+        for opposition in models:
+            if proposition == opposition:
+                continue
+            path = get_debate_path(base_path, proposition, opposition)
+            if not path.exists() and not get_journal_path(path).exists():
+                continue
+            if is_debate_complete(path, judge_models):
+                played.add((proposition, opposition))
+            else:
+                unfinished.append((proposition, opposition))
+    return played, unfinished
+
+
+def run_scheduled_tournament(
+    models: List[str],
+    topic_list: List[DebateTopic],
+    prompts: DebatePrompts,
+    base_path: Path,
+    judge_models: List[str],
+    scheduler: Optional[MatchupScheduler] = None,
+    max_rounds: Optional[int] = None,
+    min_rounds: int = 3,
+    stable_rounds: int = 2,
+    seed: Optional[int] = None,
+    **tournament_options,
+) -> List[DebateTotal]:
+    """
+    Plays scheduler-chosen rounds until max_rounds (default log2(n) + 3), until the
+    ranking has held for stable_rounds rounds after min_rounds, or until no
+    unplayed matchups are left. Standings are rebuilt from the files in base_path
+    each round, so a restarted run carries on where it stopped. Debates that were
+    started but not finished are put back in the next round, ahead of the
+    scheduler's picks, and are resumed when tournament_options has resume.
+    tournament_options are passed to run_tournament. Every round shares one
+    client, so the connection pool and the rate limiter's learned state carry over.
+    """
+    scheduler = scheduler or SwissScheduler(seed=seed)
+    topic_random = random.Random(seed)
+    max_rounds = max_rounds or get_default_rounds(len(models))
+    results: List[DebateTotal] = []
+    previous_ranking: Optional[List[str]] = None
+    unchanged_rounds = 0
+
+    budget = tournament_options.get("budget")
+    client_options = {name: tournament_options.pop(name) for name in CLIENT_OPTIONS if name in tournament_options}
+    client = make_tournament_client(budget=budget, **client_options)
+    try:
+        for round_number in range(1, max_rounds + 1):
+            if budget is not None and (budget.is_soft_limit_reached() or budget.refused_calls):
+                logger.warning(f"Budget limit reached (${budget.spent:.4f} spent), not starting round {round_number}")
+                break
+            played, unfinished = get_played_matchups(base_path, models, judge_models)
+            # Unfinished pairings are not offered to the scheduler again, they are retried as they are
+            standings = get_standings(models, list(iter_outcomes(base_path)), played | set(unfinished))
+            ranking = standings.get_ranking()
+            unchanged_rounds = unchanged_rounds + 1 if ranking == previous_ranking else 0
+            previous_ranking = ranking
+            if round_number > min_rounds and unchanged_rounds >= stable_rounds:
+                logger.info(f"Ranking unchanged for {unchanged_rounds} rounds, stopping")
+                break
+
+            matchups = unfinished + scheduler.next_round(standings)
+            if not matchups:
+                logger.info("No unplayed matchups left, stopping")
+                break
+
+            logger.info(f"Round {round_number}: {len(matchups)} debates")
+            jobs = [
+                DebateJob(
+                    proposition_model=proposition,
+                    opposition_model=opposition,
+                    motion=topic_random.choice(topic_list),
+                    path=get_debate_path(base_path, proposition, opposition),
+                )
+                for proposition, opposition in matchups
+            ]
+            with span("matchup_round", round=round_number, scheduler=type(scheduler).__name__):
+                results.extend(asyncio.run(run_tournament(
+                    jobs=jobs, prompts=prompts, judge_models=judge_models, client=client, **tournament_options
+                )))
+    finally:
+        client.close()
+
+    return results
@@ -0,0 +1,398 @@
+"""
+Local stand-in for the OpenRouter chat completions endpoint, for load testing the
+pipeline offline. Point the pipeline at it with
+
+    OPENROUTER_BASE_URL=http://127.0.0.1:8765/api/v1 OPENROUTER_API_KEY=mock python stage_one.py
+
+after starting it with `python mock_openrouter.py --port 8765`.
+"""
+import argparse
+from dataclasses import dataclass, field
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import math
+import random
+import re
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_PATH = "/api/v1/chat/completions"
+
+SPEECH_ROOT_TAGS = ["finalSpeech", "rebuttal", "speech"]
+
+
+@dataclass
+class MockSettings:
+    latency_median: float = 2.0
+    latency_sigma: float = 0.5
+    # Multiplies every sampled latency; use a small value to run tournaments in seconds
+    latency_scale: float = 1.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    rate_empty_choices: float = 0.0
+    # Share of speeches that ignore the requested XML structure
+    rate_off_format: float = 0.0
+    # Share of judgements (and repair replies) that give their verdict only in prose
+    rate_unreadable_verdict: float = 0.0
+    # Answer response_format and tools requests with 404, as OpenRouter does when
+    # require_parameters leaves no provider
+    reject_structured_output: bool = False
+    retry_after: float = 1.0
+    speech_words: int = 300
+    seed: Optional[int] = None
+    # Per-model latency multipliers, e.g. slower reasoning models
+    model_latency: Dict[str, float] = field(default_factory=dict)
+    # Hidden debating strength per model; judges favour the stronger side
+    model_strengths: Dict[str, float] = field(default_factory=dict)
+
+
+def get_synthetic_models(count: int, prefix: str = "mock/model") -> List[str]:
+    return [f"{prefix}-{i:02d}" for i in range(count)]
+
+
+def get_model_strength(model: str, settings: MockSettings) -> float:
+    if model in settings.model_strengths:
+        return settings.model_strengths[model]
+    match = re.search(r"(\d+)$", model)
+    if match:
+        return float(match.group(1)) / 10
+    digest = hashlib.sha256(model.encode("utf-8")).digest()
+    return digest[0] / 64
+
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def get_text(message: dict) -> str:
+    """Message text, whether content is a string or a list of parts with cache hints."""
+    content = message.get("content", "")
+    if isinstance(content, list):
+        return "".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def find_root_tag(messages: List[dict]) -> str:
+    # Instructions sit in system messages, or failing that the final message; other
+    # messages are speeches that contain tags of their own
+    candidates = [m for m in messages if m.get("role") == "system"] + messages[-1:]
+    for message in candidates:
+        content = get_text(message)
+        for tag in SPEECH_ROOT_TAGS:
+            if f"<{tag}>" in content:
+                return tag
+    return "speech"
+
+
+def is_judge_request(messages: List[dict]) -> bool:
+    # Judge panels carry the rules in the system prompt; repair re-asks only send a user message
+    return any(
+        "<winnerName>" in get_text(m) or get_text(m).startswith("You are a judge")
+        for m in messages if m.get("role") in ("system", "user")
+    )
+
+
+class MockOpenRouter:
+    """Generates responses; kept apart from the HTTP layer so it can be reused in-process."""
+
+    def __init__(self, settings: MockSettings):
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+        self.lock = threading.Lock()
+        self.status_counts: Dict[int, int] = {}
+        self.requests = 0
+        self.prompt_prefixes: set = set()
+
+    def sample_latency(self, model: str) -> float:
+        with self.lock:
+            latency = self.random.lognormvariate(math.log(self.settings.latency_median), self.settings.latency_sigma)
+        return latency * self.settings.latency_scale * self.settings.model_latency.get(model, 1.0)
+
+    def roll(self, probability: float) -> bool:
+        with self.lock:
+            return self.random.random() < probability
+
+    def get_cached_tokens(self, model: str, messages: List[dict]) -> int:
+        # Like a provider prompt cache: tokens in the longest run of leading messages
+        # this model has already been sent
+        digest = hashlib.sha256(model.encode("utf-8"))
+        tokens = cached_tokens = 0
+        keys = []
+        for message in messages:
+            text = get_text(message)
+            digest.update(f"{message.get('role')}\0{text}\0".encode("utf-8"))
+            tokens += count_tokens(text)
+            keys.append((digest.hexdigest(), tokens))
+        with self.lock:
+            for key, prefix_tokens in keys:
+                if key in self.prompt_prefixes:
+                    cached_tokens = prefix_tokens
+            if len(self.prompt_prefixes) > 1_000_000:
+                self.prompt_prefixes.clear()
+            self.prompt_prefixes.update(key for key, _ in keys)
+        return cached_tokens
+
+    def make_speech(self, model: str, messages: List[dict]) -> str:
+        tag = find_root_tag(messages)
+        with self.lock:
+            words = " ".join(
+                self.random.choice(["evidence", "principle", "impact", "clash", "burden", "harm", "benefit"])
+                for _ in range(self.settings.speech_words)
+            )
+        if self.roll(self.settings.rate_off_format):
+            return f"Sure! Here is my speech as {model}, in plain prose. {words}"
+        return f"<{tag}>\n    <speaker>{model}</speaker>\n    <body>{words}</body>\n</{tag}>"
+
+    def make_judgement(self, messages: List[dict], structured: bool = False) -> str:
+        transcript = " ".join(get_text(m) for m in messages if m.get("role") != "system")
+        # A repair re-ask restates the verdict of the prose judgement it quotes
+        prose_verdict = re.search(r"lean towards the (\w+) side, with about (\d+) in 100", transcript)
+        if prose_verdict:
+            return self.format_verdict(prose_verdict.group(1), int(prose_verdict.group(2)), structured)
+        speakers = re.findall(r"<speaker>([^<]+)</speaker>", transcript)
+        proposition, opposition = (speakers[0], speakers[1]) if len(speakers) >= 2 else ("", "")
+        gap = get_model_strength(proposition, self.settings) - get_model_strength(opposition, self.settings)
+        proposition_wins_probability = 1 / (1 + math.exp(-gap))
+        with self.lock:
+            proposition_wins = self.random.random() < proposition_wins_probability
+            margin = abs(proposition_wins_probability - 0.5) * 2
+            confidence = min(100, max(51, int(55 + 40 * margin + self.random.randint(-5, 5))))
+        winner = "proposition" if proposition_wins else "opposition"
+        if structured:
+            return self.format_verdict(winner, confidence, structured)
+        return (
+            "I. The synthetic judge weighed the clashes in this mock debate.\n"
+            + self.format_verdict(winner, confidence)
+        )
+
+    def format_verdict(self, winner: str, confidence: int, structured: bool = False) -> str:
+        if structured:
+            # Schema-constrained output is always well-formed
+            return json.dumps({
+                "logic": "The synthetic judge weighed the clashes in this mock debate.",
+                "winner": winner,
+                "confidence": confidence,
+            })
+        if self.roll(self.settings.rate_unreadable_verdict):
+            return f"On balance I lean towards the {winner} side, with about {confidence} in 100 confidence.\n"
+        return f"<winnerName>{winner}</winnerName>\n<confidence>{confidence}</confidence>\n"
+
+    def handle(self, payload: dict) -> tuple[int, dict, Dict[str, str], float]:
+        """Returns (status, body, headers, delay in seconds) for one request."""
+        model = payload.get("model", "")
+        messages = payload.get("messages", [])
+        delay = self.sample_latency(model)
+        prompt_tokens = sum(count_tokens(get_text(m)) for m in messages)
+
+        structured = "response_format" in payload or "tools" in payload
+
+        if structured and self.settings.reject_structured_output:
+            status, headers = 404, {}
+            body = {"error": {"message": "No endpoints found that support the requested parameters", "code": 404}}
+        elif self.roll(self.settings.rate_429):
+            status, body, headers = 429, {"error": {"message": "Rate limit exceeded", "code": 429}}, {
+                "Retry-After": str(self.settings.retry_after)
+            }
+            delay = min(delay, 0.05 * self.settings.latency_scale)
+        elif self.roll(self.settings.rate_5xx):
+            status, body, headers = 502, {"error": {"message": "Provider returned error", "code": 502}}, {}
+        elif self.roll(self.settings.rate_empty_choices):
+            status, headers = 200, {}
+            body = {
+                "id": "mock-empty",
+                "model": model,
+                "choices": [],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 0, "total_tokens": prompt_tokens},
+            }
+        else:
+            if is_judge_request(messages):
+                content = self.make_judgement(messages, structured)
+            else:
+                content = self.make_speech(model, messages)
+            completion_tokens = count_tokens(content)
+            message = {"role": "assistant", "content": content}
+            if "tools" in payload:
+                message = {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [{
+                        "id": f"call-{self.requests}",
+                        "type": "function",
+                        "function": {"name": payload["tools"][0]["function"]["name"], "arguments": content},
+                    }],
+                }
+            status, headers = 200, {}
+            body = {
+                "id": f"mock-{self.requests}",
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "prompt_tokens_details": {"cached_tokens": self.get_cached_tokens(model, messages)},
+                },
+            }
+
+        with self.lock:
+            self.requests += 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        return status, body, headers, delay
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockOpenRouterServer"
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+        if self.path.rstrip("/") != CHAT_COMPLETIONS_PATH:
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}", "code": 404}}, {})
+            return
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            self.send_json(400, {"error": {"message": "Invalid JSON body", "code": 400}}, {})
+            return
+
+        status, body, headers, delay = self.server.backend.handle(payload)
+        if payload.get("stream") and status == 200:
+            self.send_stream(body, delay)
+            return
+        time.sleep(delay)
+        self.send_json(status, body, headers)
+
+    def send_stream(self, body: dict, delay: float, chunk_words: int = 8) -> None:
+        """Sends a completion as server-sent events: a quarter of the delay before the first token, the rest spread over the chunks."""
+        choices = body.get("choices") or []
+        words = choices[0]["message"]["content"].split(" ") if choices else []
+        deltas = [" ".join(words[i:i + chunk_words]) + " " for i in range(0, len(words), chunk_words)]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            self.write_chunk(": OPENROUTER PROCESSING\n\n")
+            time.sleep(delay / 4)
+            for delta in deltas:
+                event = {"id": body["id"], "model": body["model"], "choices": [{"index": 0, "delta": {"content": delta}}]}
+                self.write_chunk(f"data: {json.dumps(event)}\n\n")
+                time.sleep(delay * 3 / 4 / len(deltas))
+            final = {"id": body["id"], "model": body["model"], "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            self.write_chunk(f"data: {json.dumps(final)}\n\n")
+            self.write_chunk(f"data: {json.dumps({'id': body['id'], 'choices': [], 'usage': body['usage']})}\n\n")
+            self.write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client aborted the stream
+            self.close_connection = True
+
+    def write_chunk(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def send_json(self, status: int, body: dict, headers: Dict[str, str]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+
+class MockOpenRouterServer(ThreadingHTTPServer):
+    """Threaded HTTP server for MockOpenRouter; usable as a context manager in tests and benchmarks."""
+
+    daemon_threads = True
+
+    def __init__(self, settings: Optional[MockSettings] = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), MockRequestHandler)
+        self.backend = MockOpenRouter(settings or MockSettings())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    def start(self) -> "MockOpenRouterServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Mock OpenRouter listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients closing a connection mid-stream is expected, not an error
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def __enter__(self) -> "MockOpenRouterServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local mock of the OpenRouter chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-median", type=float, default=2.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-empty-choices", type=float, default=0.0)
+    parser.add_argument("--rate-off-format", type=float, default=0.0)
+    parser.add_argument("--rate-unreadable-verdict", type=float, default=0.0)
+    parser.add_argument("--reject-structured-output", action="store_true")
+    parser.add_argument("--speech-words", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    settings = MockSettings(
+        latency_median=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        latency_scale=args.latency_scale,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        rate_empty_choices=args.rate_empty_choices,
+        rate_off_format=args.rate_off_format,
+        rate_unreadable_verdict=args.rate_unreadable_verdict,
+        reject_structured_output=args.reject_structured_output,
+        speech_words=args.speech_words,
+        seed=args.seed,
+    )
+    server = MockOpenRouterServer(settings, host=args.host, port=args.port)
+    logger.info(f"Mock OpenRouter listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,30 @@
 from enum import Enum
+import hashlib
 import json
+import os
 from pathlib import Path
-from typing import Dict, List, Union, Literal, cast
+from typing import Dict, List, NamedTuple, Optional, Union, Literal, cast
 from pydantic import BaseModel, Field
 import logging
+import uuid
+
+
+def write_json_atomically(path: Union[str, Path], data: dict) -> None:
+    """
+    Writes JSON through a temporary file in the same directory and renames it into
+    place, so a crash mid-write never leaves a truncated file behind.
+    """
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
 
 class TopicCategory(Enum):
     GLOBAL_GOVERNANCE_AND_ECONOMICS = "global_governance_and_economics"
@@ -62,6 +83,17 @@ class ModelTokenUsage(BaseModel):
     failed_completion_tokens: int = 0
     failed_prompt_tokens: int = 0
     failed_total_tokens: int = 0
+    # Calls answered from the local response cache; these tokens were not paid for again
+    cache_hit_calls: int = 0
+    cache_hit_completion_tokens: int = 0
+    cache_hit_prompt_tokens: int = 0
+    cache_hit_total_tokens: int = 0
+    # Part of successful_prompt_tokens the provider served from its prompt cache
+    successful_cached_prompt_tokens: int = 0
+
+    @property
+    def successful_uncached_prompt_tokens(self) -> int:
+        return self.successful_prompt_tokens - self.successful_cached_prompt_tokens
 
     @property
     def total_completion_tokens(self) -> int:
@@ -80,7 +112,7 @@ class TokenCount(BaseModel):
     model_usages: Dict[str, ModelTokenUsage] = Field(default_factory=dict)
 
     def add_successful_call(
-        self, model: str, completion_tokens: int, prompt_tokens: int, total_tokens: int
+        self, model: str, completion_tokens: int, prompt_tokens: int, total_tokens: int, cached_prompt_tokens: int = 0
     ):
         if model not in self.model_usages:
             self.model_usages[model] = ModelTokenUsage()
@@ -90,6 +122,7 @@ class TokenCount(BaseModel):
         usage.successful_completion_tokens += completion_tokens
         usage.successful_prompt_tokens += prompt_tokens
         usage.successful_total_tokens += total_tokens
+        usage.successful_cached_prompt_tokens += cached_prompt_tokens
 
     def add_failed_call(
         self, model: str, completion_tokens: int, prompt_tokens: int, total_tokens: int
@@ -103,15 +136,73 @@ class TokenCount(BaseModel):
         usage.failed_prompt_tokens += prompt_tokens
         usage.failed_total_tokens += total_tokens
 
+    def add_cached_call(
+        self, model: str, completion_tokens: int, prompt_tokens: int, total_tokens: int
+    ):
+        if model not in self.model_usages:
+            self.model_usages[model] = ModelTokenUsage()
+
+        usage = self.model_usages[model]
+        usage.cache_hit_calls += 1
+        usage.cache_hit_completion_tokens += completion_tokens
+        usage.cache_hit_prompt_tokens += prompt_tokens
+        usage.cache_hit_total_tokens += total_tokens
+
+
 
 
+def get_prompt_version(prompt: str) -> str:
+    """Short content hash identifying a judging prompt."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
 
 class JudgeResult(BaseModel):
     model: str
     winner: Literal['opposition', 'proposition']
     confidence: int = Field(ge=0, le=100)
     logic: str
+    # get_prompt_version of the judging prompt; None for results stored before
+    # versions were recorded, which used the debate's own prompts.judge_prompt
+    prompt_version: Optional[str] = None
+
+
 
+class JudgeVerdict(NamedTuple):
+    model: str
+    winner: str
+    confidence: int
+
+
+class DebateOutcome(NamedTuple):
+    """The few fields of a debate that rating code reads, without the transcript."""
+    path: str
+    topic_description: str
+    proposition_model: str
+    opposition_model: str
+    judge_results: List[JudgeVerdict]
+    # Judges an adaptive panel did not call because the outcome was already decided
+    skipped_judges: int = 0
+
+    @property
+    def panel_scale(self) -> float:
+        """Weight per verdict that gives an early-stopped panel the weight of its full panel."""
+        if not self.judge_results:
+            return 1.0
+        return (len(self.judge_results) + self.skipped_judges) / len(self.judge_results)
+
+    @classmethod
+    def from_debate(cls, debate: 'DebateTotal') -> 'DebateOutcome':
+        return cls(
+            path=str(debate.path_to_store),
+            topic_description=debate.motion.topic_description,
+            proposition_model=debate.proposition_model,
+            opposition_model=debate.opposition_model,
+            judge_results=[
+                JudgeVerdict(model=result.model, winner=result.winner, confidence=result.confidence)
+                for result in debate.judge_results
+            ],
+            skipped_judges=len(debate.skipped_judges),
+        )
 
 
 class DebateTotal(BaseModel):
@@ -128,6 +219,10 @@ class DebateTotal(BaseModel):
     )
     judge_models: List[str] = Field(default_factory=list)
     judge_results: List[JudgeResult] = Field(default_factory=list)
+    # Results replaced by a rejudge under a newer prompt version, kept for reference
+    superseded_judge_results: List[JudgeResult] = Field(default_factory=list)
+    # Panel judges not called because the verdicts so far already decided the debate
+    skipped_judges: List[str] = Field(default_factory=list)
     debator_token_counts: TokenCount = Field(default_factory=TokenCount)
     judge_token_counts: TokenCount = Field(default_factory=TokenCount)
 
@@ -151,6 +246,8 @@ class DebateTotal(BaseModel):
             },
             "judge_models": self.judge_models,
             "judge_results": [result.dict() for result in self.judge_results],
+            "superseded_judge_results": [result.dict() for result in self.superseded_judge_results],
+            "skipped_judges": self.skipped_judges,
             "debator_token_counts": {
                 model: usage.dict()
                 for model, usage in self.debator_token_counts.model_usages.items()
@@ -163,9 +260,7 @@ class DebateTotal(BaseModel):
         }
 
     def save_to_json(self) -> None:
-        data = self.to_dict()
-        with open(self.path_to_store, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_json_atomically(self.path_to_store, self.to_dict())
         logging.info(f"Saved to {self.path_to_store}")
 
     @classmethod
@@ -173,7 +268,12 @@ class DebateTotal(BaseModel):
         path = Path(path)
         with open(path, 'r') as f:
             data = json.load(f)
+        return cls.from_dict(data)
 
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DebateTotal':
+        """Inverse of to_dict."""
+        data = dict(data)
         data['motion'] = DebateTopic(
             topic_description=data['motion']['topic_description'],
             category=TopicCategory(data['motion']['category'])
@@ -192,6 +292,9 @@ class DebateTotal(BaseModel):
         )
 
         data['judge_results'] = [JudgeResult(**result) for result in data['judge_results']]
+        data['superseded_judge_results'] = [
+            JudgeResult(**result) for result in data.get('superseded_judge_results', [])
+        ]
 
         debator_token_counts = TokenCount()
         for model, usage_data in data.get('debator_token_counts', {}).items():
@@ -211,6 +314,42 @@ class DebateTotal(BaseModel):
 
         return cls(**data)
 
+    def get_missing_speeches(self) -> List[tuple[Side, SpeechType]]:
+        missing = []
+        for speech_type in SpeechType:
+            for output in (self.proposition_output, self.opposition_output):
+                if output.speeches[speech_type] == -1:
+                    missing.append((output.side, speech_type))
+        return missing
+
+    def get_missing_judges(self, judge_models: List[str]) -> List[str]:
+        judged = {result.model for result in self.judge_results}
+        return [model for model in judge_models if model not in judged and model not in self.skipped_judges]
+
+    def get_result_prompt_version(self, result: JudgeResult) -> str:
+        return result.prompt_version or get_prompt_version(self.prompts.judge_prompt)
+
+    def get_missing_judgements(self, judge_models: List[str], prompt_version: str) -> List[str]:
+        """Judges without a result under the given prompt version."""
+        judged = {
+            result.model for result in self.judge_results
+            if self.get_result_prompt_version(result) == prompt_version
+        }
+        return [model for model in judge_models if model not in judged]
+
+    def replace_judge_result(self, result: JudgeResult) -> None:
+        """Adds a result, moving all of the same judge's earlier results to superseded_judge_results."""
+        self.superseded_judge_results.extend(r for r in self.judge_results if r.model == result.model)
+        self.judge_results = [r for r in self.judge_results if r.model != result.model]
+        self.judge_results.append(result)
+        if result.model in self.skipped_judges:
+            self.skipped_judges.remove(result.model)
+        if result.model not in self.judge_models:
+            self.judge_models.append(result.model)
+
+    def is_complete(self, judge_models: List[str]) -> bool:
+        return not self.get_missing_speeches() and not self.get_missing_judges(judge_models)
+
     def get_transcript(self) -> Dict[str, str]:
         transcript = {}
         transcript["Proposition Opening Speech"] = self.proposition_output.speeches[SpeechType.OPENING]
@@ -0,0 +1,485 @@
+import asyncio
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from concurrency import CallLimiter
+from config import Config
+from cost_engine import CostEngine
+from rate_limiter import ModelRateLimiter
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401  httpx needs it to negotiate HTTP/2
+    HTTP2_AVAILABLE = HTTPX_AVAILABLE
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Completion tokens assumed for a call before its usage is known
+DEFAULT_COMPLETION_ESTIMATE = 1500
+
+FIRST_BYTE_EXTENSION = "debatebet.first_byte"
+
+
+def estimate_prompt_tokens(payload: dict) -> int:
+    """Rough prompt size of a request, at about four characters per token."""
+    return sum(len(str(message.get("content", ""))) for message in payload.get("messages", [])) // 4
+
+
+def estimate_tokens(payload: dict) -> int:
+    """Rough prompt plus completion size of a request."""
+    return estimate_prompt_tokens(payload) + payload.get("max_tokens", DEFAULT_COMPLETION_ESTIMATE)
+
+
+@dataclass
+class CallRecord:
+    """What a call listener learns about one finished HTTP call."""
+    model: str
+    payload: dict
+    status_code: Optional[int]
+    latency: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error: Optional[BaseException] = None
+    # Only known for streamed calls
+    time_to_first_token: Optional[float] = None
+    # Until the response headers arrived
+    time_to_first_byte: Optional[float] = None
+    # Spent waiting for a rate limiter slot before the request was sent
+    queue_time: float = 0.0
+
+
+@dataclass
+class StreamedCompletion:
+    """
+    A streamed chat completion assembled from its server-sent events. Like the raw
+    responses chat_completion returns, it has status_code and json().
+    """
+    status_code: int
+    content: str = ""
+    usage: Optional[dict] = None
+    finish_reason: Optional[str] = None
+    time_to_first_token: Optional[float] = None
+    error_body: Optional[dict] = None
+
+    def json(self) -> dict:
+        if self.status_code != 200:
+            return self.error_body or {}
+        return {
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.content},
+                "finish_reason": self.finish_reason,
+            }],
+            "usage": self.usage or {},
+        }
+
+
+def iter_sse_data(lines: Iterator[Any]) -> Iterator[str]:
+    """The data fields of a server-sent event stream; comments and keep-alives are skipped."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if line.startswith("data:"):
+            yield line[len("data:"):].strip()
+
+
+CallListener = Callable[[CallRecord], None]
+
+_call_listeners: List[CallListener] = []
+
+
+def add_call_listener(listener: CallListener) -> None:
+    """Registers a callback that every client invokes after each HTTP call."""
+    _call_listeners.append(listener)
+
+
+def remove_call_listener(listener: CallListener) -> None:
+    _call_listeners.remove(listener)
+
+
+def mark_first_byte(response: Any) -> None:
+    """httpx response hook, called once the headers arrive and before the body is read."""
+    response.extensions[FIRST_BYTE_EXTENSION] = time.monotonic()
+
+
+async def amark_first_byte(response: Any) -> None:
+    mark_first_byte(response)
+
+
+def get_time_to_first_byte(response: Any, start: float) -> Optional[float]:
+    if response is None:
+        return None
+    if isinstance(response, requests.Response):
+        # requests measures elapsed up to the parsed headers
+        return response.elapsed.total_seconds()
+    first_byte = getattr(response, "extensions", {}).get(FIRST_BYTE_EXTENSION)
+    return first_byte - start if first_byte is not None else None
+
+
+def get_retry_after(response: Any) -> Optional[float]:
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class OpenRouterClient:
+    """
+    Shared connection to the OpenRouter chat completions endpoint.
+
+    One client keeps a pool of keep-alive connections that every debater and judge
+    call reuses, so calls after the first skip the TCP and TLS handshake. HTTP/2 is
+    used when httpx and h2 are installed; otherwise requests with a pooled session.
+    Every call has connect and read timeouts, so a hung socket raises instead of
+    blocking the run. With a budget, each call reserves its estimated cost first
+    and raises BudgetExceededError instead of going past the hard limit.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+        http2: bool = True,
+        limiter: Optional[CallLimiter] = None,
+        budget: Optional[CostEngine] = None,
+    ):
+        config = Config()
+        self.api_key = api_key or os.environ["OPENROUTER_API_KEY"]
+        self.base_url = (
+            base_url or os.environ.get("OPENROUTER_BASE_URL") or config.openrouter_base_url
+        ).rstrip("/")
+        self.connect_timeout = connect_timeout or float(
+            os.environ.get("OPENROUTER_CONNECT_TIMEOUT", config.connect_timeout)
+        )
+        self.read_timeout = read_timeout or float(
+            os.environ.get("OPENROUTER_READ_TIMEOUT", config.read_timeout)
+        )
+        self.pool_size = pool_size or config.connection_pool_size
+        self.use_http2 = http2 and HTTP2_AVAILABLE
+        self.limiter = limiter
+        self.budget = budget
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+        if self.use_http2:
+            self._http = httpx.Client(
+                http2=True,
+                headers=self.headers,
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.pool_size, max_keepalive_connections=self.pool_size
+                ),
+                event_hooks={"response": [mark_first_byte]},
+            )
+        else:
+            self._http = requests.Session()
+            self._http.headers.update(self.headers)
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            self._http.mount("https://", adapter)
+            self._http.mount("http://", adapter)
+        self._async_http: Optional[Any] = None
+
+    @property
+    def chat_completions_url(self) -> str:
+        return f"{self.base_url}/chat/completions"
+
+    def _slot(self, model: str, estimated_tokens: int):
+        # Only the rate limiter paces by tokens; a plain CallLimiter just caps calls
+        if self.limiter is None:
+            return nullcontext()
+        if isinstance(self.limiter, ModelRateLimiter):
+            return self.limiter.slot(model, estimated_tokens)
+        return self.limiter.slot(model)
+
+    def _aslot(self, model: str, estimated_tokens: int):
+        if self.limiter is None:
+            return nullcontext()
+        if isinstance(self.limiter, ModelRateLimiter):
+            return self.limiter.aslot(model, estimated_tokens)
+        return self.limiter.aslot(model)
+
+    def chat_completion(self, payload: dict) -> Any:
+        """
+        Posts a chat completion request and returns the raw response. Both the
+        requests and httpx responses expose status_code and json().
+        """
+        model = payload.get("model", "")
+        estimated_tokens = estimate_tokens(payload)
+        requested = start = time.monotonic()
+        response = None
+        error: Optional[BaseException] = None
+        reservation = self._reserve(payload)
+        try:
+            with self._slot(model, estimated_tokens):
+                start = time.monotonic()
+                if self.use_http2:
+                    response = self._http.post(self.chat_completions_url, json=payload)
+                else:
+                    response = self._http.post(
+                        self.chat_completions_url,
+                        json=payload,
+                        timeout=(self.connect_timeout, self.read_timeout),
+                    )
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._record(
+                payload,
+                response,
+                time.monotonic() - start,
+                estimated_tokens,
+                error,
+                reservation,
+                time_to_first_byte=get_time_to_first_byte(response, start),
+                queue_time=start - requested,
+            )
+
+    def stream_chat_completion(
+        self, payload: dict, check: Optional[Callable[[str], None]] = None
+    ) -> StreamedCompletion:
+        """
+        Streams a chat completion over server-sent events. check is called with every
+        content delta and may raise to abort: the connection is closed, so the provider
+        stops generating, and the error propagates to the caller's retry logic.
+        """
+        payload = {**payload, "stream": True, "usage": {"include": True}}
+        model = payload.get("model", "")
+        estimated_tokens = estimate_tokens(payload)
+        requested = start = time.monotonic()
+        response = None
+        usage: Optional[dict] = None
+        completion_chars = 0
+        time_to_first_token: Optional[float] = None
+        error: Optional[BaseException] = None
+        reservation = self._reserve(payload)
+        try:
+            with self._slot(model, estimated_tokens):
+                start = time.monotonic()
+                with self._open_stream(payload) as response:
+                    if response.status_code != 200:
+                        body = response.read() if self.use_http2 else response.content
+                        try:
+                            error_body = json.loads(body)
+                        except ValueError:
+                            error_body = {"error": {"message": body.decode("utf-8", "replace")}}
+                        return StreamedCompletion(status_code=response.status_code, error_body=error_body)
+
+                    parts: List[str] = []
+                    finish_reason = None
+                    for data in iter_sse_data(response.iter_lines()):
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        if chunk.get("error"):
+                            raise ValueError(f"Stream error: {chunk['error'].get('message')}")
+                        usage = chunk.get("usage") or usage
+                        for choice in chunk.get("choices") or []:
+                            finish_reason = choice.get("finish_reason") or finish_reason
+                            delta = (choice.get("delta") or {}).get("content")
+                            if not delta:
+                                continue
+                            if time_to_first_token is None:
+                                time_to_first_token = time.monotonic() - start
+                            parts.append(delta)
+                            completion_chars += len(delta)
+                            if check:
+                                check(delta)
+
+            return StreamedCompletion(
+                status_code=200,
+                content="".join(parts),
+                usage=usage,
+                finish_reason=finish_reason,
+                time_to_first_token=time_to_first_token,
+            )
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if usage is None and response is not None and response.status_code == 200:
+                # Aborted before the final usage chunk; the tokens streamed so far were still billed
+                usage = {
+                    "prompt_tokens": estimate_prompt_tokens(payload),
+                    "completion_tokens": completion_chars // 4,
+                }
+            self._record(
+                payload,
+                response,
+                time.monotonic() - start,
+                estimated_tokens,
+                error,
+                reservation,
+                usage=usage or {},
+                time_to_first_token=time_to_first_token,
+                time_to_first_byte=get_time_to_first_byte(response, start),
+                queue_time=start - requested,
+            )
+
+    @contextmanager
+    def _open_stream(self, payload: dict) -> Iterator[Any]:
+        if self.use_http2:
+            with self._http.stream("POST", self.chat_completions_url, json=payload) as response:
+                yield response
+        else:
+            response = self._http.post(
+                self.chat_completions_url,
+                json=payload,
+                stream=True,
+                timeout=(self.connect_timeout, self.read_timeout),
+            )
+            try:
+                yield response
+            finally:
+                response.close()
+
+    async def achat_completion(self, payload: dict) -> Any:
+        """Async variant of chat_completion for callers running on an event loop."""
+        if not HTTPX_AVAILABLE:
+            # Without httpx there is no async transport, so use the pooled session on a thread
+            return await asyncio.to_thread(self.chat_completion, payload)
+
+        if self._async_http is None:
+            self._async_http = httpx.AsyncClient(
+                http2=self.use_http2,
+                headers=self.headers,
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.pool_size, max_keepalive_connections=self.pool_size
+                ),
+                event_hooks={"response": [amark_first_byte]},
+            )
+        model = payload.get("model", "")
+        estimated_tokens = estimate_tokens(payload)
+        requested = start = time.monotonic()
+        response = None
+        error: Optional[BaseException] = None
+        reservation = self._reserve(payload)
+        try:
+            async with self._aslot(model, estimated_tokens):
+                start = time.monotonic()
+                response = await self._async_http.post(self.chat_completions_url, json=payload)
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._record(
+                payload,
+                response,
+                time.monotonic() - start,
+                estimated_tokens,
+                error,
+                reservation,
+                time_to_first_byte=get_time_to_first_byte(response, start),
+                queue_time=start - requested,
+            )
+
+    def _reserve(self, payload: dict) -> float:
+        if self.budget is None:
+            return 0.0
+        return self.budget.reserve(
+            payload.get("model", ""),
+            estimate_prompt_tokens(payload),
+            payload.get("max_tokens", DEFAULT_COMPLETION_ESTIMATE),
+        )
+
+    def _record(
+        self,
+        payload: dict,
+        response: Any,
+        latency: float,
+        estimated_tokens: int,
+        error: Optional[BaseException] = None,
+        reservation: float = 0.0,
+        usage: Optional[dict] = None,
+        time_to_first_token: Optional[float] = None,
+        time_to_first_byte: Optional[float] = None,
+        queue_time: float = 0.0,
+    ) -> None:
+        if self.limiter is None and self.budget is None and not _call_listeners:
+            return
+        model = payload.get("model", "")
+        status_code = response.status_code if response is not None else None
+        if usage is None:
+            usage = {}
+            if status_code == 200:
+                try:
+                    usage = json.loads(response.content).get("usage") or {}
+                except ValueError:
+                    pass
+
+        if self.budget is not None:
+            self.budget.record(
+                model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), reservation
+            )
+
+        if self.limiter is not None:
+            self.limiter.record_response(
+                model=model,
+                status_code=status_code,
+                latency=latency,
+                estimated_tokens=estimated_tokens,
+                used_tokens=usage.get("total_tokens"),
+                completion_tokens=usage.get("completion_tokens"),
+                retry_after=get_retry_after(response) if response is not None else None,
+            )
+
+        if _call_listeners:
+            record = CallRecord(
+                model=model,
+                payload=payload,
+                status_code=status_code,
+                latency=latency,
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+                error=error,
+                time_to_first_token=time_to_first_token,
+                time_to_first_byte=time_to_first_byte,
+                queue_time=queue_time,
+            )
+            for listener in list(_call_listeners):
+                listener(record)
+
+    def close(self) -> None:
+        self._http.close()
+
+    async def aclose(self) -> None:
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
+
+
+_default_client: Optional[OpenRouterClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_openrouter_client() -> OpenRouterClient:
+    """Returns the process-wide client, creating it on first use."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = OpenRouterClient(limiter=ModelRateLimiter())
+        return _default_client
@@ -0,0 +1,271 @@
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+from concurrency import CallLimiter
+
+logger = logging.getLogger(__name__)
+
+# Longest a waiting caller sleeps before re-checking; releases and responses wake it sooner
+MAX_ADMIT_WAIT = 1.0
+
+
+class RateLimitedError(ValueError):
+    """Raised when OpenRouter answers 429 for a model."""
+
+
+class TokenBucket:
+    """Refills continuously at a per-minute rate and holds at most one minute of budget."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # A request larger than the whole bucket goes through once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.available -= amount
+
+    def give_back(self, amount: float) -> None:
+        self.available = min(self.capacity, self.available + amount)
+
+
+@dataclass
+class ModelState:
+    requests: Optional[TokenBucket]
+    tokens: Optional[TokenBucket]
+    limit: float
+    max_limit: int
+    in_flight: int = 0
+    cooldown_until: float = 0.0
+    consecutive_throttles: int = 0
+    latency_ewma: Optional[float] = None
+    baseline_latency: Optional[float] = None
+    throttled_calls: int = 0
+
+
+class ModelRateLimiter(CallLimiter):
+    """
+    Paces OpenRouter calls per model before they are sent, instead of waiting for 429s.
+
+    Each model gets request-per-minute and token-per-minute buckets plus an
+    AIMD concurrency window. The window grows by roughly one call per round of
+    successful calls, halves on a 429, and shrinks a little when latency per
+    completion token climbs well above the best seen so far. A throttled model
+    cools down on its own; callers waiting on it hold no global slot, so other
+    models keep flowing.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_calls: int = 16,
+        max_calls_per_model: int = 8,
+        per_model_limits: Optional[Dict[str, int]] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        per_model_rates: Optional[Dict[str, Dict[str, float]]] = None,
+        initial_calls_per_model: int = 2,
+        min_calls_per_model: int = 1,
+        latency_factor: float = 2.0,
+        max_cooldown: float = 60.0,
+    ):
+        super().__init__(
+            max_concurrent_calls=max_concurrent_calls,
+            max_calls_per_model=max_calls_per_model,
+            per_model_limits=per_model_limits,
+        )
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.per_model_rates = per_model_rates or {}
+        self.initial_calls_per_model = initial_calls_per_model
+        self.min_calls_per_model = min_calls_per_model
+        self.latency_factor = latency_factor
+        self.max_cooldown = max_cooldown
+        self._states: Dict[str, ModelState] = {}
+        self._condition = threading.Condition(self._lock)
+
+    def _state(self, model: str) -> ModelState:
+        # Caller holds self._lock
+        if model not in self._states:
+            rates = self.per_model_rates.get(model, {})
+            rpm = rates.get("requests_per_minute", self.requests_per_minute)
+            tpm = rates.get("tokens_per_minute", self.tokens_per_minute)
+            max_limit = self.per_model_limits.get(model, self.max_calls_per_model)
+            self._states[model] = ModelState(
+                requests=TokenBucket(rpm) if rpm else None,
+                tokens=TokenBucket(tpm) if tpm else None,
+                limit=float(min(self.initial_calls_per_model, max_limit)),
+                max_limit=max_limit,
+            )
+        return self._states[model]
+
+    def _try_admit(self, model: str, estimated_tokens: float) -> float:
+        """Admits the call and returns 0, or returns how long to wait before retrying."""
+        with self._lock:
+            state = self._state(model)
+            now = time.monotonic()
+            if now < state.cooldown_until:
+                return state.cooldown_until - now
+            if state.in_flight >= max(self.min_calls_per_model, int(state.limit)):
+                return MAX_ADMIT_WAIT
+
+            wait = 0.0
+            if state.requests:
+                wait = max(wait, state.requests.time_until(1, now))
+            if state.tokens:
+                wait = max(wait, state.tokens.time_until(estimated_tokens, now))
+            if wait > 0:
+                return wait
+
+            if state.requests:
+                state.requests.take(1)
+            if state.tokens:
+                state.tokens.take(estimated_tokens)
+            state.in_flight += 1
+            return 0.0
+
+    def _release_model(self, model: str) -> None:
+        with self._condition:
+            state = self._state(model)
+            state.in_flight -= 1
+            self._condition.notify_all()
+        self._notify_waiters()
+
+    @contextmanager
+    def slot(self, model: str, estimated_tokens: float = 0) -> Iterator[None]:
+        while True:
+            wait = self._try_admit(model, estimated_tokens)
+            if wait == 0:
+                break
+            with self._condition:
+                self._condition.wait(timeout=min(wait, MAX_ADMIT_WAIT))
+        try:
+            self._global.acquire()
+            try:
+                yield
+            finally:
+                self._release(self._global)
+        finally:
+            self._release_model(model)
+
+    @asynccontextmanager
+    async def aslot(self, model: str, estimated_tokens: float = 0) -> AsyncIterator[None]:
+        await self._acquire_async(lambda: min(self._try_admit(model, estimated_tokens), MAX_ADMIT_WAIT))
+        try:
+            await self._acquire_async(lambda: 0.0 if self._global.acquire(blocking=False) else None)
+            try:
+                yield
+            finally:
+                self._release(self._global)
+        finally:
+            self._release_model(model)
+
+    def record_response(
+        self,
+        model: str,
+        status_code: Optional[int],
+        latency: float,
+        estimated_tokens: float = 0,
+        used_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        with self._condition:
+            state = self._state(model)
+
+            # Settle the token bucket against what the call really used
+            if state.tokens and used_tokens is not None:
+                difference = estimated_tokens - used_tokens
+                if difference > 0:
+                    state.tokens.give_back(difference)
+                else:
+                    state.tokens.take(-difference)
+
+            if status_code == 429:
+                state.throttled_calls += 1
+                state.consecutive_throttles += 1
+                state.limit = max(float(self.min_calls_per_model), state.limit / 2)
+                cooldown = retry_after or min(self.max_cooldown, 2.0 ** state.consecutive_throttles)
+                state.cooldown_until = max(state.cooldown_until, time.monotonic() + cooldown)
+                logger.warning(
+                    f"{model} rate limited; cooling down for {cooldown:.1f}s "
+                    f"with concurrency {int(state.limit)}"
+                )
+            elif status_code == 200:
+                state.consecutive_throttles = 0
+                per_token = latency / max(1, completion_tokens or 1)
+                state.latency_ewma = (
+                    per_token if state.latency_ewma is None
+                    else 0.8 * state.latency_ewma + 0.2 * per_token
+                )
+                if state.baseline_latency is None or state.latency_ewma < state.baseline_latency:
+                    state.baseline_latency = state.latency_ewma
+
+                if state.latency_ewma > self.latency_factor * state.baseline_latency:
+                    state.limit = max(float(self.min_calls_per_model), state.limit * 0.9)
+                else:
+                    state.limit = min(float(state.max_limit), state.limit + 1 / state.limit)
+
+            self._condition.notify_all()
+        self._notify_waiters()
+
+    def get_concurrency(self, model: str) -> int:
+        with self._lock:
+            return int(self._state(model).limit)
+
+    def get_latency(self, model: str) -> Optional[float]:
+        """Smoothed seconds per completion token, or None before the first successful call."""
+        with self._lock:
+            return self._state(model).latency_ewma
+
+
+def wait_unless_rate_limited(
+    default_wait: Callable, rate_limited_wait: float = 1.0, quick_retry_errors: Tuple[type, ...] = ()
+) -> Callable:
+    """
+    Tenacity wait strategy that skips the long backoff after a 429. The limiter
+    already holds the throttled model back, so the retry only needs to queue again.
+    Errors in quick_retry_errors, which say nothing about the provider's health,
+    get the same short wait.
+    """
+    def wait(retry_state) -> float:
+        error = retry_state.outcome.exception() if retry_state.outcome else None
+        if isinstance(error, (RateLimitedError, *quick_retry_errors)):
+            return rate_limited_wait
+        return default_wait(retry_state)
+    return wait
+
+
+def stop_unless_rate_limited(
+    max_attempts: int, max_rate_limited: int = 50, rate_limited_timeout: float = 600.0
+) -> Callable:
+    """
+    Tenacity stop strategy that does not count 429s against max_attempts. The
+    limiter already holds a throttled model back, so a run of 429s means waiting
+    rather than a broken request; they get their own budget of max_rate_limited
+    attempts within rate_limited_timeout seconds.
+    """
+    def stop(retry_state) -> bool:
+        error = retry_state.outcome.exception() if retry_state.outcome else None
+        rate_limited = getattr(retry_state, "rate_limited_attempts", 0)
+        if isinstance(error, RateLimitedError):
+            rate_limited += 1
+            retry_state.rate_limited_attempts = rate_limited
+            return rate_limited >= max_rate_limited or (retry_state.seconds_since_start or 0) >= rate_limited_timeout
+        return retry_state.attempt_number - rate_limited >= max_attempts
+    return stop
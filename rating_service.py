@@ -0,0 +1,322 @@
+"""
+Incremental leaderboard over the results index.
+
+The service keeps a snapshot of the sufficient statistics for the ratings (the
+weighted win matrix) together with a watermark of the last ingested debate. Each
+applied debate's votes, needed to undo them if the debate changes, go to an
+append-only log next to the snapshot. A refresh syncs the folder into the index,
+applies only debates completed since the watermark, appends their votes and
+warm-starts the Bradley-Terry fit, so refreshing during a live tournament costs
+O(new debates) plus O(models^2) for the matrix.
+
+    python rating_service.py debate_test_judges --interval 30
+"""
+import argparse
+from dataclasses import dataclass, field
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from elo_count import compute_elo_ratings
+from models import DebateOutcome, write_json_atomically
+from ratings import BASE_RATING, ModelRating, fit_bradley_terry
+from results_index import DEFAULT_INDEX_PATH, ResultsIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = Path(".cache") / "rating_snapshot.json"
+
+# The votes log is rewritten once it holds more than this many entries per debate,
+# plus VOTES_LOG_SLACK, since re-ingested debates leave superseded entries behind
+VOTES_LOG_COMPACT_FACTOR = 2
+VOTES_LOG_SLACK = 1000
+
+Vote = Tuple[str, str, float]
+
+
+def get_votes(debate: DebateOutcome) -> List[Vote]:
+    """(winner, loser, weight) for each judge result, weighted as in ratings.collect_votes."""
+    votes = []
+    for result in debate.judge_results:
+        weight = result.confidence / 100 * debate.panel_scale
+        if result.winner == "proposition":
+            votes.append((debate.proposition_model, debate.opposition_model, weight))
+        else:
+            votes.append((debate.opposition_model, debate.proposition_model, weight))
+    return votes
+
+
+@dataclass
+class RatingSnapshot:
+    folder: str
+    watermark: float = 0.0
+    models: List[str] = field(default_factory=list)
+    wins: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))
+    votes: Dict[str, List[Vote]] = field(default_factory=dict)
+    bradley_terry: Dict[str, float] = field(default_factory=dict)
+    elo: Dict[str, float] = field(default_factory=dict)
+    # Bytes of the votes log that this snapshot's matrix includes, and which
+    # rewrite of the log that is
+    votes_log_size: int = 0
+    votes_log_generation: int = 0
+
+    def __post_init__(self):
+        self.model_ids = {model: i for i, model in enumerate(self.models)}
+
+    def get_model_id(self, model: str) -> int:
+        if model not in self.model_ids:
+            self.model_ids[model] = len(self.models)
+            self.models.append(model)
+            n = len(self.models)
+            wins = np.zeros((n, n))
+            wins[:n - 1, :n - 1] = self.wins
+            self.wins = wins
+        return self.model_ids[model]
+
+    def add_votes(self, votes: List[Vote], sign: float = 1.0) -> None:
+        for winner, loser, weight in votes:
+            winner_id, loser_id = self.get_model_id(winner), self.get_model_id(loser)
+            self.wins[winner_id, loser_id] += sign * weight
+
+    def to_dict(self) -> dict:
+        return {
+            "folder": self.folder,
+            "watermark": self.watermark,
+            "models": self.models,
+            "wins": self.wins.tolist(),
+            "bradley_terry": self.bradley_terry,
+            "elo": self.elo,
+            "votes_log_size": self.votes_log_size,
+            "votes_log_generation": self.votes_log_generation,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RatingSnapshot":
+        n = len(data["models"])
+        return cls(
+            folder=data["folder"],
+            watermark=data["watermark"],
+            models=list(data["models"]),
+            wins=np.asarray(data["wins"], dtype=np.float64).reshape(n, n),
+            # Older snapshots kept the votes inline
+            votes={path: [tuple(vote) for vote in votes] for path, votes in data.get("votes", {}).items()},
+            bradley_terry=data["bradley_terry"],
+            elo=data["elo"],
+            votes_log_size=data.get("votes_log_size", 0),
+            votes_log_generation=data.get("votes_log_generation", 0),
+        )
+
+
+def get_votes_log_path(snapshot_path: Union[str, Path], generation: int = 0) -> Path:
+    """Each rewrite of the log gets a new file, so the snapshot always names one that matches it."""
+    suffix = f".votes.{generation}.jsonl" if generation else ".votes.jsonl"
+    return Path(snapshot_path).with_suffix(suffix)
+
+
+class RatingService:
+    """
+    Keeps ratings for one folder up to date from the results index.
+
+    Bradley-Terry ratings are exact: a debate whose file changed is re-ingested by
+    the index, its old votes are subtracted and the new ones added. Sequential Elo
+    is order-dependent and cannot be undone, so it only applies debates the first
+    time they are seen. Deleted debates are only dropped by rebuild().
+    """
+
+    def __init__(
+        self,
+        folder: Union[str, Path],
+        index: Optional[ResultsIndex] = None,
+        snapshot_path: Union[str, Path] = DEFAULT_SNAPSHOT_PATH,
+        k_factor: int = 32,
+        prior: float = 0.5,
+    ):
+        self.folder = Path(folder)
+        self.index = index or ResultsIndex()
+        self.snapshot_path = Path(snapshot_path)
+        self.k_factor = k_factor
+        self.prior = prior
+        # Votes applied since the last save, not yet in the log
+        self._unsaved_votes: Dict[str, List[Vote]] = {}
+        self._votes_log_entries = 0
+        self.snapshot = self._load_snapshot()
+
+    @property
+    def votes_log_path(self) -> Path:
+        return get_votes_log_path(self.snapshot_path, self.snapshot.votes_log_generation)
+
+    def _remove_votes_logs(self) -> None:
+        for path in self.snapshot_path.parent.glob(self.snapshot_path.stem + ".votes*.jsonl"):
+            path.unlink(missing_ok=True)
+
+    def _load_snapshot(self) -> RatingSnapshot:
+        if self.snapshot_path.exists():
+            try:
+                with open(self.snapshot_path) as f:
+                    snapshot = RatingSnapshot.from_dict(json.load(f))
+                if snapshot.folder == str(self.folder):
+                    if snapshot.votes:
+                        self._unsaved_votes = dict(snapshot.votes)
+                    else:
+                        log_path = get_votes_log_path(self.snapshot_path, snapshot.votes_log_generation)
+                        snapshot.votes = self._load_votes_log(log_path, snapshot.votes_log_size)
+                    return snapshot
+                logger.info(f"Snapshot {self.snapshot_path} is for {snapshot.folder}, starting over")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Could not load rating snapshot {self.snapshot_path}, starting over: {e}")
+        self._remove_votes_logs()
+        return RatingSnapshot(folder=str(self.folder))
+
+    def _load_votes_log(self, log_path: Path, size: int) -> Dict[str, List[Vote]]:
+        """
+        Replays the votes log up to the size the snapshot recorded; later entries
+        for a debate replace earlier ones. Lines past that size were written by a
+        save that did not finish, so the matrix does not include them, and are cut off.
+        """
+        if size == 0:
+            log_path.unlink(missing_ok=True)
+            return {}
+        if not log_path.exists() or log_path.stat().st_size < size:
+            raise ValueError(f"{log_path} is shorter than its snapshot recorded")
+        with open(log_path, "r+b") as f:
+            data = f.read(size)
+            f.truncate(size)
+        votes: Dict[str, List[Vote]] = {}
+        lines = data.splitlines()
+        for line in lines:
+            entry = json.loads(line)
+            votes[entry["path"]] = [tuple(vote) for vote in entry["votes"]]
+        self._votes_log_entries = len(lines)
+        return votes
+
+    def _write_votes(self, votes: Dict[str, List[Vote]], mode: str) -> None:
+        with open(self.votes_log_path, mode) as f:
+            for path, debate_votes in votes.items():
+                f.write((json.dumps({"path": path, "votes": debate_votes}) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            self.snapshot.votes_log_size = f.tell()
+
+    def save(self) -> None:
+        """
+        Appends the votes applied since the last save to the log, then writes the
+        snapshot. Once superseded entries pile up, the log is instead rewritten from
+        the current votes into a new file, and the old one is removed after the
+        snapshot naming the new one is in place.
+        """
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        stale_log = None
+        if self._unsaved_votes:
+            entries = self._votes_log_entries + len(self._unsaved_votes)
+            if entries > VOTES_LOG_COMPACT_FACTOR * len(self.snapshot.votes) + VOTES_LOG_SLACK:
+                stale_log = self.votes_log_path
+                self.snapshot.votes_log_generation += 1
+                self._write_votes(self.snapshot.votes, "wb")
+                self._votes_log_entries = len(self.snapshot.votes)
+            else:
+                self._write_votes(self._unsaved_votes, "ab")
+                self._votes_log_entries = entries
+            self._unsaved_votes = {}
+        write_json_atomically(self.snapshot_path, self.snapshot.to_dict())
+        if stale_log is not None:
+            stale_log.unlink(missing_ok=True)
+            logger.info(f"Rewrote the votes log as {self.votes_log_path} with {self._votes_log_entries} entries")
+
+    def rebuild(self) -> int:
+        """Discards the snapshot and replays every completed debate in the index."""
+        self._remove_votes_logs()
+        self.snapshot = RatingSnapshot(folder=str(self.folder))
+        self._unsaved_votes = {}
+        self._votes_log_entries = 0
+        return self.refresh()
+
+    def refresh(self, sync: bool = True) -> int:
+        """Applies debates completed since the watermark and returns how many were applied."""
+        if sync:
+            self.index.sync(self.folder)
+
+        snapshot = self.snapshot
+        new_debates: List[DebateOutcome] = []
+        changed = 0
+        for ingested_at, debate in self.index.iter_completed_since(snapshot.watermark, self.folder):
+            previous = snapshot.votes.get(debate.path)
+            if previous is not None:
+                snapshot.add_votes(previous, sign=-1.0)
+            else:
+                new_debates.append(debate)
+            votes = get_votes(debate)
+            snapshot.add_votes(votes)
+            snapshot.votes[debate.path] = votes
+            self._unsaved_votes[debate.path] = votes
+            snapshot.watermark = max(snapshot.watermark, ingested_at)
+            changed += 1
+
+        applied = len(new_debates)
+        if changed:
+            snapshot.elo = compute_elo_ratings(new_debates, k_factor=self.k_factor, ratings=snapshot.elo)
+            initial = np.array([snapshot.bradley_terry.get(model, BASE_RATING) for model in snapshot.models])
+            ratings = fit_bradley_terry(snapshot.wins, prior=self.prior, initial_ratings=initial)
+            snapshot.bradley_terry = dict(zip(snapshot.models, ratings.tolist()))
+            self.save()
+        logger.info(f"Applied {applied} new and {changed - applied} changed debates, watermark {snapshot.watermark}")
+        return applied
+
+    def get_leaderboard(self) -> List[ModelRating]:
+        wins = self.snapshot.wins
+        total_wins = wins.sum(axis=1)
+        total_games = total_wins + wins.sum(axis=0)
+        ratings = [
+            ModelRating(
+                model=model,
+                rating=self.snapshot.bradley_terry.get(model, BASE_RATING),
+                lower=None,
+                upper=None,
+                wins=float(total_wins[i]),
+                games=float(total_games[i]),
+            )
+            for i, model in enumerate(self.snapshot.models)
+        ]
+        return sorted(ratings, key=lambda rating: rating.rating, reverse=True)
+
+    def run(self, interval: float = 30.0, stop_event: Optional[threading.Event] = None) -> None:
+        """Polls the folder every interval seconds until stop_event is set."""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            if self.refresh():
+                for rating in self.get_leaderboard():
+                    logger.info(f"{rating.model}: {rating.rating:.1f} (elo {self.snapshot.elo.get(rating.model, BASE_RATING):.1f})")
+            stop_event.wait(interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Keep a leaderboard up to date as debates complete")
+    parser.add_argument("folder", nargs="?", type=Path, default=Path("debate_test_judges"))
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX_PATH)
+    parser.add_argument("--snapshot", type=Path, default=DEFAULT_SNAPSHOT_PATH)
+    parser.add_argument("--interval", type=float, default=None, help="Keep polling every N seconds")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the snapshot and replay everything")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    service = RatingService(args.folder, index=ResultsIndex(args.index), snapshot_path=args.snapshot)
+    if args.rebuild:
+        service.rebuild()
+    if args.interval:
+        try:
+            service.run(args.interval)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    service.refresh()
+    for rating in service.get_leaderboard():
+        print(f"{rating.model}: {rating.rating:.1f} (elo {service.snapshot.elo.get(rating.model, BASE_RATING):.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+Batch rating engine for judged debates.
+
+Bradley-Terry ratings are fitted in one solve over a confidence-weighted win
+matrix, so the ranking does not depend on the order debates are read in.
+Bootstrap confidence intervals resample whole debates and are spread across
+worker processes. The sequential Elo pass from elo_count is kept as a method
+for comparison, along with an order-independent variant that averages it over
+many random orderings of the debates.
+
+    python ratings.py debate_test_judges --bootstrap 1000
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+import corpus_loader
+from elo_count import compute_elo_ratings, get_debate_result, get_rating_changes
+from models import DebateOutcome
+from results_index import DEFAULT_INDEX_PATH, ResultsIndex
+
+logger = logging.getLogger(__name__)
+
+BASE_RATING = 1200.0
+RATING_SCALE = 400.0
+
+
+class ModelRating(NamedTuple):
+    model: str
+    rating: float
+    lower: Optional[float]
+    upper: Optional[float]
+    wins: float
+    games: float
+
+
+class JudgeVotes(NamedTuple):
+    """One row per judge result: who beat whom, with what weight, in which debate."""
+    models: List[str]
+    winners: np.ndarray
+    losers: np.ndarray
+    weights: np.ndarray
+    debates: np.ndarray
+    num_debates: int
+
+
+def collect_votes(debates: Iterable[DebateOutcome]) -> JudgeVotes:
+    """
+    Flattens debate outcomes into index arrays; each vote is weighted by confidence / 100,
+    scaled up for early-stopped panels so every debate carries its full panel's weight.
+    """
+    model_ids: Dict[str, int] = {}
+    winners: List[int] = []
+    losers: List[int] = []
+    weights: List[float] = []
+    debate_ids: List[int] = []
+    num_debates = 0
+
+    for debate in debates:
+        if not debate.judge_results:
+            continue
+        proposition = model_ids.setdefault(debate.proposition_model, len(model_ids))
+        opposition = model_ids.setdefault(debate.opposition_model, len(model_ids))
+        for result in debate.judge_results:
+            if result.winner == "proposition":
+                winners.append(proposition)
+                losers.append(opposition)
+            else:
+                winners.append(opposition)
+                losers.append(proposition)
+            weights.append(result.confidence / 100 * debate.panel_scale)
+            debate_ids.append(num_debates)
+        num_debates += 1
+
+    return JudgeVotes(
+        models=list(model_ids),
+        winners=np.asarray(winners, dtype=np.int64),
+        losers=np.asarray(losers, dtype=np.int64),
+        weights=np.asarray(weights, dtype=np.float64),
+        debates=np.asarray(debate_ids, dtype=np.int64),
+        num_debates=num_debates,
+    )
+
+
+def get_win_matrix(votes: JudgeVotes, debate_counts: Optional[np.ndarray] = None) -> np.ndarray:
+    """wins[i, j] is the weighted number of votes model i won against model j."""
+    n = len(votes.models)
+    weights = votes.weights
+    if debate_counts is not None:
+        weights = weights * debate_counts[votes.debates]
+    flat = np.bincount(votes.winners * n + votes.losers, weights=weights, minlength=n * n)
+    return flat.reshape(n, n)
+
+
+def fit_bradley_terry(
+    wins: np.ndarray,
+    prior: float = 0.5,
+    max_iterations: int = 10000,
+    tolerance: float = 1e-6,
+    initial_ratings: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Fits Bradley-Terry strengths with the MM algorithm (Hunter, 2004) and returns
+    them on the Elo scale, centred on 1200.
+
+    prior adds that many pseudo-wins in each direction of every pair that has met,
+    which keeps unbeaten and winless models finite. initial_ratings warm-starts the
+    fit from a previous solution, which converges in a few iterations after a small
+    update.
+    """
+    n = wins.shape[0]
+    if n == 0:
+        return np.zeros(0)
+
+    games = wins + wins.T
+    wins = wins + prior * (games > 0)
+    games = wins + wins.T
+    total_wins = wins.sum(axis=1)
+
+    strengths = np.ones(n)
+    if initial_ratings is not None:
+        strengths = 10 ** ((np.asarray(initial_ratings, dtype=np.float64) - BASE_RATING) / RATING_SCALE)
+    for _ in range(max_iterations):
+        denominators = (games / (strengths[:, None] + strengths[None, :])).sum(axis=1)
+        updated = np.where(denominators > 0, total_wins / np.where(denominators > 0, denominators, 1), 1.0)
+        updated /= np.exp(np.log(updated).mean())
+        converged = np.max(np.abs(np.log(updated) - np.log(strengths))) < tolerance
+        strengths = updated
+        if converged:
+            break
+    else:
+        logger.warning(f"Bradley-Terry fit did not converge in {max_iterations} iterations")
+
+    return BASE_RATING + RATING_SCALE * np.log10(strengths)
+
+
+def _bootstrap_ratings(votes: JudgeVotes, samples: int, seed: np.random.SeedSequence, prior: float) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    ratings = np.empty((samples, len(votes.models)))
+    for sample in range(samples):
+        resampled = rng.integers(0, votes.num_debates, size=votes.num_debates)
+        debate_counts = np.bincount(resampled, minlength=votes.num_debates)
+        ratings[sample] = fit_bradley_terry(get_win_matrix(votes, debate_counts), prior=prior)
+    return ratings
+
+
+def bootstrap_ratings(
+    votes: JudgeVotes,
+    samples: int,
+    processes: Optional[int] = None,
+    seed: Optional[int] = None,
+    prior: float = 0.5,
+) -> np.ndarray:
+    """Refits on debates resampled with replacement; returns a (samples, models) array."""
+    processes = processes or os.cpu_count() or 1
+    processes = max(1, min(processes, samples))
+    chunks = [samples // processes + (1 if i < samples % processes else 0) for i in range(processes)]
+    seeds = np.random.SeedSequence(seed).spawn(processes)
+
+    if processes == 1:
+        return _bootstrap_ratings(votes, samples, seeds[0], prior)
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            executor.submit(_bootstrap_ratings, votes, chunk, chunk_seed, prior)
+            for chunk, chunk_seed in zip(chunks, seeds)
+        ]
+        return np.concatenate([future.result() for future in futures])
+
+
+class EloGames(NamedTuple):
+    """Decisive debates as index arrays for the vectorized Elo pass."""
+    models: List[str]
+    propositions: np.ndarray
+    oppositions: np.ndarray
+    proposition_won: np.ndarray
+    confidences: np.ndarray
+
+
+def collect_elo_games(debates: Iterable[DebateOutcome]) -> EloGames:
+    model_ids: Dict[str, int] = {}
+    propositions: List[int] = []
+    oppositions: List[int] = []
+    proposition_won: List[bool] = []
+    confidences: List[float] = []
+
+    for debate in debates:
+        proposition = model_ids.setdefault(debate.proposition_model, len(model_ids))
+        opposition = model_ids.setdefault(debate.opposition_model, len(model_ids))
+        result = get_debate_result(debate)
+        if result is None:
+            continue
+        propositions.append(proposition)
+        oppositions.append(opposition)
+        proposition_won.append(result[0])
+        confidences.append(result[1])
+
+    return EloGames(
+        models=list(model_ids),
+        propositions=np.asarray(propositions, dtype=np.int64),
+        oppositions=np.asarray(oppositions, dtype=np.int64),
+        proposition_won=np.asarray(proposition_won, dtype=np.float64),
+        confidences=np.asarray(confidences, dtype=np.float64),
+    )
+
+
+def _permutation_elo(games: EloGames, permutations: int, seed: np.random.SeedSequence, k_factor: int) -> np.ndarray:
+    # One row of ratings per ordering; each step applies the t-th debate of every ordering at once
+    rng = np.random.default_rng(seed)
+    num_games = len(games.propositions)
+    orders = rng.permuted(np.tile(np.arange(num_games, dtype=np.int32), (permutations, 1)), axis=1)
+    ratings = np.full((permutations, len(games.models)), BASE_RATING)
+    rows = np.arange(permutations)
+
+    for step in range(num_games):
+        games_at_step = orders[:, step]
+        propositions = games.propositions[games_at_step]
+        oppositions = games.oppositions[games_at_step]
+        proposition_change, opposition_change = get_rating_changes(
+            ratings[rows, propositions],
+            ratings[rows, oppositions],
+            games.proposition_won[games_at_step],
+            games.confidences[games_at_step],
+            k_factor,
+        )
+        ratings[rows, propositions] += proposition_change
+        ratings[rows, oppositions] += opposition_change
+    return ratings
+
+
+def permutation_elo(
+    games: EloGames,
+    permutations: int,
+    processes: Optional[int] = None,
+    seed: Optional[int] = None,
+    k_factor: int = 32,
+    max_chunk_entries: int = 1 << 25,
+) -> np.ndarray:
+    """
+    Sequential Elo over random orderings of the games; returns a (permutations, models) array.
+
+    Orderings are processed in chunks as wide as possible, so the per-step NumPy overhead is
+    shared by many orderings, while each chunk's order matrix stays under max_chunk_entries.
+    """
+    processes = max(1, min(processes or os.cpu_count() or 1, permutations))
+    chunk_size = max(1, min(-(-permutations // processes), max_chunk_entries // max(1, len(games.propositions))))
+    chunks = [min(chunk_size, permutations - start) for start in range(0, permutations, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    if processes == 1 or len(chunks) == 1:
+        return np.concatenate([
+            _permutation_elo(games, chunk, chunk_seed, k_factor) for chunk, chunk_seed in zip(chunks, seeds)
+        ])
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            executor.submit(_permutation_elo, games, chunk, chunk_seed, k_factor)
+            for chunk, chunk_seed in zip(chunks, seeds)
+        ]
+        return np.concatenate([future.result() for future in futures])
+
+
+def compute_ratings(
+    debates: Iterable[DebateOutcome],
+    method: str = "bradley_terry",
+    bootstrap: int = 0,
+    confidence_level: float = 0.95,
+    processes: Optional[int] = None,
+    seed: Optional[int] = None,
+    prior: float = 0.5,
+    k_factor: int = 32,
+    permutations: int = 1000,
+) -> List[ModelRating]:
+    """
+    Rates every model that appears in the debates, best first.
+
+    Args:
+        debates: Debate outcomes, e.g. from ResultsIndex.iter_outcomes or corpus_loader.iter_outcomes.
+        method: "bradley_terry" for the batch fit, "elo" for the sequential, order-dependent pass,
+            or "elo_permutations" for the mean Elo over random orderings, with its spread as the interval.
+        bootstrap: Number of bootstrap resamples for confidence intervals (Bradley-Terry only).
+        confidence_level: Width of the bootstrap or permutation interval.
+        processes: Worker processes for the bootstrap or permutations; defaults to the CPU count.
+        permutations: Number of orderings for "elo_permutations".
+    """
+    if method not in ("bradley_terry", "elo", "elo_permutations"):
+        raise ValueError(f"Unknown rating method: {method}")
+
+    debates = list(debates) if method != "bradley_terry" else debates
+    votes = collect_votes(debates)
+    wins = get_win_matrix(votes)
+    total_wins = wins.sum(axis=1)
+    total_games = total_wins + wins.sum(axis=0)
+
+    alpha = (1 - confidence_level) / 2
+    lower = upper = None
+    if method == "elo":
+        elo = compute_elo_ratings(debates, k_factor=k_factor)
+        ratings = np.array([elo[model] for model in votes.models])
+    elif method == "elo_permutations":
+        games = collect_elo_games(debates)
+        samples = permutation_elo(games, permutations, processes=processes, seed=seed, k_factor=k_factor)
+        # Tied debates still introduce a model at the starting rating, so map by name
+        game_columns = {model: i for i, model in enumerate(games.models)}
+        columns = [game_columns[model] for model in votes.models]
+        ratings = samples.mean(axis=0)[columns]
+        lower, upper = np.quantile(samples, [alpha, 1 - alpha], axis=0)[:, columns]
+    else:
+        ratings = fit_bradley_terry(wins, prior=prior)
+
+    if bootstrap and method == "bradley_terry" and votes.num_debates:
+        samples = bootstrap_ratings(votes, bootstrap, processes=processes, seed=seed, prior=prior)
+        lower, upper = np.quantile(samples, [alpha, 1 - alpha], axis=0)
+    elif bootstrap and method != "bradley_terry":
+        logger.warning("Bootstrap intervals are only computed for the Bradley-Terry method")
+
+    results = [
+        ModelRating(
+            model=model,
+            rating=float(ratings[i]),
+            lower=float(lower[i]) if lower is not None else None,
+            upper=float(upper[i]) if upper is not None else None,
+            wins=float(total_wins[i]),
+            games=float(total_games[i]),
+        )
+        for i, model in enumerate(votes.models)
+    ]
+    return sorted(results, key=lambda rating: rating.rating, reverse=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rate models from judged debates")
+    parser.add_argument("folder", nargs="?", type=Path, default=Path("debate_test_judges"))
+    parser.add_argument("--method", choices=["bradley_terry", "elo", "elo_permutations"], default="bradley_terry")
+    parser.add_argument("--bootstrap", type=int, default=0, help="Bootstrap resamples for confidence intervals")
+    parser.add_argument("--permutations", type=int, default=1000, help="Orderings for elo_permutations")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX_PATH)
+    parser.add_argument("--stream", action="store_true", help="Stream the JSON files instead of using the index")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.stream:
+        outcomes = corpus_loader.iter_outcomes(args.folder)
+    else:
+        index = ResultsIndex(args.index)
+        index.sync(args.folder)
+        outcomes = index.iter_outcomes(args.folder)
+
+    for rating in compute_ratings(
+        outcomes,
+        method=args.method,
+        bootstrap=args.bootstrap,
+        processes=args.processes,
+        seed=args.seed,
+        permutations=args.permutations,
+    ):
+        interval = f" [{rating.lower:.1f}, {rating.upper:.1f}]" if rating.lower is not None else ""
+        print(f"{rating.model}: {rating.rating:.1f}{interval} ({rating.wins:.1f} / {rating.games:.1f})")
+
+
+if __name__ == "__main__":
+    main()
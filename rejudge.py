@@ -0,0 +1,221 @@
+"""
+Rejudges stored debates without rerunning them.
+
+Stored DebateTotal files are streamed and every (debate, judge, prompt version)
+combination that is missing is requested. Adding a judge to judge_models.json or
+changing judging_prompt in debate_prompts.yaml therefore only costs the new judge
+calls. Debates are judged many at a time through one OpenRouterClient, so the
+rate limits and budget hold across the whole job, and each debate is written
+back atomically once its judges have answered. A judge's result under an older
+prompt version is moved to superseded_judge_results.
+
+    python rejudge.py debate_test_judges
+    python rejudge.py debate_test_judges --models openai/gpt-4o --dry-run
+"""
+import argparse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Set, Union
+
+from dotenv import load_dotenv
+
+from corpus_loader import iter_projections
+from cost_engine import CostEngine
+from debate_journal import get_journal_path
+from debate_prompts import get_debate_prompt
+from models import DebatePrompts, DebateTotal, get_prompt_version
+from openrouter_client import OpenRouterClient
+from rate_limiter import ModelRateLimiter
+from response_cache import ResponseCache
+from review_queue import ReviewQueue, get_review_queue
+from run_debate import run_judge_panel
+from telemetry import bind_context, span, start_telemetry_from_env
+
+logger = logging.getLogger(__name__)
+
+REJUDGE_FIELDS = (
+    "prompts.judge_prompt",
+    "judge_results.model",
+    "judge_results.prompt_version",
+    "proposition_output.speeches",
+    "opposition_output.speeches",
+    "skipped_judges",
+)
+
+
+class RejudgeTask(NamedTuple):
+    path: str
+    judge_models: List[str]
+
+
+def find_missing_judgements(
+    folder: Union[str, Path],
+    judge_models: List[str],
+    prompt_version: str,
+    processes: Optional[int] = None,
+    review_queue: Optional[ReviewQueue] = None,
+) -> Iterator[RejudgeTask]:
+    """
+    Streams the folder and yields the judges each finished debate lacks under
+    prompt_version. Debates still being written, judges waiting in the review queue
+    and judges an adaptive panel skipped are left out.
+    """
+    review_queue = review_queue or get_review_queue()
+    for projection in iter_projections(folder, REJUDGE_FIELDS, processes=processes):
+        path = projection["path"]
+        speeches = [
+            *(projection["proposition_output.speeches"] or {}).values(),
+            *(projection["opposition_output.speeches"] or {}).values(),
+        ]
+        if len(speeches) != 6 or -1 in speeches or get_journal_path(path).exists():
+            continue
+
+        stored_version = get_prompt_version(projection["prompts.judge_prompt"] or "")
+        judged = {
+            model
+            for model, version in zip(
+                projection["judge_results.model"] or [], projection["judge_results.prompt_version"] or []
+            )
+            if (version or stored_version) == prompt_version
+        }
+        left_out = set(review_queue.get_pending_judges(path)) | set(projection["skipped_judges"] or [])
+        missing = [model for model in judge_models if model not in judged and model not in left_out]
+        if missing:
+            yield RejudgeTask(path=path, judge_models=missing)
+
+
+def rejudge_debate(
+    task: RejudgeTask,
+    prompts: DebatePrompts,
+    client: OpenRouterClient,
+    cache: Optional[ResponseCache] = None,
+    review_queue: Optional[ReviewQueue] = None,
+    structured: bool = False,
+) -> int:
+    """Judges one debate with the missing judges, saves it and returns how many results were added."""
+    debate = DebateTotal.load_from_json(task.path)
+    debate.path_to_store = Path(task.path)
+    judged_before = len(debate.judge_results)
+
+    error = None
+    try:
+        with span("rejudge", path=str(task.path)):
+            run_judge_panel(
+                debate=debate,
+                prompts=prompts,
+                judge_models=task.judge_models,
+                client=client,
+                cache=cache,
+                review_queue=review_queue,
+                structured=structured,
+            )
+    except Exception as e:
+        error = e
+
+    # Keep whatever the panel returned, even if one of its judges failed
+    new_results = debate.judge_results[judged_before:]
+    debate.judge_results = debate.judge_results[:judged_before]
+    for result in new_results:
+        debate.replace_judge_result(result)
+    debate.save_to_json()
+
+    if error is not None:
+        raise error
+    return len(new_results)
+
+
+def rejudge_folder(
+    folder: Union[str, Path],
+    judge_models: List[str],
+    prompts: DebatePrompts,
+    client: Optional[OpenRouterClient] = None,
+    cache: Optional[ResponseCache] = None,
+    review_queue: Optional[ReviewQueue] = None,
+    max_concurrent_debates: int = 8,
+    processes: Optional[int] = None,
+    structured: bool = False,
+    budget: Optional[CostEngine] = None,
+) -> dict:
+    """
+    Rejudges every debate in the folder that lacks a judge under the current
+    prompt version. At most max_concurrent_debates debates are in flight, and new
+    ones are read from disk only as earlier ones finish. Stops starting debates
+    once the budget's soft limit is reached or a call was refused.
+    """
+    client = client or OpenRouterClient(limiter=ModelRateLimiter(), budget=budget)
+    review_queue = review_queue or get_review_queue()
+    prompt_version = get_prompt_version(prompts.judge_prompt)
+    summary = {"prompt_version": prompt_version, "debates": 0, "judgements": 0, "failed_debates": 0}
+
+    tasks = find_missing_judgements(folder, judge_models, prompt_version, processes, review_queue)
+    in_flight: Set[Future] = set()
+
+    def collect(done: Set[Future]) -> None:
+        for future in done:
+            try:
+                summary["judgements"] += future.result()
+            except Exception as e:
+                logger.error(f"Rejudging failed: {e}")
+                summary["failed_debates"] += 1
+
+    with ThreadPoolExecutor(max_workers=max_concurrent_debates) as executor:
+        for task in tasks:
+            if budget is not None and (budget.is_soft_limit_reached() or budget.refused_calls):
+                logger.warning(f"Budget limit reached (${budget.spent:.4f} spent), not starting more debates")
+                break
+            if len(in_flight) >= max_concurrent_debates:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            logger.info(f"Rejudging {task.path} with {', '.join(task.judge_models)}")
+            in_flight.add(executor.submit(bind_context(rejudge_debate), task, prompts, client, cache, review_queue, structured))
+            summary["debates"] += 1
+        collect(wait(in_flight).done)
+
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Judge stored debates with new judges or a new judging prompt")
+    parser.add_argument("folder", nargs="?", type=Path, default=Path("debate_test_judges"))
+    parser.add_argument("--judges", type=Path, default=Path("judge_models.json"), help="Judge pricing file")
+    parser.add_argument("--models", nargs="+", default=None, help="Judge models to use instead of --judges")
+    parser.add_argument("--concurrency", type=int, default=8, help="Debates judged at once")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes for reading the folder")
+    parser.add_argument("--structured", action="store_true", help="Ask judges for JSON verdicts")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the missing judgements")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    start_telemetry_from_env()
+    if args.models:
+        judge_models = args.models
+    else:
+        with open(args.judges) as f:
+            judge_models = list(json.load(f))
+    prompts = get_debate_prompt()
+
+    if args.dry_run:
+        prompt_version = get_prompt_version(prompts.judge_prompt)
+        for task in find_missing_judgements(args.folder, judge_models, prompt_version, args.processes):
+            print(f"{task.path}\t{','.join(task.judge_models)}")
+        return
+
+    summary = rejudge_folder(
+        args.folder,
+        judge_models,
+        prompts,
+        cache=ResponseCache.from_env(),
+        max_concurrent_debates=args.concurrency,
+        processes=args.processes,
+        structured=args.structured or os.environ.get("DEBATEBET_STRUCTURED_JUDGING") == "1",
+        budget=CostEngine.from_env(),
+    )
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    main()
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Union
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Marks judge usage dicts that were served from the cache rather than paid for
+CACHE_HIT_KEY = "cache_hit"
+
+DEFAULT_CACHE_PATH = Path(".cache") / "responses.sqlite"
+
+
+def get_request_key(payload: dict, scope: Optional[str] = None) -> str:
+    """
+    Content address of a chat completion request: a hash of the canonical JSON of
+    the payload (model, messages, provider options). scope keeps otherwise equal
+    requests apart, e.g. two debates whose opening speeches share a motion.
+    """
+    canonical = json.dumps(
+        {"scope": scope, "payload": payload},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk cache of successful chat completion responses.
+
+    Responses are stored zlib-compressed in a single SQLite file and evicted
+    least-recently-used once the store grows past max_bytes, or once they are
+    older than max_age_days. With bypass set, lookups always miss but fresh
+    responses are still stored, so a forced rerun refreshes the cache. Without
+    wal, SQLite's rollback journal is used, so processes on different machines
+    can share the file over a network filesystem.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_CACHE_PATH,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age_days: float = 30,
+        bypass: bool = False,
+        evict_every: int = 100,
+        wal: bool = True,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self.bypass = bypass
+        self.evict_every = evict_every
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._connection.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+        self._connection.commit()
+        self.evict()
+
+    @classmethod
+    def from_env(cls, wal: bool = True) -> "ResponseCache":
+        """Builds the cache for a run; DEBATEBET_CACHE_BYPASS=1 skips lookups."""
+        return cls(
+            path=os.environ.get("DEBATEBET_CACHE_PATH", DEFAULT_CACHE_PATH),
+            bypass=os.environ.get("DEBATEBET_CACHE_BYPASS", "") not in ("", "0", "false"),
+            wal=wal,
+        )
+
+    def get(self, payload: dict, scope: Optional[str] = None) -> Optional[dict]:
+        if self.bypass:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        key = get_request_key(payload, scope)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._connection.commit()
+            self.hits += 1
+
+        logger.info(f"Response cache hit for model {payload.get('model')}")
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, payload: dict, response_json: dict, scope: Optional[str] = None) -> None:
+        key = get_request_key(payload, scope)
+        body = zlib.compress(json.dumps(response_json, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model, body, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload.get("model", ""), body, len(body), now, now),
+            )
+            self._connection.commit()
+            self.stores += 1
+            should_evict = self.stores % self.evict_every == 0
+
+        if should_evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drops expired entries, then least recently used ones until under max_bytes."""
+        with self._lock:
+            cutoff = time.time() - self.max_age_seconds
+            removed = self._connection.execute(
+                "DELETE FROM responses WHERE created_at < ?", (cutoff,)
+            ).rowcount
+
+            total = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                freed = 0
+                stale_keys = []
+                for key, size in self._connection.execute(
+                    "SELECT key, size FROM responses ORDER BY last_access"
+                ):
+                    stale_keys.append((key,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                self._connection.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+                removed += len(stale_keys)
+
+            self._connection.commit()
+            self.evictions += removed
+
+        if removed:
+            logger.info(f"Evicted {removed} cached responses")
+        return removed
+
+    def get_stats(self) -> Dict[str, Union[int, float]]:
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "entries": entries,
+                "size_bytes": size,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,324 @@
+"""
+SQLite index of the debate corpus, kept in sync with the JSON files.
+
+Analytics scripts query the index instead of loading every DebateTotal:
+
+    python results_index.py sync debate_test_judges
+    python results_index.py usage
+"""
+import argparse
+import hashlib
+import json
+import logging
+from pathlib import Path
+import sqlite3
+import time
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from models import DebateOutcome, DebateTotal, JudgeVerdict, ModelTokenUsage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = Path(".cache") / "results_index.sqlite"
+
+USAGE_FIELDS = list(ModelTokenUsage.model_fields)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS debates (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    folder TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    topic_description TEXT NOT NULL,
+    category TEXT NOT NULL,
+    proposition_model TEXT NOT NULL,
+    opposition_model TEXT NOT NULL,
+    complete INTEGER NOT NULL,
+    ingested_at REAL NOT NULL,
+    skipped_judges INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS debates_folder ON debates (folder);
+CREATE INDEX IF NOT EXISTS debates_models ON debates (proposition_model, opposition_model);
+CREATE INDEX IF NOT EXISTS debates_ingested_at ON debates (ingested_at);
+CREATE TABLE IF NOT EXISTS speeches (
+    debate_id INTEGER NOT NULL REFERENCES debates (id) ON DELETE CASCADE,
+    side TEXT NOT NULL,
+    speech_type TEXT NOT NULL,
+    content TEXT,
+    PRIMARY KEY (debate_id, side, speech_type)
+);
+CREATE TABLE IF NOT EXISTS judge_results (
+    debate_id INTEGER NOT NULL REFERENCES debates (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    winner TEXT NOT NULL,
+    confidence INTEGER NOT NULL,
+    logic TEXT NOT NULL,
+    PRIMARY KEY (debate_id, position)
+);
+CREATE INDEX IF NOT EXISTS judge_results_model ON judge_results (model);
+CREATE TABLE IF NOT EXISTS token_usage (
+    debate_id INTEGER NOT NULL REFERENCES debates (id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    model TEXT NOT NULL,
+    {", ".join(f"{field} INTEGER NOT NULL DEFAULT 0" for field in USAGE_FIELDS)},
+    PRIMARY KEY (debate_id, role, model)
+);
+"""
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultsIndex:
+    """
+    Debates, speeches, judge results and token usage from a folder of DebateTotal
+    files. sync() only parses files that are new or whose size, mtime and then
+    content hash changed, and drops rows for files that were deleted.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+        self._add_missing_columns()
+
+    def _add_missing_columns(self) -> None:
+        # Indexes built before a ModelTokenUsage field existed get the column added
+        existing = {row[1] for row in self.connection.execute("PRAGMA table_info(token_usage)")}
+        for field in USAGE_FIELDS:
+            if field not in existing:
+                self.connection.execute(f"ALTER TABLE token_usage ADD COLUMN {field} INTEGER NOT NULL DEFAULT 0")
+        existing = {row[1] for row in self.connection.execute("PRAGMA table_info(debates)")}
+        if "skipped_judges" not in existing:
+            self.connection.execute("ALTER TABLE debates ADD COLUMN skipped_judges INTEGER NOT NULL DEFAULT 0")
+        self.connection.commit()
+
+    def sync(self, folder: Union[str, Path], pattern: str = "*.json") -> Dict[str, int]:
+        folder = Path(folder)
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+        known = {
+            row[0]: (row[1], row[2], row[3], row[4])
+            for row in self.connection.execute(
+                "SELECT path, id, mtime, size, sha256 FROM debates WHERE folder = ?",
+                (str(folder),),
+            )
+        }
+        seen = set()
+
+        for file in sorted(folder.glob(pattern)):
+            key = str(file)
+            seen.add(key)
+            stat = file.stat()
+            previous = known.get(key)
+            if previous and previous[1] == stat.st_mtime and previous[2] == stat.st_size:
+                counts["unchanged"] += 1
+                continue
+
+            digest = hash_file(file)
+            if previous and previous[3] == digest:
+                # Touched but not changed
+                self.connection.execute(
+                    "UPDATE debates SET mtime = ?, size = ? WHERE id = ?",
+                    (stat.st_mtime, stat.st_size, previous[0]),
+                )
+                counts["unchanged"] += 1
+                continue
+
+            try:
+                debate = DebateTotal.load_from_json(file)
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Skipping {file}, could not parse it: {e}")
+                counts["failed"] += 1
+                continue
+
+            self._store(key, str(folder), stat.st_mtime, stat.st_size, digest, debate)
+            counts["updated" if previous else "added"] += 1
+
+        for key, (debate_id, *_) in known.items():
+            if key not in seen:
+                self.connection.execute("DELETE FROM debates WHERE id = ?", (debate_id,))
+                counts["removed"] += 1
+
+        self.connection.commit()
+        logger.info(f"Synced {folder} into {self.path}: {counts}")
+        return counts
+
+    def _store(self, key: str, folder: str, mtime: float, size: int, digest: str, debate: DebateTotal) -> None:
+        self.connection.execute("DELETE FROM debates WHERE path = ?", (key,))
+        cursor = self.connection.execute(
+            "INSERT INTO debates (path, folder, mtime, size, sha256, topic_description, category, "
+            "proposition_model, opposition_model, complete, ingested_at, skipped_judges) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                folder,
+                mtime,
+                size,
+                digest,
+                debate.motion.topic_description,
+                debate.motion.category.value,
+                debate.proposition_model,
+                debate.opposition_model,
+                int(not debate.get_missing_speeches() and bool(debate.judge_results)),
+                time.time(),
+                len(debate.skipped_judges),
+            ),
+        )
+        debate_id = cursor.lastrowid
+
+        self.connection.executemany(
+            "INSERT INTO speeches (debate_id, side, speech_type, content) VALUES (?, ?, ?, ?)",
+            [
+                (debate_id, output.side.value, speech_type.value, None if speech == -1 else speech)
+                for output in (debate.proposition_output, debate.opposition_output)
+                for speech_type, speech in output.speeches.items()
+            ],
+        )
+        self.connection.executemany(
+            "INSERT INTO judge_results (debate_id, position, model, winner, confidence, logic) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (debate_id, position, result.model, result.winner, result.confidence, result.logic)
+                for position, result in enumerate(debate.judge_results)
+            ],
+        )
+        self.connection.executemany(
+            f"INSERT INTO token_usage (debate_id, role, model, {', '.join(USAGE_FIELDS)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' for _ in USAGE_FIELDS)})",
+            [
+                (debate_id, role, model, *(getattr(usage, field) for field in USAGE_FIELDS))
+                for role, counts in (("debator", debate.debator_token_counts), ("judge", debate.judge_token_counts))
+                for model, usage in counts.model_usages.items()
+            ],
+        )
+
+    def iter_outcomes(self, folder: Optional[Union[str, Path]] = None) -> Iterator[DebateOutcome]:
+        """Judged debates with their verdicts, in path order."""
+        where = ""
+        params: tuple = ()
+        if folder is not None:
+            where = "WHERE d.folder = ? "
+            params = (str(Path(folder)),)
+        for _, outcome in self._iter_outcomes(where, params, "d.path"):
+            yield outcome
+
+    def iter_completed_since(
+        self, ingested_after: float, folder: Optional[Union[str, Path]] = None
+    ) -> Iterator[Tuple[float, DebateOutcome]]:
+        """(ingested_at, outcome) for complete debates ingested after the watermark, oldest first."""
+        where = "WHERE d.complete = 1 AND d.ingested_at > ? "
+        params: tuple = (ingested_after,)
+        if folder is not None:
+            where += "AND d.folder = ? "
+            params += (str(Path(folder)),)
+        yield from self._iter_outcomes(where, params, "d.ingested_at, d.path")
+
+    def _iter_outcomes(self, where: str, params: tuple, order_by: str) -> Iterator[Tuple[float, DebateOutcome]]:
+        query = (
+            "SELECT d.id, d.ingested_at, d.path, d.topic_description, d.proposition_model, d.opposition_model, "
+            "d.skipped_judges, j.model, j.winner, j.confidence "
+            "FROM debates d JOIN judge_results j ON j.debate_id = d.id "
+            f"{where}ORDER BY {order_by}, j.position"
+        )
+        current: Optional[DebateOutcome] = None
+        current_id = None
+        current_ingested_at = 0.0
+        for debate_id, ingested_at, path, topic, proposition, opposition, skipped, model, winner, confidence in self.connection.execute(query, params):
+            if debate_id != current_id:
+                if current is not None:
+                    yield current_ingested_at, current
+                current_id = debate_id
+                current_ingested_at = ingested_at
+                current = DebateOutcome(path, topic, proposition, opposition, [], skipped)
+            current.judge_results.append(JudgeVerdict(model, winner, confidence))
+        if current is not None:
+            yield current_ingested_at, current
+
+    def get_judge_results(self, folder: Optional[Union[str, Path]] = None) -> List[dict]:
+        query = (
+            "SELECT d.path, d.topic_description, "
+            "(SELECT COUNT(*) FROM token_usage t WHERE t.debate_id = d.id AND t.role = 'judge') AS judges, "
+            "j.model, j.winner, j.confidence "
+            "FROM debates d JOIN judge_results j ON j.debate_id = d.id "
+        )
+        params: tuple = ()
+        if folder is not None:
+            query += "WHERE d.folder = ? "
+            params = (str(Path(folder)),)
+        query += "ORDER BY d.path, j.position"
+        columns = ["path", "topic_description", "num_judges", "model", "winner", "confidence"]
+        return [dict(zip(columns, row)) for row in self.connection.execute(query, params)]
+
+    def get_judge_agreement(self) -> List[dict]:
+        """How often each judge sides with the majority of its panel."""
+        query = """
+            WITH majority AS (
+                SELECT debate_id,
+                       CASE WHEN SUM(winner = 'proposition') > SUM(winner = 'opposition') THEN 'proposition'
+                            WHEN SUM(winner = 'opposition') > SUM(winner = 'proposition') THEN 'opposition'
+                       END AS winner
+                FROM judge_results GROUP BY debate_id
+            )
+            SELECT j.model, COUNT(*), SUM(j.winner = m.winner), AVG(j.confidence)
+            FROM judge_results j JOIN majority m ON m.debate_id = j.debate_id
+            GROUP BY j.model ORDER BY j.model
+        """
+        return [
+            {"model": model, "verdicts": total, "agrees_with_majority": agreed or 0, "mean_confidence": mean}
+            for model, total, agreed, mean in self.connection.execute(query)
+        ]
+
+    def get_token_usage(self, role: Optional[str] = None) -> Dict[str, ModelTokenUsage]:
+        """Token usage summed per model across the corpus, optionally for one role."""
+        query = f"SELECT model, {', '.join(f'SUM({field})' for field in USAGE_FIELDS)} FROM token_usage "
+        params: tuple = ()
+        if role is not None:
+            query += "WHERE role = ? "
+            params = (role,)
+        query += "GROUP BY model ORDER BY model"
+        return {
+            row[0]: ModelTokenUsage(**dict(zip(USAGE_FIELDS, row[1:])))
+            for row in self.connection.execute(query, params)
+        }
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain and query the debate results index")
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX_PATH)
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    sync_parser = subcommands.add_parser("sync", help="Ingest new or changed debate files")
+    sync_parser.add_argument("folder", type=Path)
+    subcommands.add_parser("judges", help="Show how often each judge agrees with its panel")
+    usage_parser = subcommands.add_parser("usage", help="Show token usage per model")
+    usage_parser.add_argument("--role", choices=["debator", "judge"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    index = ResultsIndex(args.index)
+    if args.command == "sync":
+        print(index.sync(args.folder))
+    elif args.command == "judges":
+        for row in index.get_judge_agreement():
+            print(json.dumps(row))
+    elif args.command == "usage":
+        for model, usage in index.get_token_usage(args.role).items():
+            print(model, json.dumps(usage.model_dump()))
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Persisted queue of judge verdicts that could not be parsed automatically.
+
+A judgement that neither the tolerant parser nor a repair re-ask could read is
+queued here instead of blocking the tournament. The debate is stored without
+that judge, and the verdict is filled in offline:
+
+    python review_queue.py list
+    python review_queue.py resolve 3 --winner proposition --confidence 70
+    python review_queue.py review
+"""
+import argparse
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import List, NamedTuple, Optional, Union
+
+from debate_journal import get_journal_path
+from models import DebateTotal, JudgeResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REVIEW_QUEUE_PATH = Path(".cache") / "judge_review.sqlite"
+
+WINNERS = ("opposition", "proposition")
+
+
+class ReviewItem(NamedTuple):
+    id: int
+    path: str
+    judge_model: str
+    judgement: str
+    reason: str
+    added_at: float
+    prompt_version: Optional[str] = None
+
+
+class ReviewQueue:
+    """
+    SQLite-backed queue of unparseable judgements, one pending item per debate
+    and judge. Adding never blocks on a human; resolving writes the verdict into
+    the stored debate and marks the item done. Without wal, SQLite's rollback
+    journal is used, so machines sharing a network filesystem can share the file.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_REVIEW_QUEUE_PATH, wal: bool = True):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._connection.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS review_items (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL,
+                judge_model TEXT NOT NULL,
+                judgement TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                added_at REAL NOT NULL,
+                resolved_at REAL,
+                winner TEXT,
+                confidence INTEGER,
+                prompt_version TEXT
+            )
+            """
+        )
+        existing = {row[1] for row in self._connection.execute("PRAGMA table_info(review_items)")}
+        if "prompt_version" not in existing:
+            self._connection.execute("ALTER TABLE review_items ADD COLUMN prompt_version TEXT")
+        self._connection.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS review_items_pending
+            ON review_items (path, judge_model) WHERE resolved_at IS NULL
+            """
+        )
+        self._connection.commit()
+
+    @classmethod
+    def from_env(cls, wal: bool = True) -> "ReviewQueue":
+        return cls(os.environ.get("DEBATEBET_REVIEW_QUEUE", DEFAULT_REVIEW_QUEUE_PATH), wal=wal)
+
+    def add(
+        self,
+        path: Union[str, Path],
+        judge_model: str,
+        judgement: str,
+        reason: str,
+        prompt_version: Optional[str] = None,
+    ) -> None:
+        """Queues a judgement; a judge already pending for the debate keeps its first item."""
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT OR IGNORE INTO review_items (path, judge_model, judgement, reason, added_at, prompt_version)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (str(path), judge_model, judgement, reason, time.time(), prompt_version),
+            )
+            self._connection.commit()
+        logger.warning(f"Queued the judgement of {judge_model} on {path} for review: {reason}")
+
+    def get_pending(self, path: Optional[Union[str, Path]] = None) -> List[ReviewItem]:
+        query = (
+            "SELECT id, path, judge_model, judgement, reason, added_at, prompt_version FROM review_items "
+            "WHERE resolved_at IS NULL"
+        )
+        params: tuple = ()
+        if path is not None:
+            query += " AND path = ?"
+            params = (str(path),)
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY id", params).fetchall()
+        return [ReviewItem(*row) for row in rows]
+
+    def get_pending_judges(self, path: Union[str, Path]) -> List[str]:
+        return [item.judge_model for item in self.get_pending(path)]
+
+    def get_item(self, item_id: int) -> ReviewItem:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id, path, judge_model, judgement, reason, added_at, prompt_version FROM review_items "
+                "WHERE id = ? AND resolved_at IS NULL",
+                (item_id,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"No pending review item {item_id}")
+        return ReviewItem(*row)
+
+    def resolve(self, item_id: int, winner: str, confidence: int) -> JudgeResult:
+        """
+        Adds the verdict to the stored debate and marks the item resolved. A verdict
+        the judge already has in the debate is superseded by the reviewed one.
+        Debates that are still being written (their journal exists) are refused.
+        """
+        if winner not in WINNERS:
+            raise ValueError("Winner must be opposition or proposition")
+        if not 0 <= confidence <= 100:
+            raise ValueError("Confidence must be between 0 and 100")
+
+        item = self.get_item(item_id)
+        if get_journal_path(item.path).exists():
+            raise ValueError(f"{item.path} is still being written, resolve it once its debate has finished")
+
+        result = JudgeResult(
+            model=item.judge_model,
+            winner=winner,
+            confidence=confidence,
+            logic=item.judgement,
+            prompt_version=item.prompt_version,
+        )
+        debate = DebateTotal.load_from_json(item.path)
+        debate.path_to_store = Path(item.path)
+        debate.replace_judge_result(result)
+        debate.save_to_json()
+
+        with self._lock:
+            self._connection.execute(
+                "UPDATE review_items SET resolved_at = ?, winner = ?, confidence = ? WHERE id = ?",
+                (time.time(), winner, confidence, item_id),
+            )
+            self._connection.commit()
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_default_queue: Optional[ReviewQueue] = None
+_default_queue_lock = threading.Lock()
+
+
+def get_review_queue() -> ReviewQueue:
+    """Returns the process-wide queue, creating it on first use."""
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = ReviewQueue.from_env()
+        return _default_queue
+
+
+def review_interactively(queue: ReviewQueue) -> None:
+    """Walks through the pending items, asking for each verdict; an empty winner skips."""
+    for item in queue.get_pending():
+        print(f"\n[{item.id}] {item.judge_model} on {item.path}: {item.reason}\n")
+        print(item.judgement)
+        while True:
+            winner = input("\nEnter winner (opposition/proposition, blank to skip): ").strip().lower()
+            if not winner:
+                break
+            confidence = input("Enter confidence (0-100): ").strip()
+            try:
+                queue.resolve(item.id, winner, int(confidence))
+                break
+            except (KeyError, ValueError) as e:
+                print(f"Invalid input, please try again: {e}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolve judge verdicts that could not be parsed")
+    parser.add_argument("--queue", type=Path, default=None, help="Defaults to DEBATEBET_REVIEW_QUEUE or .cache")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("list", help="Show pending items")
+    resolve_parser = subcommands.add_parser("resolve", help="Record the verdict of one item")
+    resolve_parser.add_argument("id", type=int)
+    resolve_parser.add_argument("--winner", choices=WINNERS, required=True)
+    resolve_parser.add_argument("--confidence", type=int, required=True)
+    subcommands.add_parser("review", help="Go through the pending items one by one")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    queue = ReviewQueue(args.queue) if args.queue else ReviewQueue.from_env()
+    if args.command == "list":
+        for item in queue.get_pending():
+            print(f"{item.id}\t{item.judge_model}\t{item.path}\t{item.reason}")
+    elif args.command == "resolve":
+        result = queue.resolve(args.id, args.winner, args.confidence)
+        print(f"Recorded {result.winner} ({result.confidence}) from {result.model}")
+    elif args.command == "review":
+        review_interactively(queue)
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
-import os
+from concurrent.futures import ThreadPoolExecutor
+import json
 from pathlib import Path
 import re
+import threading
 
-import requests
 from models import (
     DebateTotal,
     DebatorOutputs,
@@ -11,11 +12,20 @@ from models import (
     JudgeResult,
     Round,
     Side,
+    ModelTokenUsage,
     SpeechType,
+    get_prompt_version,
 )
-from utils import make_rounds
-from typing import List, Dict
-from tenacity import retry, stop_after_attempt, wait_exponential
+from cost_engine import BudgetExceededError
+from debate_journal import DebateJournal, get_journal_path, load_journaled_debate
+from openrouter_client import OpenRouterClient, estimate_prompt_tokens, get_openrouter_client
+from rate_limiter import ModelRateLimiter, RateLimitedError, stop_unless_rate_limited, wait_unless_rate_limited
+from response_cache import CACHE_HIT_KEY, ResponseCache
+from review_queue import ReviewQueue, get_review_queue
+from telemetry import bind_context, span
+from utils import make_round_schedule, make_rounds
+from typing import Callable, List, Dict, Optional
+from tenacity import retry, retry_if_not_exception_type, wait_exponential
 
 import logging
 
@@ -31,6 +41,15 @@ class DebateState:
         self.proposition = DebatorOutputs(side=Side.PROPOSITION)
         self.opposition = DebatorOutputs(side=Side.OPPOSITION)
 
+    @classmethod
+    def from_debate(cls, debate: DebateTotal) -> 'DebateState':
+        state = cls()
+        for output in (debate.proposition_output, debate.opposition_output):
+            for speech_type, speech in output.speeches.items():
+                if speech != -1:
+                    state.add_speech(output.side, speech_type, speech)
+        return state
+
     def add_speech(self, side: Side, speech_type: SpeechType, speech: str):
         target = self.proposition if side == Side.PROPOSITION else self.opposition
         target.speeches[speech_type] = speech
@@ -63,177 +82,762 @@ class DebateState:
         return messages
 
 
-def extract_debate_result(xml_string: str, model: str) -> JudgeResult:
-   try:
-       # Find all winner matches
-       winner_matches = re.findall(r'<winnerName>(\w+)</winnerName>', xml_string)
-       if not winner_matches or len(winner_matches) != 1:
-           raise ValueError("Must have exactly one winner")
-       winner = winner_matches[0]
-       if winner not in ["opposition", "proposition"]:
-           raise ValueError("Winner must be opposition or proposition")
-
-       # Find all confidence matches
-       confidence_matches = re.findall(r'<confidence>(\d+)</confidence>', xml_string)
-       if not confidence_matches or len(confidence_matches) != 1:
-           raise ValueError("Must have exactly one confidence value")
-       confidence = int(confidence_matches[0])
-       if not 0 <= confidence <= 100:
-           raise ValueError("Confidence must be between 0 and 100")
+# Providers that only reuse a cached prompt prefix when the request marks where it ends
+PROMPT_CACHE_HINT_PREFIXES = ("anthropic/", "google/")
 
-       return JudgeResult(
-           model=model,
-           winner=winner,
-           confidence=confidence,
-           logic=xml_string
-       )
 
-   except Exception as e:
-       print(f"Error processing input: {str(e)}")
-       print("\nCurrent XML:")
-       print(xml_string)
-
-       while True:
-           try:
-               winner = input("\nEnter winner (opposition/proposition): ").strip()
-               if winner not in ["opposition", "proposition"]:
-                   print("Invalid winner")
-                   continue
-
-               confidence_str = str(input("Enter confidence (0-100): ").strip())
-               if not confidence_str.isdigit():
-                   print("Confidence must be a number")
-                   continue
-
-               confidence_int = int(confidence_str)
-               if not 0 <= confidence <= 100:
-                   print("Confidence must be between 0 and 100")
-                   continue
-
-               return JudgeResult(
-                   model=model,
-                   winner=winner,
-                   confidence=confidence_int,
-                   logic=xml_string
-               )
-           except ValueError:
-               print("Invalid input, please try again")
+def uses_prompt_cache_hints(model: str) -> bool:
+    return model.startswith(PROMPT_CACHE_HINT_PREFIXES)
 
-@retry(
-    stop=stop_after_attempt(10),
-    wait=wait_exponential(multiplier=1, min=10, max=20),
-    before_sleep=lambda retry_state: logger.warning(
-        f"Attempt {retry_state.attempt_number} failed. Failed with error: {retry_state.outcome.exception()}. Retrying after backoff..."
-    ),
-)
-def get_judgement_string(debate: DebateTotal, prompts: DebatePrompts, model: str) -> tuple[str, dict]:
-    logger.info(f"Starting judge request to OpenRouter for model: {model}")
 
-    headers = {
-        "Authorization": f"Bearer {os.environ['OPENROUTER_API_KEY']}",
-        "Content-Type": "application/json",
+def mark_cache_breakpoint(message: Dict) -> Dict:
+    return {
+        "role": message["role"],
+        "content": [{"type": "text", "text": message["content"], "cache_control": {"type": "ephemeral"}}],
     }
 
-    messages = [
+
+def make_speech_messages(
+    side: Side, motion: DebateTopic, context: List[Dict], instruction: str, model: str
+) -> List[Dict]:
+    """
+    Side and motion first, then the transcript so far, then this round's instruction.
+    Everything before the instruction is the same bytes in every round for a side,
+    so each round's request extends the previous one and providers can serve the
+    shared prefix from their prompt cache.
+    """
+    prefix = [
         {
             "role": "system",
-            "content": f"You are a judge. Follow these rules {prompts.judge_prompt}"
+            "content": f"You are on the {side.value} side.",
+        }, {
+            "role": "user",
+            "content": f"You are debating {motion.topic_description}. "
         },
+        *context,
+    ]
+    if uses_prompt_cache_hints(model):
+        prefix[-1] = mark_cache_breakpoint(prefix[-1])
+    return [*prefix, {"role": "user", "content": instruction}]
+
+
+def make_judge_messages(debate: DebateTotal, prompts: DebatePrompts, model: str) -> List[Dict]:
+    """The judging rules are the same for every debate, so they form the cacheable prefix."""
+    system = {
+        "role": "system",
+        "content": f"You are a judge. Follow these rules {prompts.judge_prompt}"
+    }
+    return [
+        mark_cache_breakpoint(system) if uses_prompt_cache_hints(model) else system,
         {
             "role": "user",
             "content": f"the debate is {debate.get_transcript()}"
         }
     ]
 
-    payload = {
-        "model": model,
-        "messages": messages
+
+# Structured judging: anthropic/ models answer through a forced tool call, the rest
+# through a JSON-schema response_format. Models whose providers reject both are
+# remembered and judged with the XML prompt alone.
+TOOL_CALLING_PREFIXES = ("anthropic/",)
+VERDICT_TOOL_NAME = "record_verdict"
+STRUCTURED_JUDGING_INSTRUCTION = (
+    "Instead of the XML tags, return your judgement as a single JSON object: your full "
+    "analysis in logic, then winner and confidence."
+)
+
+_structured_unsupported_models: set = set()
+
+
+class StructuredOutputUnsupportedError(ValueError):
+    """Raised when a provider rejects a response_format or tools request."""
+
+
+def get_structured_output_mode(model: str) -> Optional[str]:
+    """"tools", "json_schema", or None when the model has rejected both."""
+    if model in _structured_unsupported_models:
+        return None
+    return "tools" if model.startswith(TOOL_CALLING_PREFIXES) else "json_schema"
+
+
+def get_verdict_schema() -> Dict:
+    """JSON schema of the JudgeResult fields a judge fills in, logic first so it reasons before deciding."""
+    properties = JudgeResult.model_json_schema()["properties"]
+    return {
+        "type": "object",
+        "properties": {
+            "logic": {"type": "string", "description": "Your full analysis of the debate"},
+            "winner": {"type": "string", "enum": list(properties["winner"]["enum"])},
+            "confidence": {"type": "integer", "description": "Margin of victory from 0 to 100"},
+        },
+        "required": ["logic", "winner", "confidence"],
+        "additionalProperties": False,
     }
 
+
+def make_judge_payload(
+    debate: DebateTotal,
+    prompts: DebatePrompts,
+    model: str,
+    structured_mode: Optional[str] = None,
+) -> Dict:
+    messages = make_judge_messages(debate, prompts, model)
+    payload: Dict = {"model": model, "messages": messages}
+    if structured_mode is None:
+        return payload
+
+    # Appended after the transcript so the cacheable prefix is unchanged
+    messages.append({"role": "user", "content": STRUCTURED_JUDGING_INSTRUCTION})
+    # Only route to providers that honour the structured output parameters
+    payload["provider"] = {"require_parameters": True}
+    if structured_mode == "tools":
+        payload["tools"] = [{
+            "type": "function",
+            "function": {
+                "name": VERDICT_TOOL_NAME,
+                "description": "Record your judgement of the debate",
+                "parameters": get_verdict_schema(),
+            },
+        }]
+        payload["tool_choice"] = {"type": "function", "function": {"name": VERDICT_TOOL_NAME}}
+    else:
+        payload["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": "judge_verdict", "strict": True, "schema": get_verdict_schema()},
+        }
+    return payload
+
+
+def get_message_text(message: Dict) -> str:
+    """The content of a completion message, or the arguments of its first tool call."""
+    tool_calls = message.get("tool_calls") or []
+    if tool_calls and not message.get("content"):
+        return tool_calls[0]["function"]["arguments"]
+    return message.get("content") or ""
+
+
+def extract_structured_result(text: Optional[str], model: str) -> Optional[JudgeResult]:
+    """Validates a JSON judgement against JudgeResult, or returns None if it is not one."""
+    if not text:
+        return None
+    text = re.sub(r"^```(?:json)?|```$", "", text.strip()).strip()
+    if not text.startswith("{"):
+        return None
+    try:
+        data = json.loads(text)
+        if not isinstance(data, dict):
+            return None
+        if isinstance(data.get("winner"), str):
+            data["winner"] = data["winner"].strip().lower()
+        return JudgeResult.model_validate({**data, "model": model})
+    except ValueError:
+        return None
+
+
+SPEECH_ROOT_TAGS = ("finalSpeech", "rebuttal", "speech")
+
+# Completion tokens after which a streamed speech is abandoned as runaway
+DEFAULT_MAX_SPEECH_TOKENS = 4000
+
+
+class MalformedSpeechError(ValueError):
+    """A streamed speech was aborted for going off-format or over its token budget."""
+
+    def __init__(self, message: str, completion_tokens: int = 0):
+        super().__init__(message)
+        self.completion_tokens = completion_tokens
+
+
+def get_expected_root_tag(instruction: str) -> Optional[str]:
+    """The XML root tag a round's prompt asks the speech to be wrapped in."""
+    for tag in SPEECH_ROOT_TAGS:
+        if f"<{tag}>" in instruction:
+            return tag
+    return None
+
+
+class SpeechFormatCheck:
+    """
+    Checks a streamed speech delta by delta: the root tag has to open within the
+    first preamble_chars characters, and the speech has to stay under max_tokens
+    (at about four characters per token).
+    """
+
+    def __init__(self, root_tag: Optional[str], max_tokens: int, preamble_chars: int = 200):
+        self.opening = f"<{root_tag}>" if root_tag else None
+        self.max_tokens = max_tokens
+        self.preamble_chars = preamble_chars
+        self.head = ""
+        self.chars = 0
+
+    def __call__(self, delta: str) -> None:
+        self.chars += len(delta)
+        if self.chars // 4 > self.max_tokens:
+            raise MalformedSpeechError(f"Speech ran past {self.max_tokens} tokens", self.chars // 4)
+        if self.opening is None:
+            return
+        self.head += delta
+        if self.opening in self.head:
+            self.opening = None
+            self.head = ""
+        elif len(self.head) > self.preamble_chars:
+            raise MalformedSpeechError(
+                f"Speech did not open with {self.opening} in its first {self.preamble_chars} characters",
+                self.chars // 4,
+            )
+
+
+def get_cached_prompt_tokens(usage: Dict) -> int:
+    return (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+
+
+class UnparseableJudgementError(ValueError):
+    """Raised when a judgement has no single readable winner and confidence."""
+
+
+# Tried in order; the first pattern that matches decides, and conflicting matches
+# make the judgement ambiguous rather than falling through to a looser pattern
+WINNER_PATTERNS = (
+    re.compile(r"<\s*winner_?name\s*>\s*\**\s*(proposition|opposition)\s*\**\s*<\s*/\s*winner_?name\s*>", re.IGNORECASE),
+    re.compile(r"<\s*winner\s*>\s*\**\s*(proposition|opposition)\s*\**\s*<\s*/\s*winner\s*>", re.IGNORECASE),
+    re.compile(r"\bwinner(?:\s*name)?[\"*]*\s*[:=]\s*[\"*]*\s*(?:the\s+)?(proposition|opposition)\b", re.IGNORECASE),
+)
+CONFIDENCE_PATTERNS = (
+    re.compile(r"<\s*confidence\s*>\s*\**\s*(\d{1,3})(?:\.\d+)?\s*%?\s*\**\s*<\s*/\s*confidence\s*>", re.IGNORECASE),
+    re.compile(r"\bconfidence(?:\s*level)?[\"*]*\s*[:=]\s*[\"*]*\s*(\d{1,3})(?:\.\d+)?\s*%?", re.IGNORECASE),
+)
+
+JUDGEMENT_REPAIR_PROMPT = (
+    "The judgement below could not be read because it does not contain exactly one "
+    "winner and one confidence. Reply with only these two tags, keeping the decision "
+    "the judgement already made:\n"
+    "<winnerName>opposition or proposition</winnerName>\n"
+    "<confidence>0-100</confidence>\n\n"
+    "Judgement:\n"
+)
+
+
+def find_single_value(text: str, patterns) -> Optional[str]:
+    """The one distinct value the first matching pattern finds, or None if none or several."""
+    for pattern in patterns:
+        values = {match.lower() for match in pattern.findall(text)}
+        if values:
+            return values.pop() if len(values) == 1 else None
+    return None
+
+
+def parse_judgement(text: str) -> Optional[tuple[str, int]]:
+    """
+    Tolerant single pass over a judgement: accepts tag case and spacing variations,
+    repeated but identical tags, "70%" or "70.0" confidences, and "Winner:" or
+    "Confidence:" lines when the tags are missing.
+    """
+    winner = find_single_value(text, WINNER_PATTERNS)
+    confidence = find_single_value(text, CONFIDENCE_PATTERNS)
+    if winner is None or confidence is None or not 0 <= int(confidence) <= 100:
+        return None
+    return winner, int(confidence)
+
+
+def extract_debate_result(xml_string: str, model: str) -> JudgeResult:
+   # Find all winner matches
+   winner_matches = re.findall(r'<winnerName>(\w+)</winnerName>', xml_string)
+   confidence_matches = re.findall(r'<confidence>(\d+)</confidence>', xml_string)
+   if (
+       len(winner_matches) == 1
+       and winner_matches[0] in ["opposition", "proposition"]
+       and len(confidence_matches) == 1
+       and 0 <= int(confidence_matches[0]) <= 100
+   ):
+       return JudgeResult(
+           model=model,
+           winner=winner_matches[0],
+           confidence=int(confidence_matches[0]),
+           logic=xml_string
+       )
+
+   parsed = parse_judgement(xml_string)
+   if parsed is None:
+       raise UnparseableJudgementError(
+           f"Judgement from {model} has {len(winner_matches)} winner and "
+           f"{len(confidence_matches)} confidence tags and no other readable verdict"
+       )
+
+   winner, confidence = parsed
+   logger.info(f"Read the verdict of {model} with the tolerant parser")
+   return JudgeResult(
+       model=model,
+       winner=winner,
+       confidence=confidence,
+       logic=xml_string
+   )
+
+def request_judgement(
+    payload: Dict,
+    model: str,
+    client: Optional[OpenRouterClient] = None,
+    cache: Optional[ResponseCache] = None,
+) -> tuple[str, dict]:
     logger.debug(f"Judge request payload: {payload}")
 
-    response = requests.post(
-        "https://openrouter.ai/api/v1/chat/completions",
-        headers=headers,
-        json=payload
-    )
+    cached = cache.get(payload) if cache else None
+    if cached is not None:
+        return get_message_text(cached["choices"][0]["message"]), {**cached.get("usage", {}), CACHE_HIT_KEY: True}
+
+    response = (client or get_openrouter_client()).chat_completion(payload)
 
     response_json = response.json()
     logger.info(f"Raw judge API response: {response_json}")
 
+    if response.status_code == 429:
+        raise RateLimitedError(f"Judge API rate limited model {model}")
+
+    if response.status_code in (400, 404) and ("response_format" in payload or "tools" in payload):
+        raise StructuredOutputUnsupportedError(
+            f"No provider for {model} accepted structured output: {response_json.get('error', {}).get('message')}"
+        )
+
     if response.status_code != 200:
         error_msg = f"Judge API returned error: {response_json.get('error', {}).get('message')}"
         logger.error(error_msg)
         raise ValueError(error_msg)
 
-    judgment = response_json["choices"][0]["message"]["content"]
+    judgment = get_message_text(response_json["choices"][0]["message"])
     usage = response_json.get("usage", {})
+    if cache:
+        cache.put(payload, response_json)
 
     logger.info("Successfully retrieved judgment")
     logger.debug(f"Judgment content: {judgment}")
 
     return judgment, usage
 
-def get_judgement(debate: DebateTotal, prompts: DebatePrompts, judge_model: str) -> None:
+
+@retry(
+    stop=stop_unless_rate_limited(10),
+    retry=retry_if_not_exception_type(BudgetExceededError),
+    wait=wait_unless_rate_limited(wait_exponential(multiplier=1, min=10, max=20)),
+    before_sleep=lambda retry_state: logger.warning(
+        f"Attempt {retry_state.attempt_number} failed. Failed with error: {retry_state.outcome.exception()}. Retrying after backoff..."
+    ),
+)
+def get_judgement_string(
+    debate: DebateTotal,
+    prompts: DebatePrompts,
+    model: str,
+    client: Optional[OpenRouterClient] = None,
+    cache: Optional[ResponseCache] = None,
+    structured: bool = False,
+) -> tuple[str, dict]:
+    """
+    With structured, the judge is asked for a JudgeResult-shaped JSON object. A
+    model whose providers reject that is judged with the XML prompt instead, now
+    and for the rest of the run.
+    """
+    logger.info(f"Starting judge request to OpenRouter for model: {model}")
+
+    structured_mode = get_structured_output_mode(model) if structured else None
+    payload = make_judge_payload(debate, prompts, model, structured_mode)
     try:
-        judgment_string, usage = get_judgement_string(debate=debate, prompts=prompts, model=judge_model)
+        return request_judgement(payload, model, client, cache)
+    except StructuredOutputUnsupportedError as e:
+        logger.warning(f"{e}; judging {model} with the XML prompt")
+        _structured_unsupported_models.add(model)
+    return request_judgement(make_judge_payload(debate, prompts, model), model, client, cache)
 
-        # Track successful token usage
-        debate.judge_token_counts.add_successful_call(
+
+@retry(
+    stop=stop_unless_rate_limited(3),
+    retry=retry_if_not_exception_type(BudgetExceededError),
+    wait=wait_unless_rate_limited(wait_exponential(multiplier=1, min=10, max=20)),
+    before_sleep=lambda retry_state: logger.warning(
+        f"Attempt {retry_state.attempt_number} failed. Failed with error: {retry_state.outcome.exception()}. Retrying after backoff..."
+    ),
+)
+def get_judgement_repair(
+    judgment_string: str,
+    model: str,
+    client: Optional[OpenRouterClient] = None,
+    cache: Optional[ResponseCache] = None,
+) -> tuple[str, dict]:
+    """
+    Asks the judge to restate the verdict of its own unreadable judgement. Only the
+    judgement is sent, not the transcript, so the re-ask costs a fraction of a judge call.
+    """
+    logger.info(f"Asking {model} to repair its judgement")
+
+    payload = {
+        "model": model,
+        "messages": [{"role": "user", "content": JUDGEMENT_REPAIR_PROMPT + judgment_string}]
+    }
+    return request_judgement(payload, model, client, cache)
+
+
+def record_judge_usage(debate: DebateTotal, judge_model: str, usage: dict) -> None:
+    # Track successful token usage, keeping cache hits apart from paid calls
+    if usage.get(CACHE_HIT_KEY):
+        debate.judge_token_counts.add_cached_call(
             model=judge_model,
             completion_tokens=usage.get("completion_tokens", 0),
             prompt_tokens=usage.get("prompt_tokens", 0),
             total_tokens=usage.get("total_tokens", 0)
         )
+    else:
+        debate.judge_token_counts.add_successful_call(
+            model=judge_model,
+            completion_tokens=usage.get("completion_tokens", 0),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            total_tokens=usage.get("total_tokens", 0),
+            cached_prompt_tokens=get_cached_prompt_tokens(usage),
+        )
+
+
+def resolve_judgement(
+    debate: DebateTotal,
+    judge_model: str,
+    judgment_string: str,
+    client: Optional[OpenRouterClient] = None,
+    cache: Optional[ResponseCache] = None,
+    review_queue: Optional[ReviewQueue] = None,
+    prompt_version: Optional[str] = None,
+) -> Optional[JudgeResult]:
+    """
+    Reads the verdict of a judgement without ever blocking: a structured JSON
+    verdict, the strict and tolerant XML parsers, then one repair re-ask to the
+    same judge. A judgement that is still unreadable is queued for offline review
+    and None is returned.
+    """
+    structured_result = extract_structured_result(judgment_string, judge_model)
+    if structured_result is not None:
+        return structured_result
+
+    try:
+        return extract_debate_result(xml_string=judgment_string, model=judge_model)
+    except UnparseableJudgementError as e:
+        reason = str(e)
+        logger.warning(reason)
+
+    try:
+        repair_string, usage = get_judgement_repair(judgment_string, judge_model, client=client, cache=cache)
+        record_judge_usage(debate, judge_model, usage)
+        parsed = parse_judgement(repair_string)
+        if parsed is not None:
+            winner, confidence = parsed
+            logger.info(f"Repaired the judgement of {judge_model}")
+            return JudgeResult(model=judge_model, winner=winner, confidence=confidence, logic=judgment_string)
+        reason += "; the repair reply was unreadable too"
+    except Exception as e:
+        reason += f"; the repair request failed: {e}"
 
-        judge_result = extract_debate_result(xml_string=judgment_string, model=judge_model)
+    (review_queue or get_review_queue()).add(
+        debate.path_to_store, judge_model, judgment_string, reason, prompt_version=prompt_version
+    )
+    return None
+
+
+def record_judgement(
+    debate: DebateTotal,
+    judge_model: str,
+    judgment_string: str,
+    usage: dict,
+    client: Optional[OpenRouterClient] = None,
+    cache: Optional[ResponseCache] = None,
+    review_queue: Optional[ReviewQueue] = None,
+    prompt_version: Optional[str] = None,
+) -> None:
+    record_judge_usage(debate, judge_model, usage)
+    judge_result = resolve_judgement(
+        debate, judge_model, judgment_string, client, cache, review_queue, prompt_version=prompt_version
+    )
+    if judge_result is not None:
+        judge_result.prompt_version = prompt_version
         debate.judge_results.append(judge_result)
 
+
+def record_failed_judgement(debate: DebateTotal, judge_model: str, error: BaseException) -> None:
+    # Track failed token usage if available in the error
+    if hasattr(error, 'response') and hasattr(error.response, 'json'):
+        usage = error.response.json().get('usage', {})
+        debate.judge_token_counts.add_failed_call(
+            model=judge_model,
+            completion_tokens=usage.get("completion_tokens", 0),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            total_tokens=usage.get("total_tokens", 0)
+        )
+
+
+def get_judgement(
+    debate: DebateTotal,
+    prompts: DebatePrompts,
+    judge_model: str,
+    client: Optional[OpenRouterClient] = None,
+    cache: Optional[ResponseCache] = None,
+    review_queue: Optional[ReviewQueue] = None,
+    structured: bool = False,
+) -> None:
+    try:
+        judgment_string, usage = get_judgement_string(
+            debate=debate, prompts=prompts, model=judge_model, client=client, cache=cache, structured=structured
+        )
+        record_judgement(
+            debate, judge_model, judgment_string, usage, client, cache, review_queue,
+            prompt_version=get_prompt_version(prompts.judge_prompt),
+        )
     except Exception as e:
-        # Track failed token usage if available in the error
-        if hasattr(e, 'response') and hasattr(e.response, 'json'):
-            usage = e.response.json().get('usage', {})
-            debate.judge_token_counts.add_failed_call(
-                model=judge_model,
-                completion_tokens=usage.get("completion_tokens", 0),
-                prompt_tokens=usage.get("prompt_tokens", 0),
-                total_tokens=usage.get("total_tokens", 0)
-            )
+        record_failed_judgement(debate, judge_model, e)
         raise
 
 
+def run_judge_panel(
+    debate: DebateTotal,
+    prompts: DebatePrompts,
+    judge_models: List[str],
+    client: Optional[OpenRouterClient] = None,
+    cache: Optional[ResponseCache] = None,
+    review_queue: Optional[ReviewQueue] = None,
+    structured: bool = False,
+) -> None:
+    """
+    Asks every judge for a verdict at the same time. The judges only read the
+    finished transcript, so none of them waits on another. Results are merged into
+    debate.judge_results in judge_models order once every call has returned.
+
+    An unreadable verdict does not fail the panel: it is repaired or queued for
+    review by resolve_judgement, and that judge is left out of judge_results.
+    """
+    if not judge_models:
+        return
+
+    def request_verdict(model: str) -> tuple[str, dict]:
+        with span("judge", model=model):
+            return get_judgement_string(
+                debate=debate, prompts=prompts, model=model, client=client, cache=cache, structured=structured
+            )
+
+    with ThreadPoolExecutor(max_workers=len(judge_models)) as executor:
+        futures = [executor.submit(bind_context(request_verdict), model) for model in judge_models]
+
+    # Parse on this thread, in panel order, so results and token counts are deterministic
+    prompt_version = get_prompt_version(prompts.judge_prompt)
+    first_error = None
+    for model, future in zip(judge_models, futures):
+        try:
+            judgment_string, usage = future.result()
+            # Parsing may re-ask the judge to repair its verdict
+            with span("verdict", model=model):
+                record_judgement(
+                    debate, model, judgment_string, usage, client, cache, review_queue, prompt_version=prompt_version
+                )
+        except Exception as e:
+            logger.error(f"Judge {model} failed: {e}")
+            record_failed_judgement(debate, model, e)
+            first_error = first_error or e
+
+    if first_error is not None:
+        raise first_error
+
+
+def order_judges(judge_models: List[str], client: OpenRouterClient) -> List[str]:
+    """
+    Cheapest judges first by observed cost per call, then fastest by observed
+    latency. Judges without cost observations yet are priced as a default-size
+    call at their listed rates, and judges without latency observations count as
+    fast; ties keep judge_models order.
+    """
+    def key(indexed_model: tuple[int, str]) -> tuple:
+        index, model = indexed_model
+        cost = client.budget.get_cost_per_call(model) if client.budget else 0.0
+        latency = client.limiter.get_latency(model) if isinstance(client.limiter, ModelRateLimiter) else None
+        return cost, latency or 0.0, index
+
+    return [model for _, model in sorted(enumerate(judge_models), key=key)]
+
+
+def get_judges_needed(results: List[JudgeResult], remaining: int, stop_confidence: Optional[float] = None) -> int:
+    """
+    How many more judges to ask before the panel could be decided: 0 once the
+    majority can no longer flip (and, with stop_confidence, the mean confidence
+    reaches it), otherwise the fewest that could clinch the majority if they all
+    agreed with the current leader.
+    """
+    proposition_votes = sum(result.winner == "proposition" for result in results)
+    lead = abs(2 * proposition_votes - len(results))
+    if lead > remaining:
+        if stop_confidence is None or sum(result.confidence for result in results) / len(results) >= stop_confidence:
+            return 0
+        return min(1, remaining)
+    return min(remaining, (remaining - lead) // 2 + 1)
+
+
+def run_adaptive_judge_panel(
+    debate: DebateTotal,
+    prompts: DebatePrompts,
+    judge_models: List[str],
+    client: Optional[OpenRouterClient] = None,
+    cache: Optional[ResponseCache] = None,
+    review_queue: Optional[ReviewQueue] = None,
+    structured: bool = False,
+    stop_confidence: Optional[float] = None,
+) -> None:
+    """
+    Asks judges in waves, cheapest and fastest first, and stops once the majority
+    outcome can no longer flip. Verdicts already in debate.judge_results count
+    towards the panel. Judges that were not needed go to debate.skipped_judges, so
+    rating code can give the debate its full panel's weight.
+    """
+    client = client or get_openrouter_client()
+    panel = set(judge_models) | set(debate.judge_models)
+    remaining = order_judges(judge_models, client)
+    while remaining:
+        results = [result for result in debate.judge_results if result.model in panel]
+        needed = get_judges_needed(results, len(remaining), stop_confidence)
+        if needed == 0:
+            break
+        wave, remaining = remaining[:needed], remaining[needed:]
+        run_judge_panel(
+            debate=debate,
+            prompts=prompts,
+            judge_models=wave,
+            client=client,
+            cache=cache,
+            review_queue=review_queue,
+            structured=structured,
+        )
+
+    if remaining:
+        logger.info(f"Panel decided for {debate.path_to_store}, skipping judges {', '.join(remaining)}")
+        debate.skipped_judges.extend(remaining)
+
+
+def load_partial_debate(
+    path: Path,
+    proposition_model: str,
+    opposition_model: str,
+) -> Optional[DebateTotal]:
+    """
+    Loads an interrupted debate, including any journal a crash left behind, so it
+    can be finished. Returns None when there is nothing usable to resume from.
+    """
+    if not path.exists() and not get_journal_path(path).exists():
+        return None
+
+    try:
+        debate = load_journaled_debate(path)
+    except (ValueError, KeyError) as e:
+        logger.warning(f"Could not load {path} to resume, starting the debate afresh: {e}")
+        return None
+
+    if (debate.proposition_model, debate.opposition_model) != (proposition_model, opposition_model):
+        raise ValueError(
+            f"{path} holds {debate.proposition_model} vs {debate.opposition_model}, "
+            f"not {proposition_model} vs {opposition_model}"
+        )
+
+    debate.path_to_store = path
+    return debate
+
+
 def run_debate(
     proposition_model: str,
     opposition_model: str,
     motion: DebateTopic,
     prompts: DebatePrompts,
     path: Path,
-    judge_models: List[str]
+    judge_models: List[str],
+    parallel_rounds: bool = True,
+    client: Optional[OpenRouterClient] = None,
+    cache: Optional[ResponseCache] = None,
+    resume: bool = False,
+    stream: bool = False,
+    max_speech_tokens: int = DEFAULT_MAX_SPEECH_TOKENS,
+    review_queue: Optional[ReviewQueue] = None,
+    structured_judging: bool = False,
+    adaptive_judging: bool = False,
+    stop_confidence: Optional[float] = None,
+    is_owner: Optional[Callable[[], bool]] = None,
 ) -> DebateTotal:
-    state = DebateState()
+    """
+    Runs a full debate and judges it.
+
+    Progress is checkpointed to a write-behind journal next to path, and the
+    finished (or failed) debate is compacted into the JSON document at path.
+
+    With resume, a partial debate already stored at path is picked up where it
+    stopped: finished speeches and judge results are kept, and only missing
+    speeches and missing judges are requested. The stored motion and prompts win
+    over the ones passed in, so the finished speeches stay consistent.
+
+    With parallel_rounds, speeches that do not depend on each other (e.g. the two
+    openings) are requested concurrently. The stored transcript is identical to
+    the one produced by delivering the rounds one after another.
+
+    With a cache, speeches are looked up per debate path, so a restarted debate
+    reuses its finished speeches while different debates never share one.
+
+    With stream, speeches arrive as server-sent events and are checked as they
+    stream: one that does not open with its round's root tag, or runs past
+    max_speech_tokens, is aborted and retried at once instead of being paid for
+    in full.
+
+    Judgements whose verdict cannot be read, even after a repair re-ask, go to the
+    review queue instead of stopping the debate. Judges waiting there are not asked
+    again on resume; `python review_queue.py` fills them in offline.
+
+    With structured_judging, judges return a JSON verdict validated against
+    JudgeResult, falling back to the XML prompt where providers do not support it.
+
+    With adaptive_judging, judges are asked a few at a time and the rest are
+    skipped once the majority can no longer flip and, if given, the mean
+    confidence reaches stop_confidence; see run_adaptive_judge_panel.
+
+    With is_owner, ownership of the debate is checked before every round, judge
+    panel and journal write. Once it returns False, e.g. because a work queue
+    lease was lost, the debate stops with LeaseLostError and leaves its files alone.
+    """
     rounds = make_rounds()
-    output = DebateTotal(
-        motion=motion,
-        proposition_model=proposition_model,
-        opposition_model=opposition_model,
-        prompts=prompts,
-        path_to_store=path,
-    )
+    token_count_lock = threading.Lock()
+    client = client or get_openrouter_client()
+    review_queue = review_queue or get_review_queue()
+
+    output = load_partial_debate(path, proposition_model, opposition_model) if resume else None
+    if output is None:
+        output = DebateTotal(
+            motion=motion,
+            proposition_model=proposition_model,
+            opposition_model=opposition_model,
+            prompts=prompts,
+            path_to_store=path,
+        )
+    else:
+        if output.motion != motion:
+            logger.info(f"Resuming {path} on its stored motion: {output.motion.topic_description}")
+        if output.prompts != prompts:
+            logger.warning(f"Resuming {path} with its stored prompts, which differ from the current ones")
+        motion = output.motion
+        prompts = output.prompts
+        logger.info(
+            f"Resuming {path}: {len(output.get_missing_speeches())} speeches and "
+            f"{len(output.get_missing_judges(judge_models))} judges missing"
+        )
+
+    output.judge_models = judge_models
+    state = DebateState.from_debate(output)
+    journal = DebateJournal(output, is_owner=is_owner)
+    journal.start()
 
     @retry(
-        stop=stop_after_attempt(5),
-        wait=wait_exponential(multiplier=2, min=60, max=120),
+        stop=stop_unless_rate_limited(5),
+        retry=retry_if_not_exception_type(BudgetExceededError),
+        wait=wait_unless_rate_limited(
+            wait_exponential(multiplier=2, min=60, max=120), quick_retry_errors=(MalformedSpeechError,)
+        ),
         before_sleep=lambda retry_state: logger.warning(
             f"Attempt {retry_state.attempt_number} failed. Failed with error: {retry_state.outcome.exception()}. Retrying after backoff..."
         ),
     )
-    def get_valid_response(messages, model):
+    def get_valid_response(messages, model, root_tag=None):
         logger.info(f"Starting API request to OpenRouter for model: {model}")
         logger.info(f"Request messages: {messages}")
-        headers = {
-        "Authorization": f"Bearer {os.environ['OPENROUTER_API_KEY']}",
-        "Content-Type": "application/json",
-        }
         payload = {
         "model": model,  # OpenRouter requires full model path like "openai/gpt-4"
         "messages": messages,
@@ -243,17 +847,46 @@ def run_debate(
         }
         logger.debug(f"Request payload: {payload}")
 
-        response = requests.post(
-        "https://openrouter.ai/api/v1/chat/completions",
-        headers=headers,
-        json=payload
-        )
+        cached = cache.get(payload, scope=str(path)) if cache else None
+        if cached is not None:
+            usage = cached.get("usage", {})
+            with token_count_lock:
+                output.debator_token_counts.add_cached_call(
+                    model=model,
+                    completion_tokens=usage.get("completion_tokens", 0),
+                    prompt_tokens=usage.get("prompt_tokens", 0),
+                    total_tokens=usage.get("total_tokens", 0),
+                )
+            return cached["choices"][0]["message"]["content"]
+
+        if stream:
+            try:
+                response = client.stream_chat_completion(
+                    payload, check=SpeechFormatCheck(root_tag, max_speech_tokens)
+                )
+            except MalformedSpeechError as e:
+                # The tokens streamed before the abort were still billed
+                with token_count_lock:
+                    output.debator_token_counts.add_failed_call(
+                        model=model,
+                        completion_tokens=e.completion_tokens,
+                        prompt_tokens=estimate_prompt_tokens(payload),
+                        total_tokens=e.completion_tokens + estimate_prompt_tokens(payload),
+                    )
+                raise
+            if response.time_to_first_token is not None:
+                logger.info(f"Time to first token for {model}: {response.time_to_first_token:.2f}s")
+        else:
+            response = client.chat_completion(payload)
 
         response_json = response.json()
 
 
 
         logger.info(f"Raw API response: {response_json}")
+        if response.status_code == 429:
+            raise RateLimitedError(f"API rate limited model {model}")
+
         if response.status_code != 200:
             error_msg = f"API returned error: {response_json.get('error', {}).get('message')}"
             logger.error(error_msg)
@@ -266,7 +899,10 @@ def run_debate(
         prompt_tokens = usage.get("prompt_tokens", 0)
         total_tokens = usage.get("total_tokens", 0)
 
-        logger.info(f"Token usage - Completion: {completion_tokens}, Prompt: {prompt_tokens}, Total: {total_tokens}")
+        logger.info(
+            f"Token usage - Completion: {completion_tokens}, Prompt: {prompt_tokens} "
+            f"({get_cached_prompt_tokens(usage)} cached), Total: {total_tokens}"
+        )
 
 
         try:
@@ -286,15 +922,19 @@ def run_debate(
             logger.info(f"Speech content: {speech}")
 
             # Track successful token usage
-            output.debator_token_counts.add_successful_call(
-                model=model,
-                completion_tokens=completion_tokens,
-                prompt_tokens=prompt_tokens,
-                total_tokens=total_tokens,
-            )
+            with token_count_lock:
+                output.debator_token_counts.add_successful_call(
+                    model=model,
+                    completion_tokens=completion_tokens,
+                    prompt_tokens=prompt_tokens,
+                    total_tokens=total_tokens,
+                    cached_prompt_tokens=get_cached_prompt_tokens(usage),
+                )
 
             logger.info("Successfully tracked token usage")
 
+            if cache:
+                cache.put(payload, response_json, scope=str(path))
 
             return speech
 
@@ -302,18 +942,20 @@ def run_debate(
             # Track failed token usage
             logger.error(f"Error processing API response: {str(e)}")
 
-            output.debator_token_counts.add_failed_call(
-                model=model,
-                completion_tokens=completion_tokens,
-                prompt_tokens=prompt_tokens,
-                total_tokens=total_tokens,
-            )
+            with token_count_lock:
+                output.debator_token_counts.add_failed_call(
+                    model=model,
+                    completion_tokens=completion_tokens,
+                    prompt_tokens=prompt_tokens,
+                    total_tokens=total_tokens,
+                )
             raise
 
-    for round in rounds:
-        model = (
-            proposition_model if round.side == Side.PROPOSITION else opposition_model
-        )
+    def get_model_for_round(round: Round) -> str:
+        return proposition_model if round.side == Side.PROPOSITION else opposition_model
+
+    def deliver_speech(round: Round) -> str:
+        model = get_model_for_round(round)
         context = state.get_context_for_next_speech(round)
 
         logger.info(f"Starting {round.side} {round.speech_type} speech")
@@ -325,41 +967,105 @@ def run_debate(
             SpeechType.CLOSING: prompts.final_speech_prompt,
         }[round.speech_type]
 
-        messages = [
-            {
-                "role": "system",
-                "content": f"You are on the {round.side.value} side. {prompt}",
-            }, {
-                "role": "user",
-                "content": f"You are debating {motion.topic_description}. "
-            },
-
-            *context,
-        ]
+        messages = make_speech_messages(round.side, motion, context, prompt, model)
 
         try:
-            speech = get_valid_response(messages, model)
+            with span("round", side=round.side.value, speech_type=round.speech_type.value, model=model):
+                speech = get_valid_response(messages, model, root_tag=get_expected_root_tag(prompt))
+        except Exception as e:
+            logger.error(f"Error during debate round: {e}", exc_info=True)
+            raise
 
-            logger.info(f"Successfully got speech for {round.side} {round.speech_type}")
-            logger.debug(f"Speech content: {speech}")
+        logger.info(f"Successfully got speech for {round.side} {round.speech_type}")
+        logger.debug(f"Speech content: {speech}")
+        return speech
 
-            state.add_speech(round.side, round.speech_type, speech)
+    def record_speech(round: Round, speech: str) -> None:
+        state.add_speech(round.side, round.speech_type, speech)
 
-            if round.side == Side.PROPOSITION:
-                output.proposition_output.speeches[round.speech_type] = speech
-            else:
-                output.opposition_output.speeches[round.speech_type] = speech
+        if round.side == Side.PROPOSITION:
+            output.proposition_output.speeches[round.speech_type] = speech
+        else:
+            output.opposition_output.speeches[round.speech_type] = speech
 
-        except Exception as e:
-            logger.error(f"Error during debate round: {e}", exc_info=True)
-            raise
+        journal.speech_added(round.side, round.speech_type, speech)
+        journal.usage_updated()
 
-        output.save_to_json()
+    schedule = make_round_schedule(rounds) if parallel_rounds else [[round] for round in rounds]
 
-    output.judge_results =  []
-    for model in judge_models:
-        get_judgement(debate=output, prompts=prompts, judge_model=model)
+    # Only deliver the speeches that are still missing, e.g. after a resume
+    missing_speeches = set(output.get_missing_speeches())
+    schedule = [
+        [round for round in layer if (round.side, round.speech_type) in missing_speeches]
+        for layer in schedule
+    ]
+    schedule = [layer for layer in schedule if layer]
 
-        output.save_to_json()
+    with span("debate", proposition=proposition_model, opposition=opposition_model, path=str(path)):
+        try:
+            for layer in schedule:
+                journal.check_owner()
+                if len(layer) == 1:
+                    record_speech(layer[0], deliver_speech(layer[0]))
+                    continue
+
+                # Register models in round order so token counts serialise in the same
+                # order as they would if the rounds had run sequentially
+                for round in layer:
+                    model = get_model_for_round(round)
+                    if model not in output.debator_token_counts.model_usages:
+                        output.debator_token_counts.model_usages[model] = ModelTokenUsage()
+
+                logger.info(f"Delivering {len(layer)} independent speeches concurrently")
+                with ThreadPoolExecutor(max_workers=len(layer)) as executor:
+                    futures = [executor.submit(bind_context(deliver_speech), round) for round in layer]
+
+                # Keep every finished speech before surfacing the first failure
+                first_error = None
+                for round, future in zip(layer, futures):
+                    error = future.exception()
+                    if error is not None:
+                        first_error = first_error or error
+                        continue
+                    record_speech(round, future.result())
+                if first_error is not None:
+                    raise first_error
+
+            in_review = set(review_queue.get_pending_judges(path))
+            missing_judges = [model for model in output.get_missing_judges(judge_models) if model not in in_review]
+            if missing_judges:
+                journal.check_owner()
+                judged_before = len(output.judge_results)
+                skipped_before = len(output.skipped_judges)
+                try:
+                    if adaptive_judging:
+                        run_adaptive_judge_panel(
+                            debate=output,
+                            prompts=prompts,
+                            judge_models=missing_judges,
+                            client=client,
+                            cache=cache,
+                            review_queue=review_queue,
+                            structured=structured_judging,
+                            stop_confidence=stop_confidence,
+                        )
+                    else:
+                        run_judge_panel(
+                            debate=output,
+                            prompts=prompts,
+                            judge_models=missing_judges,
+                            client=client,
+                            cache=cache,
+                            review_queue=review_queue,
+                            structured=structured_judging,
+                        )
+                finally:
+                    for judge_result in output.judge_results[judged_before:]:
+                        journal.judge_result_added(judge_result)
+                    if len(output.skipped_judges) > skipped_before:
+                        journal.judges_skipped(output.skipped_judges[skipped_before:])
+                    journal.usage_updated()
+        finally:
+            journal.compact()
 
     return output
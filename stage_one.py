@@ -1,8 +1,13 @@
-from typing import List
+import asyncio
+from typing import List, Optional
+from cost_engine import CostEngine
 from models import DebatePrompts, DebateTopic, DebateTotal
-from run_debate import run_debate
+from response_cache import ResponseCache
+from telemetry import start_telemetry_from_env
+from tournament import DebateJob, get_debate_path, run_tournament
 from pathlib import Path
 import json
+import os
 from debate_prompts import get_debate_prompt
 from load_topics import get_all_topics
 from dotenv import load_dotenv
@@ -23,8 +28,6 @@ def get_judge_models(file_path:str) -> List[str]:
 
     return list(judge_pricing.keys())
 
-NUM_DEBATER_MODELS: int = 5
-
 def load_models_pricing(file_path: str) -> dict[str, List[float]]:
    logging.info(f"Loading pricing from {file_path}")
    with open(file_path, 'r') as f:
@@ -50,41 +53,54 @@ def run_all_debates(
    debate_pairs: List[tuple[str, str, DebateTopic]],
    debate_prompt: DebatePrompts,
    base_path: Path,
-   judge_models: List[str]
+   judge_models: List[str],
+   max_concurrent_debates: int = 4,
+   max_concurrent_calls: int = 16,
+   max_calls_per_model: int = 4,
+   cache: Optional[ResponseCache] = None,
+   resume: bool = False,
+   budget: Optional[CostEngine] = None,
+   stream: bool = False,
+   structured_judging: bool = False,
+   adaptive_judging: bool = False,
+   stop_confidence: Optional[float] = None,
 ) -> List[DebateTotal]:
-   """Runs all debates with given combinations"""
-   results = []
-   for prop_model, opp_model, topic in debate_pairs:
-       safe_prop_name = prop_model.replace('/', '_')
-       safe_opp_name = opp_model.replace('/', '_')
-       debate_path = base_path / f"{safe_prop_name}_{safe_opp_name}.json"
-
-       if debate_path.exists():
-           logging.info(f"Skipping existing debate: {safe_prop_name} vs {safe_opp_name}")
-           continue
-
-       logging.info(f"Running debate: {prop_model} (prop) vs {opp_model} (opp) on topic {topic}")
-       result = run_debate(
+   """Runs all debates with given combinations, several at a time"""
+   jobs = [
+       DebateJob(
            proposition_model=prop_model,
            opposition_model=opp_model,
            motion=topic,
-           prompts=debate_prompt,
-           path=debate_path,
-           judge_models=judge_models
+           path=get_debate_path(base_path, prop_model, opp_model),
        )
-       results.append(result)
-
-   return results
+       for prop_model, opp_model, topic in debate_pairs
+   ]
+
+   return asyncio.run(run_tournament(
+       jobs=jobs,
+       prompts=debate_prompt,
+       judge_models=judge_models,
+       max_concurrent_debates=max_concurrent_debates,
+       max_concurrent_calls=max_concurrent_calls,
+       max_calls_per_model=max_calls_per_model,
+       cache=cache,
+       resume=resume,
+       budget=budget,
+       stream=stream,
+       structured_judging=structured_judging,
+       adaptive_judging=adaptive_judging,
+       stop_confidence=stop_confidence,
+   ))
 
 def main():
    setup_logging()
+   start_telemetry_from_env()
 
    logging.info("Loading debate prompts and topics")
    debate_prompt = get_debate_prompt()
    topic_list = get_all_topics()
 
    models_pricing = load_models_pricing("api_pricing.json")
-   assert len(models_pricing.keys()) == NUM_DEBATER_MODELS, f"Expected {NUM_DEBATER_MODELS} models but got {len(models_pricing.keys())}"
    models_list = list(models_pricing.keys())
 
    output_path = Path("stage_one")
@@ -97,7 +113,14 @@ def main():
        debate_pairs=debate_pairs,
        debate_prompt=debate_prompt,
        base_path=output_path,
-       judge_models=judge_models  # You'll need to define this list
+       judge_models=judge_models,  # You'll need to define this list
+       cache=ResponseCache.from_env(),
+       resume=True,
+       budget=CostEngine.from_env(),
+       stream=os.environ.get("DEBATEBET_STREAM") == "1",
+       structured_judging=os.environ.get("DEBATEBET_STRUCTURED_JUDGING") == "1",
+       adaptive_judging=os.environ.get("DEBATEBET_ADAPTIVE_JUDGING") == "1",
+       stop_confidence=float(os.environ["DEBATEBET_STOP_CONFIDENCE"]) if os.environ.get("DEBATEBET_STOP_CONFIDENCE") else None,
    )
 
 if __name__ == "__main__":
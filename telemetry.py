@@ -0,0 +1,620 @@
+"""
+Spans and per-call metrics for the debate pipeline.
+
+Work is traced as nested spans: tournament -> debate -> round / judge -> attempt.
+Spans follow the code through contextvars, and threads started with bind_context
+carry their caller's span. Every HTTP call the OpenRouterClient makes becomes an
+attempt span under the span that made it, with its model, status, latency, time
+to first byte, rate limiter wait, token counts and attempt number (the nth call
+within its round or judge, so retries count up from 1).
+
+Set DEBATEBET_TELEMETRY to a directory to record a run. Finished spans are appended
+in batches to an OTLP JSON Lines file (one export request per line, as the
+OpenTelemetry collector's file exporter writes them), and a Prometheus text file
+(for node_exporter's textfile collector) is rewritten from running totals at each
+flush. Spans are flushed every few seconds, when a batch fills up, at exit and on
+SIGTERM, so a long run holds only the current batch in memory. To see where the
+wall-clock time went:
+
+    python telemetry.py summary telemetry/
+"""
+import argparse
+import atexit
+from contextlib import contextmanager
+import contextvars
+from dataclasses import dataclass, field
+import functools
+import glob
+import itertools
+import json
+import logging
+import os
+from pathlib import Path
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from openrouter_client import CallRecord, add_call_listener, remove_call_listener
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "debatebet"
+
+# Upper bounds, in seconds, of the Prometheus histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0)
+
+# Finished spans are written at least this often, or once this many are waiting
+DEFAULT_FLUSH_INTERVAL = 10.0
+DEFAULT_BATCH_SIZE = 512
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    start_time: float
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    kind: int = SPAN_KIND_INTERNAL
+    _call_numbers: Iterator[int] = field(default_factory=lambda: itertools.count(1), repr=False)
+
+    @property
+    def duration(self) -> float:
+        return (self.end_time or time.time()) - self.start_time
+
+    def next_call_number(self) -> int:
+        return next(self._call_numbers)
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("debatebet_span", default=None)
+
+_active_telemetry: Optional["Telemetry"] = None
+
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def make_child_span(name: str, attributes: Dict[str, Any], start_time: Optional[float] = None) -> Span:
+    parent = _current_span.get()
+    return Span(
+        name=name,
+        trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+        span_id=os.urandom(8).hex(),
+        parent_span_id=parent.span_id if parent else None,
+        start_time=start_time if start_time is not None else time.time(),
+        attributes=attributes,
+    )
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Times the block as a child of the current span. Does nothing, and yields None,
+    unless telemetry is recording.
+    """
+    telemetry = _active_telemetry
+    if telemetry is None:
+        yield None
+        return
+
+    current = make_child_span(name, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_time = time.time()
+        telemetry.add(current)
+
+
+def set_span_attributes(**attributes) -> None:
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def bind_context(fn: Callable) -> Callable:
+    """
+    Wraps fn to run in a copy of the caller's context, so spans opened on a
+    worker thread nest under the span that submitted it. Bind once per submission;
+    a context cannot be entered by two threads at once.
+    """
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+class Telemetry:
+    """
+    Records every OpenRouter call as an attempt span and streams finished spans to
+    disk, keeping only the batch not yet written and the Prometheus totals.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.directory = Path(directory)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        base = self.directory / f"{SERVICE_NAME}-{self.run_id}"
+        self.spans_path = base.with_suffix(".otlp.jsonl")
+        self.metrics_path = base.with_suffix(".prom")
+        self.metrics = Metrics()
+        self.span_count = 0
+        self._pending: List[Span] = []
+        # Reentrant, since the SIGTERM handler may flush on a thread that is mid-add
+        self._lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, finished: Span) -> None:
+        with self._lock:
+            self._pending.append(finished)
+            self.metrics.observe(finished)
+            self.span_count += 1
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+
+    def on_call(self, record: CallRecord) -> None:
+        end_time = time.time()
+        parent = _current_span.get()
+        attempt = make_child_span(
+            "attempt",
+            {
+                "llm.model": record.model,
+                "llm.attempt": parent.next_call_number() if parent else 1,
+                "llm.stream": bool(record.payload.get("stream")),
+                "llm.prompt_tokens": record.prompt_tokens,
+                "llm.completion_tokens": record.completion_tokens,
+                "llm.queue_time": record.queue_time,
+            },
+            start_time=end_time - record.latency,
+        )
+        attempt.kind = SPAN_KIND_CLIENT
+        attempt.end_time = end_time
+        if record.status_code is not None:
+            attempt.attributes["http.status_code"] = record.status_code
+        if record.time_to_first_byte is not None:
+            attempt.attributes["llm.time_to_first_byte"] = record.time_to_first_byte
+        if record.time_to_first_token is not None:
+            attempt.attributes["llm.time_to_first_token"] = record.time_to_first_token
+        if record.error is not None:
+            attempt.error = f"{type(record.error).__name__}: {record.error}"
+        elif record.status_code != 200:
+            attempt.error = f"HTTP {record.status_code}"
+        self.add(attempt)
+
+    def start(self) -> "Telemetry":
+        global _active_telemetry
+        _active_telemetry = self
+        add_call_listener(self.on_call)
+        self._thread = threading.Thread(target=self._run, name="telemetry-flush", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error(f"Failed to write telemetry to {self.directory}: {e}")
+
+    def stop(self) -> None:
+        """Stops recording and writes what is left. Safe to call more than once."""
+        global _active_telemetry
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if _active_telemetry is self:
+            _active_telemetry = None
+            remove_call_listener(self.on_call)
+        self._wake.set()
+        self.flush()
+        logger.info(f"Wrote {self.span_count} spans to {self.spans_path} and {self.metrics_path}")
+
+    def flush(self) -> None:
+        """Appends the spans finished since the last flush and rewrites the Prometheus file."""
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                metrics_text = self.metrics.format()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if batch:
+                with open(self.spans_path, "a") as f:
+                    f.write(json.dumps(to_otlp(batch)) + "\n")
+            write_atomically(self.metrics_path, metrics_text)
+
+
+def start_telemetry_from_env() -> Optional[Telemetry]:
+    """Starts recording if DEBATEBET_TELEMETRY names a directory."""
+    directory = os.environ.get("DEBATEBET_TELEMETRY")
+    if not directory:
+        return None
+    telemetry = Telemetry(directory).start()
+    atexit.register(telemetry.stop)
+    stop_on_sigterm(telemetry)
+    return telemetry
+
+
+def stop_on_sigterm(telemetry: Telemetry) -> None:
+    """
+    Writes the remaining spans when the process gets SIGTERM, which skips atexit,
+    then hands the signal on to whatever handled it before. Signal handlers can
+    only be installed from the main thread; elsewhere this does nothing.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def handle(signum, frame) -> None:
+        telemetry.stop()
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    signal.signal(signal.SIGTERM, handle)
+
+
+def write_atomically(path: Path, text: str) -> None:
+    # Textfile collectors may read at any moment, so never expose a partial file
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
+
+
+def escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+@dataclass
+class Histogram:
+    # Cumulative counts per LATENCY_BUCKETS bound, as Prometheus exposes them
+    buckets: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    total: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[index] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """Running totals behind the Prometheus file, so spans need not be kept for it."""
+
+    def __init__(self) -> None:
+        self.calls: Dict[Tuple[str, str], int] = {}
+        self.retries: Dict[str, int] = {}
+        self.tokens: Dict[Tuple[str, str], int] = {}
+        self.queue_seconds: Dict[str, float] = {}
+        self.latencies: Dict[str, Histogram] = {}
+        self.first_bytes: Dict[str, Histogram] = {}
+        self.span_seconds: Dict[str, Histogram] = {}
+
+    def observe(self, item: Span) -> None:
+        self.span_seconds.setdefault(item.name, Histogram()).observe(item.duration)
+        if item.name != "attempt":
+            return
+        attributes = item.attributes
+        model = attributes.get("llm.model", "")
+        status = str(attributes.get("http.status_code", "error"))
+        self.calls[model, status] = self.calls.get((model, status), 0) + 1
+        if attributes.get("llm.attempt", 1) > 1:
+            self.retries[model] = self.retries.get(model, 0) + 1
+        for kind in ("prompt", "completion"):
+            self.tokens[model, kind] = self.tokens.get((model, kind), 0) + attributes.get(f"llm.{kind}_tokens", 0)
+        self.queue_seconds[model] = self.queue_seconds.get(model, 0.0) + attributes.get("llm.queue_time", 0.0)
+        self.latencies.setdefault(model, Histogram()).observe(item.duration)
+        if "llm.time_to_first_byte" in attributes:
+            self.first_bytes.setdefault(model, Histogram()).observe(attributes["llm.time_to_first_byte"])
+
+    def format(self) -> str:
+        lines: List[str] = []
+
+        def add_counter(name: str, help_text: str, values: Dict[Any, float], label_names: Tuple[str, ...]) -> None:
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} counter"])
+            for key, value in sorted(values.items()):
+                key = key if isinstance(key, tuple) else (key,)
+                lines.append(f"{name}{format_labels(dict(zip(label_names, key)))} {value}")
+
+        def add_histogram(name: str, help_text: str, values: Dict[str, Histogram], label_name: str) -> None:
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} histogram"])
+            for label, histogram in sorted(values.items()):
+                for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+                    lines.append(f"{name}_bucket{format_labels({label_name: label, 'le': bound})} {count}")
+                lines.append(f"{name}_bucket{format_labels({label_name: label, 'le': '+Inf'})} {histogram.count}")
+                lines.append(f"{name}_sum{format_labels({label_name: label})} {histogram.total}")
+                lines.append(f"{name}_count{format_labels({label_name: label})} {histogram.count}")
+
+        add_counter("debatebet_llm_calls_total", "OpenRouter calls by HTTP status.", self.calls, ("model", "status"))
+        add_counter("debatebet_llm_retries_total", "Calls that were not the first attempt.", self.retries, ("model",))
+        add_counter("debatebet_llm_tokens_total", "Tokens reported by OpenRouter.", self.tokens, ("model", "type"))
+        add_counter(
+            "debatebet_llm_queue_seconds_total",
+            "Time calls waited for a rate limiter slot.",
+            self.queue_seconds,
+            ("model",),
+        )
+        add_histogram("debatebet_llm_call_duration_seconds", "OpenRouter call latency.", self.latencies, "model")
+        add_histogram(
+            "debatebet_llm_time_to_first_byte_seconds", "Time until response headers.", self.first_bytes, "model"
+        )
+        add_histogram("debatebet_span_duration_seconds", "Duration of pipeline spans.", self.span_seconds, "span")
+        return "\n".join(lines) + "\n"
+
+
+def format_prometheus(spans: List[Span]) -> str:
+    metrics = Metrics()
+    for item in spans:
+        metrics.observe(item)
+    return metrics.format()
+
+
+def to_otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP JSON encodes 64-bit integers as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def from_otlp_value(value: dict) -> Any:
+    if "intValue" in value:
+        return int(value["intValue"])
+    for key in ("boolValue", "doubleValue", "stringValue"):
+        if key in value:
+            return value[key]
+    return None
+
+
+def to_otlp(spans: List[Span]) -> dict:
+    otlp_spans = []
+    for item in spans:
+        otlp_span = {
+            "traceId": item.trace_id,
+            "spanId": item.span_id,
+            "name": item.name,
+            "kind": item.kind,
+            "startTimeUnixNano": str(int(item.start_time * 1e9)),
+            "endTimeUnixNano": str(int((item.end_time or item.start_time) * 1e9)),
+            "attributes": [{"key": key, "value": to_otlp_value(value)} for key, value in item.attributes.items()],
+            "status": {"code": STATUS_ERROR, "message": item.error} if item.error else {"code": STATUS_OK},
+        }
+        if item.parent_span_id:
+            otlp_span["parentSpanId"] = item.parent_span_id
+        otlp_spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+            ]},
+            "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": otlp_spans}],
+        }]
+    }
+
+
+def from_otlp(document: dict) -> List[Span]:
+    spans = []
+    for resource_spans in document.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for otlp_span in scope_spans.get("spans", []):
+                status = otlp_span.get("status", {})
+                spans.append(Span(
+                    name=otlp_span["name"],
+                    trace_id=otlp_span["traceId"],
+                    span_id=otlp_span["spanId"],
+                    parent_span_id=otlp_span.get("parentSpanId") or None,
+                    start_time=int(otlp_span["startTimeUnixNano"]) / 1e9,
+                    end_time=int(otlp_span["endTimeUnixNano"]) / 1e9,
+                    attributes={
+                        attribute["key"]: from_otlp_value(attribute["value"])
+                        for attribute in otlp_span.get("attributes", [])
+                    },
+                    error=status.get("message") if status.get("code") == STATUS_ERROR else None,
+                    kind=otlp_span.get("kind", SPAN_KIND_INTERNAL),
+                ))
+    return spans
+
+
+def load_spans(paths: List[Union[str, Path]]) -> List[Span]:
+    """
+    Reads OTLP JSON Lines files, or single-document *.otlp.json files; a directory
+    stands for every such file in it. A torn last line, left by a killed process,
+    is ignored.
+    """
+    spans = []
+    for path in paths:
+        if Path(path).is_dir():
+            files = sorted(glob.glob(str(Path(path) / "*.otlp.json*")))
+            files = [file for file in files if file.endswith((".otlp.json", ".otlp.jsonl"))]
+        else:
+            files = [str(path)]
+        for file in files:
+            with open(file) as f:
+                if not file.endswith(".jsonl"):
+                    spans.extend(from_otlp(json.load(f)))
+                    continue
+                lines = f.read().splitlines()
+            for line_number, line in enumerate(lines):
+                try:
+                    document = json.loads(line)
+                except ValueError:
+                    if line_number == len(lines) - 1:
+                        logger.warning(f"Ignoring torn last line of {file}")
+                        break
+                    raise
+                spans.extend(from_otlp(document))
+    return spans
+
+
+def get_covered_time(intervals: List[Tuple[float, float]]) -> float:
+    """Length of the union of the intervals, so overlapping children are not counted twice."""
+    covered = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                covered += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        covered += current_end - current_start
+    return covered
+
+
+def get_percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def summarize(spans: List[Span]) -> dict:
+    """
+    Per span name: count, total and self time (the time not covered by any child
+    span, e.g. backoff sleeps and parsing), plus per-model call statistics.
+    """
+    children: Dict[str, List[Span]] = {}
+    for item in spans:
+        if item.parent_span_id:
+            children.setdefault(item.parent_span_id, []).append(item)
+
+    by_name: Dict[str, dict] = {}
+    for item in spans:
+        stats = by_name.setdefault(item.name, {"count": 0, "errors": 0, "durations": [], "self": 0.0})
+        stats["count"] += 1
+        stats["errors"] += item.error is not None
+        stats["durations"].append(item.duration)
+        end_time = item.end_time or item.start_time
+        covered = get_covered_time([
+            (max(child.start_time, item.start_time), min(child.end_time or child.start_time, end_time))
+            for child in children.get(item.span_id, [])
+        ])
+        stats["self"] += max(0.0, item.duration - covered)
+
+    models: Dict[str, dict] = {}
+    for item in spans:
+        if item.name != "attempt":
+            continue
+        attributes = item.attributes
+        stats = models.setdefault(attributes.get("llm.model", ""), {
+            "calls": 0, "errors": 0, "retries": 0, "latencies": [], "first_bytes": [],
+            "queue": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+        })
+        stats["calls"] += 1
+        stats["errors"] += item.error is not None
+        stats["retries"] += attributes.get("llm.attempt", 1) > 1
+        stats["latencies"].append(item.duration)
+        if attributes.get("llm.time_to_first_byte") is not None:
+            stats["first_bytes"].append(attributes["llm.time_to_first_byte"])
+        stats["queue"] += attributes.get("llm.queue_time", 0.0)
+        stats["prompt_tokens"] += attributes.get("llm.prompt_tokens", 0)
+        stats["completion_tokens"] += attributes.get("llm.completion_tokens", 0)
+
+    roots = [item for item in spans if item.parent_span_id is None]
+    return {
+        "wall_clock": get_covered_time([(item.start_time, item.end_time or item.start_time) for item in roots]),
+        "traces": len({item.trace_id for item in spans}),
+        "spans": {
+            name: {
+                "count": stats["count"],
+                "errors": stats["errors"],
+                "total": sum(stats["durations"]),
+                "self": stats["self"],
+                "mean": sum(stats["durations"]) / stats["count"],
+                "p95": get_percentile(stats["durations"], 0.95),
+            }
+            for name, stats in by_name.items()
+        },
+        "models": {
+            model: {
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "retries": stats["retries"],
+                "mean_latency": sum(stats["latencies"]) / stats["calls"],
+                "p95_latency": get_percentile(stats["latencies"], 0.95),
+                "mean_first_byte": (
+                    sum(stats["first_bytes"]) / len(stats["first_bytes"]) if stats["first_bytes"] else None
+                ),
+                "queue": stats["queue"],
+                "prompt_tokens": stats["prompt_tokens"],
+                "completion_tokens": stats["completion_tokens"],
+            }
+            for model, stats in models.items()
+        },
+    }
+
+
+def print_summary(summary: dict) -> None:
+    print(f"Wall clock {summary['wall_clock']:.1f}s across {summary['traces']} traces\n")
+    print(f"{'span':<12}{'count':>8}{'errors':>8}{'total s':>12}{'self s':>12}{'mean s':>10}{'p95 s':>10}")
+    for name, stats in sorted(summary["spans"].items(), key=lambda item: -item[1]["total"]):
+        print(
+            f"{name:<12}{stats['count']:>8}{stats['errors']:>8}{stats['total']:>12.1f}"
+            f"{stats['self']:>12.1f}{stats['mean']:>10.2f}{stats['p95']:>10.2f}"
+        )
+
+    print(
+        f"\n{'model':<40}{'calls':>7}{'errors':>8}{'retries':>9}{'mean s':>9}{'p95 s':>8}"
+        f"{'ttfb s':>8}{'queue s':>9}{'tokens in':>11}{'out':>9}"
+    )
+    for model, stats in sorted(summary["models"].items(), key=lambda item: -item[1]["calls"] * item[1]["mean_latency"]):
+        first_byte = f"{stats['mean_first_byte']:.2f}" if stats["mean_first_byte"] is not None else "-"
+        print(
+            f"{model:<40}{stats['calls']:>7}{stats['errors']:>8}{stats['retries']:>9}"
+            f"{stats['mean_latency']:>9.2f}{stats['p95_latency']:>8.2f}{first_byte:>8}{stats['queue']:>9.1f}"
+            f"{stats['prompt_tokens']:>11}{stats['completion_tokens']:>9}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect telemetry recorded with DEBATEBET_TELEMETRY")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    summary_parser = subcommands.add_parser("summary", help="Show where the wall-clock time of a run went")
+    summary_parser.add_argument("paths", nargs="+", type=Path, help="OTLP JSON (Lines) files or directories of them")
+    summary_parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        summary = summarize(load_spans(args.paths))
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import json
+
+import pytest
+
+from debate_journal import DebateJournal, JournalWriter, LeaseLostError, get_journal_path, load_journaled_debate
+from models import (
+    DebatePrompts,
+    DebateTopic,
+    DebateTotal,
+    JudgeResult,
+    Side,
+    SpeechType,
+    TopicCategory,
+)
+
+
+@pytest.fixture
+def writer():
+    return JournalWriter()
+
+
+@pytest.fixture
+def debate(tmp_path):
+    return DebateTotal(
+        motion=DebateTopic(topic_description="This house would test", category=TopicCategory.CULTURE_AND_VALUES),
+        path_to_store=tmp_path / "debate.json",
+        proposition_model="mock/model-00",
+        opposition_model="mock/model-01",
+        prompts=DebatePrompts(
+            first_speech_prompt="first",
+            rebuttal_speech_prompt="rebuttal",
+            final_speech_prompt="final",
+            judge_prompt="judge",
+        ),
+        judge_models=["mock/judge-00", "mock/judge-01", "mock/judge-02"],
+    )
+
+
+def add_usage(debate: DebateTotal) -> None:
+    debate.debator_token_counts.add_successful_call("mock/model-00", 100, 400, 500)
+    debate.judge_token_counts.add_successful_call("mock/judge-00", 50, 900, 950, cached_prompt_tokens=300)
+
+
+def test_replays_events_over_existing_document(writer, debate):
+    debate.proposition_output.speeches[SpeechType.OPENING] = "stored opening"
+    debate.save_to_json()
+
+    journal = DebateJournal(debate, writer)
+    journal.speech_added(Side.OPPOSITION, SpeechType.OPENING, "journaled opening")
+    result = JudgeResult(model="mock/judge-00", winner="opposition", confidence=70, logic="logic", prompt_version="v1")
+    journal.judge_result_added(result)
+    journal.judges_skipped(["mock/judge-02"])
+    add_usage(debate)
+    journal.usage_updated()
+    writer.flush()
+
+    replayed = load_journaled_debate(debate.path_to_store)
+    assert replayed.path_to_store == debate.path_to_store
+    assert replayed.motion == debate.motion
+    assert replayed.prompts == debate.prompts
+    assert replayed.proposition_output.speeches[SpeechType.OPENING] == "stored opening"
+    assert replayed.opposition_output.speeches[SpeechType.OPENING] == "journaled opening"
+    assert replayed.opposition_output.speeches[SpeechType.REBUTTAL] == -1
+    assert replayed.judge_results == [result]
+    assert replayed.skipped_judges == ["mock/judge-02"]
+    assert replayed.debator_token_counts == debate.debator_token_counts
+    assert replayed.judge_token_counts == debate.judge_token_counts
+
+
+def test_replays_journal_without_document(writer, debate):
+    journal = DebateJournal(debate, writer)
+    journal.start()
+    journal.speech_added(Side.PROPOSITION, SpeechType.OPENING, "opening")
+    writer.flush()
+
+    assert not debate.path_to_store.exists()
+    replayed = load_journaled_debate(debate.path_to_store)
+    assert replayed.proposition_model == "mock/model-00"
+    assert replayed.judge_models == debate.judge_models
+    assert replayed.proposition_output.speeches[SpeechType.OPENING] == "opening"
+
+
+def test_ignores_torn_last_line(writer, debate):
+    journal = DebateJournal(debate, writer)
+    journal.start()
+    journal.speech_added(Side.PROPOSITION, SpeechType.OPENING, "opening")
+    writer.flush()
+    with open(journal.journal_path, "a") as f:
+        f.write('{"event": "speech_added", "side": "opposition", "spe')
+
+    replayed = load_journaled_debate(debate.path_to_store)
+    assert replayed.proposition_output.speeches[SpeechType.OPENING] == "opening"
+    assert replayed.opposition_output.speeches[SpeechType.OPENING] == -1
+
+
+def test_rejects_corrupt_line_before_the_end(writer, debate):
+    journal = DebateJournal(debate, writer)
+    journal.start()
+    writer.flush()
+    with open(journal.journal_path, "a") as f:
+        f.write("not json\n")
+    journal.speech_added(Side.PROPOSITION, SpeechType.OPENING, "opening")
+    writer.flush()
+
+    with pytest.raises(ValueError):
+        load_journaled_debate(debate.path_to_store)
+
+
+def test_reset_in_same_batch_drops_earlier_appends(writer, debate):
+    journal_path = get_journal_path(debate.path_to_store)
+
+    def append(event: dict) -> tuple:
+        return ("append", journal_path, json.dumps(event), None)
+
+    stale = {"event": "speech_added", "side": "proposition", "speech_type": "opening", "speech": "stale"}
+    fresh = {"event": "speech_added", "side": "opposition", "speech_type": "opening", "speech": "fresh"}
+    # One batch, as the writer thread sees it after a burst of events
+    writer._process([
+        append({"event": "created", "debate": debate.to_dict()}),
+        append(stale),
+        ("reset", journal_path, json.dumps({"event": "created", "debate": debate.to_dict()}), None),
+        append(fresh),
+    ])
+
+    lines = journal_path.read_text().splitlines()
+    assert [json.loads(line)["event"] for line in lines] == ["created", "speech_added"]
+    replayed = load_journaled_debate(debate.path_to_store)
+    assert replayed.proposition_output.speeches[SpeechType.OPENING] == -1
+    assert replayed.opposition_output.speeches[SpeechType.OPENING] == "fresh"
+
+
+def test_start_replaces_a_stale_journal(writer, debate):
+    journal = DebateJournal(debate, writer)
+    journal.start()
+    journal.speech_added(Side.PROPOSITION, SpeechType.OPENING, "from the crashed run")
+    writer.flush()
+
+    DebateJournal(debate, writer).start()
+    writer.flush()
+
+    assert len(journal.journal_path.read_text().splitlines()) == 1
+    replayed = load_journaled_debate(debate.path_to_store)
+    assert replayed.proposition_output.speeches[SpeechType.OPENING] == -1
+
+
+def test_compact_writes_document_and_removes_journal(writer, debate):
+    journal = DebateJournal(debate, writer)
+    journal.start()
+    debate.proposition_output.speeches[SpeechType.OPENING] = "opening"
+    journal.speech_added(Side.PROPOSITION, SpeechType.OPENING, "opening")
+    result = JudgeResult(model="mock/judge-01", winner="proposition", confidence=60, logic="logic")
+    debate.judge_results.append(result)
+    journal.judge_result_added(result)
+    add_usage(debate)
+    journal.usage_updated()
+    journal.compact()
+
+    assert not journal.journal_path.exists()
+    stored = DebateTotal.load_from_json(debate.path_to_store)
+    assert stored.proposition_output.speeches[SpeechType.OPENING] == "opening"
+    assert stored.judge_results == [result]
+    assert stored.debator_token_counts == debate.debator_token_counts
+    assert stored.judge_token_counts == debate.judge_token_counts
+    assert load_journaled_debate(debate.path_to_store) == stored
+
+
+def test_lost_ownership_stops_writes(writer, debate):
+    owned = [True]
+    journal = DebateJournal(debate, writer, is_owner=lambda: owned[0])
+    journal.start()
+    writer.flush()
+
+    owned[0] = False
+    with pytest.raises(LeaseLostError):
+        journal.speech_added(Side.PROPOSITION, SpeechType.OPENING, "opening")
+    journal.compact()
+
+    assert journal.journal_path.exists()
+    assert not debate.path_to_store.exists()
@@ -0,0 +1,118 @@
+import logging
+
+import numpy as np
+import pytest
+
+from ratings import BASE_RATING, RATING_SCALE, JudgeVotes, bootstrap_ratings, fit_bradley_terry
+
+# wins[i, j]: model 0 beats 1 8-2, model 1 beats 2 7-3, model 0 beats 2 9-1
+WINS = np.array([
+    [0.0, 8.0, 9.0],
+    [2.0, 0.0, 7.0],
+    [1.0, 3.0, 0.0],
+])
+
+
+def get_strengths(ratings: np.ndarray) -> np.ndarray:
+    return 10 ** ((ratings - BASE_RATING) / RATING_SCALE)
+
+
+def test_fit_orders_models_and_centres_ratings():
+    ratings = fit_bradley_terry(WINS, prior=0.0)
+    assert list(np.argsort(-ratings)) == [0, 1, 2]
+    assert np.log10(get_strengths(ratings)).mean() == pytest.approx(0.0, abs=1e-9)
+
+
+def test_fit_converges_to_the_maximum_likelihood_equations(caplog):
+    with caplog.at_level(logging.WARNING, logger="ratings"):
+        ratings = fit_bradley_terry(WINS, prior=0.0, tolerance=1e-10)
+    assert "did not converge" not in caplog.text
+
+    # At the MLE, each model's expected wins equal its observed wins
+    strengths = get_strengths(ratings)
+    games = WINS + WINS.T
+    expected = (games * strengths[:, None] / (strengths[:, None] + strengths[None, :])).sum(axis=1)
+    np.testing.assert_allclose(expected, WINS.sum(axis=1), rtol=1e-6)
+
+
+def test_two_models_match_closed_form():
+    ratings = fit_bradley_terry(np.array([[0.0, 3.0], [1.0, 0.0]]), prior=0.0, tolerance=1e-10)
+    assert ratings[0] - ratings[1] == pytest.approx(RATING_SCALE * np.log10(3.0), abs=1e-4)
+
+
+def test_prior_keeps_unbeaten_model_finite_and_shrinks_gaps():
+    unbeaten = np.array([[0.0, 5.0], [0.0, 0.0]])
+    ratings = fit_bradley_terry(unbeaten, prior=0.5, tolerance=1e-10)
+    assert np.all(np.isfinite(ratings))
+    assert ratings[0] - ratings[1] == pytest.approx(RATING_SCALE * np.log10(5.5 / 0.5), abs=1e-4)
+
+    gaps = [np.ptp(fit_bradley_terry(WINS, prior=prior)) for prior in (0.0, 0.5, 5.0)]
+    assert gaps[0] > gaps[1] > gaps[2] > 0
+
+
+def test_prior_only_applies_to_pairs_that_met():
+    # Models 0 and 2 never met, so no pseudo-games link them directly
+    wins = np.array([
+        [0.0, 4.0, 0.0],
+        [1.0, 0.0, 4.0],
+        [0.0, 1.0, 0.0],
+    ])
+    ratings = fit_bradley_terry(wins, prior=0.5)
+    assert list(np.argsort(-ratings)) == [0, 1, 2]
+
+
+def test_warm_start_reaches_the_same_fixed_point(caplog):
+    cold = fit_bradley_terry(WINS, tolerance=1e-10)
+
+    # Warm-start from the ratings before one more debate was added, as rating_service does
+    before = WINS.copy()
+    before[0, 1] -= 1
+    previous = fit_bradley_terry(before, tolerance=1e-10)
+    warm = fit_bradley_terry(WINS, tolerance=1e-10, initial_ratings=previous)
+    np.testing.assert_allclose(warm, cold, atol=1e-5)
+
+    # Starting at the solution converges at once
+    with caplog.at_level(logging.WARNING, logger="ratings"):
+        again = fit_bradley_terry(WINS, tolerance=1e-8, max_iterations=2, initial_ratings=cold)
+    assert "did not converge" not in caplog.text
+    np.testing.assert_allclose(again, cold, atol=1e-5)
+
+
+def test_empty_matrix():
+    assert fit_bradley_terry(np.zeros((0, 0))).shape == (0,)
+
+
+def make_votes() -> JudgeVotes:
+    # One vote per debate, following WINS
+    winners, losers = [], []
+    for winner in range(3):
+        for loser in range(3):
+            count = int(WINS[winner, loser])
+            winners += [winner] * count
+            losers += [loser] * count
+    return JudgeVotes(
+        models=["mock/model-00", "mock/model-01", "mock/model-02"],
+        winners=np.asarray(winners, dtype=np.int64),
+        losers=np.asarray(losers, dtype=np.int64),
+        weights=np.ones(len(winners)),
+        debates=np.arange(len(winners), dtype=np.int64),
+        num_debates=len(winners),
+    )
+
+
+def test_bootstrap_is_reproducible_and_brackets_the_fit():
+    votes = make_votes()
+    samples = bootstrap_ratings(votes, samples=200, processes=1, seed=7)
+    assert samples.shape == (200, 3)
+    np.testing.assert_array_equal(samples, bootstrap_ratings(votes, samples=200, processes=1, seed=7))
+
+    point = fit_bradley_terry(WINS)
+    lower, upper = np.percentile(samples, [2.5, 97.5], axis=0)
+    assert np.all(lower < point) and np.all(point < upper)
+    assert list(np.argsort(-np.median(samples, axis=0))) == [0, 1, 2]
+
+
+def test_bootstrap_across_processes_returns_every_sample():
+    samples = bootstrap_ratings(make_votes(), samples=10, processes=2, seed=7)
+    assert samples.shape == (10, 3)
+    assert np.all(np.isfinite(samples))
@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import time
+
+import pytest
+
+from models import DebateTopic, TopicCategory
+from tournament import DebateJob
+from work_queue import WorkQueue
+
+LEASE_SECONDS = 0.2
+
+
+def make_job(index: int) -> DebateJob:
+    return DebateJob(
+        proposition_model=f"mock/model-{index}",
+        opposition_model="mock/model-x",
+        motion=DebateTopic(topic_description=f"Motion {index}", category=TopicCategory.CULTURE_AND_VALUES),
+        path=Path(f"debate_{index}.json"),
+    )
+
+
+@pytest.fixture
+def queues(tmp_path):
+    """Two workers' connections to one queue file, as two processes would have."""
+    path = tmp_path / "work_queue.sqlite"
+    first = WorkQueue(path, lease_seconds=LEASE_SECONDS, max_attempts=2)
+    second = WorkQueue(path, lease_seconds=LEASE_SECONDS, max_attempts=2)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def wait_for_expiry() -> None:
+    time.sleep(LEASE_SECONDS * 1.5)
+
+
+def test_add_jobs_ignores_paths_already_queued(queues):
+    first, second = queues
+    assert first.add_jobs([make_job(0), make_job(1)]) == 2
+    assert second.add_jobs([make_job(1), make_job(2)]) == 1
+    assert first.get_counts() == {"pending": 3}
+
+
+def test_job_is_not_claimed_twice(queues):
+    first, second = queues
+    first.add_jobs([make_job(0)])
+    claimed = first.claim("worker-a")
+    assert claimed is not None
+    assert claimed.job.proposition_model == "mock/model-0"
+    assert second.claim("worker-b") is None
+
+
+def test_concurrent_claims_never_share_a_job(queues):
+    first, second = queues
+    first.add_jobs([make_job(index) for index in range(40)])
+
+    def claim_all(queue: WorkQueue, worker: str) -> list:
+        claimed_ids = []
+        while (claimed := queue.claim(worker)) is not None:
+            claimed_ids.append(claimed.id)
+            queue.heartbeat(claimed.id, worker)
+        return claimed_ids
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(claim_all, queue, f"worker-{index}")
+            for index, queue in enumerate([first, second, first, second])
+        ]
+        claimed_ids = [job_id for future in futures for job_id in future.result()]
+
+    assert len(claimed_ids) == 40
+    assert len(set(claimed_ids)) == 40
+
+
+def test_heartbeat_keeps_the_lease(queues):
+    first, second = queues
+    first.add_jobs([make_job(0)])
+    claimed = first.claim("worker-a")
+    for _ in range(3):
+        time.sleep(LEASE_SECONDS / 2)
+        assert first.heartbeat(claimed.id, "worker-a") is not None
+    assert second.claim("worker-b") is None
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_is_locked_out(queues):
+    first, second = queues
+    first.add_jobs([make_job(0)])
+    claimed = first.claim("worker-a")
+    wait_for_expiry()
+
+    reclaimed = second.claim("worker-b")
+    assert reclaimed is not None
+    assert reclaimed.id == claimed.id
+
+    assert first.heartbeat(claimed.id, "worker-a") is None
+    assert not first.complete(claimed.id, "worker-a")
+    assert not first.fail(claimed.id, "worker-a", RuntimeError("too late"))
+    assert first.get_counts() == {"claimed": 1}
+
+    assert second.complete(reclaimed.id, "worker-b")
+    assert first.get_counts() == {"done": 1}
+
+
+def test_expired_lease_on_last_attempt_fails_the_job(queues):
+    first, second = queues
+    first.add_jobs([make_job(0)])
+    first.claim("worker-a")
+    wait_for_expiry()
+    assert second.claim("worker-b") is not None
+    wait_for_expiry()
+
+    assert first.claim("worker-c") is None
+    assert first.get_counts() == {"failed": 1}
+
+
+def test_fail_retries_until_max_attempts(queues):
+    first, second = queues
+    first.add_jobs([make_job(0)])
+
+    claimed = first.claim("worker-a")
+    assert first.fail(claimed.id, "worker-a", RuntimeError("first"))
+    assert first.get_counts() == {"pending": 1}
+
+    claimed = second.claim("worker-b")
+    assert second.fail(claimed.id, "worker-b", RuntimeError("second"))
+    assert first.get_counts() == {"failed": 1}
+    assert first.claim("worker-a") is None
@@ -0,0 +1,248 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import functools
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from cost_engine import SPEECHES_PER_SIDE, CostEngine
+from debate_journal import get_journal_path, load_journaled_debate
+from models import DebatePrompts, DebateTopic, DebateTotal, Side
+from openrouter_client import OpenRouterClient
+from rate_limiter import ModelRateLimiter
+from response_cache import ResponseCache
+from run_debate import run_debate
+from telemetry import bind_context, span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DebateJob:
+    proposition_model: str
+    opposition_model: str
+    motion: DebateTopic
+    path: Path
+
+
+def get_debate_path(base_path: Path, proposition_model: str, opposition_model: str) -> Path:
+    safe_prop_name = proposition_model.replace('/', '_')
+    safe_opp_name = opposition_model.replace('/', '_')
+    return base_path / f"{safe_prop_name}_{safe_opp_name}.json"
+
+
+def get_remaining_calls(job: DebateJob, judge_models: List[str]) -> Tuple[int, int, List[str]]:
+    """(proposition speeches, opposition speeches, judges) the job still needs."""
+    try:
+        debate = load_journaled_debate(job.path) if job.path.exists() or get_journal_path(job.path).exists() else None
+    except (ValueError, KeyError):
+        debate = None
+    if debate is None:
+        return SPEECHES_PER_SIDE, SPEECHES_PER_SIDE, list(judge_models)
+
+    missing_sides = [side for side, _ in debate.get_missing_speeches()]
+    return (
+        missing_sides.count(Side.PROPOSITION),
+        missing_sides.count(Side.OPPOSITION),
+        debate.get_missing_judges(judge_models),
+    )
+
+
+def is_debate_complete(path: Path, judge_models: List[str]) -> bool:
+    try:
+        return load_journaled_debate(path).is_complete(judge_models)
+    except (ValueError, KeyError):
+        return False
+
+
+def make_tournament_client(
+    max_concurrent_calls: int = 16,
+    max_calls_per_model: int = 4,
+    per_model_limits: Optional[Dict[str, int]] = None,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    per_model_rates: Optional[Dict[str, Dict[str, float]]] = None,
+    budget: Optional[CostEngine] = None,
+) -> OpenRouterClient:
+    """The client every debate of a tournament shares, with its ModelRateLimiter."""
+    return OpenRouterClient(
+        pool_size=max_concurrent_calls,
+        limiter=ModelRateLimiter(
+            max_concurrent_calls=max_concurrent_calls,
+            max_calls_per_model=max_calls_per_model,
+            per_model_limits=per_model_limits,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            per_model_rates=per_model_rates,
+        ),
+        budget=budget,
+    )
+
+
+async def run_tournament(
+    jobs: List[DebateJob],
+    prompts: DebatePrompts,
+    judge_models: List[str],
+    max_concurrent_debates: int = 4,
+    max_concurrent_calls: int = 16,
+    max_calls_per_model: int = 4,
+    per_model_limits: Optional[Dict[str, int]] = None,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    per_model_rates: Optional[Dict[str, Dict[str, float]]] = None,
+    cache: Optional[ResponseCache] = None,
+    resume: bool = False,
+    budget: Optional[CostEngine] = None,
+    stream: bool = False,
+    structured_judging: bool = False,
+    adaptive_judging: bool = False,
+    stop_confidence: Optional[float] = None,
+    client: Optional[OpenRouterClient] = None,
+) -> List[DebateTotal]:
+    """
+    Runs many debates at once from a single process.
+
+    Debates whose output file already exists are skipped. With resume, only
+    complete ones are skipped and partial ones are finished from their first
+    missing speech or judge. Every debate shares one
+    OpenRouterClient, and with it one connection pool and one ModelRateLimiter, so
+    the global cap and each model's request, token and concurrency limits hold
+    across the whole tournament.
+    A failed debate is logged and does not stop the others; results are returned
+    in job order.
+
+    With a budget, the next debate to start is always the one projected to be
+    cheapest to finish, so partial debates go first and more debates complete per
+    dollar. Projections use the cost per call observed so far. The hard limit is
+    enforced per call by the client; once it refuses a call, or the soft limit is
+    reached, no new debates start.
+
+    With stream, speeches are streamed and malformed ones aborted early; with
+    structured_judging, judges return JSON verdicts; with adaptive_judging, judges
+    that could not change the outcome are skipped; see run_debate.
+
+    A client passed in (see make_tournament_client) is used instead of a new one
+    and left open, so a caller running several tournaments keeps its connection
+    pool and the limiter's learned state; the limit options are then ignored.
+    """
+    owns_client = client is None
+    if owns_client:
+        client = make_tournament_client(
+            max_concurrent_calls=max_concurrent_calls,
+            max_calls_per_model=max_calls_per_model,
+            per_model_limits=per_model_limits,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            per_model_rates=per_model_rates,
+            budget=budget,
+        )
+
+    pending = []
+    for job in jobs:
+        if job.path.exists() or get_journal_path(job.path).exists():
+            if not resume:
+                logger.info(f"{job.path} already exists. SKIPPING")
+                continue
+            if is_debate_complete(job.path, judge_models):
+                logger.info(f"{job.path} is complete. SKIPPING")
+                continue
+            logger.info(f"{job.path} is incomplete. RESUMING")
+        pending.append(job)
+
+    if not pending:
+        return []
+
+    loop = asyncio.get_running_loop()
+    queue = list(pending)
+    outcomes: Dict[int, object] = {}
+    started = 0
+    remaining_calls = {id(job): get_remaining_calls(job, judge_models) for job in pending} if budget else {}
+
+    def estimate_cost(job: DebateJob) -> float:
+        proposition_speeches, opposition_speeches, judges = remaining_calls[id(job)]
+        return budget.estimate_debate_cost(
+            job.proposition_model,
+            job.opposition_model,
+            judges,
+            proposition_speeches=proposition_speeches,
+            opposition_speeches=opposition_speeches,
+        )
+
+    def next_job() -> Optional[DebateJob]:
+        if not queue:
+            return None
+        if budget is None:
+            return queue.pop(0)
+        if budget.is_soft_limit_reached() or budget.refused_calls:
+            logger.warning(
+                f"Budget limit reached (${budget.spent:.4f} spent), not starting "
+                f"the {len(queue)} remaining debates"
+            )
+            queue.clear()
+            return None
+        job = min(queue, key=estimate_cost)
+        queue.remove(job)
+        return job
+
+    async def run_jobs() -> None:
+        nonlocal started
+        while (job := next_job()) is not None:
+            started += 1
+            logger.info(
+                f"Running debate {started}/{len(pending)}: {job.proposition_model} (prop) "
+                f"vs {job.opposition_model} (opp) on topic {job.motion.topic_description}"
+            )
+            try:
+                outcomes[id(job)] = await loop.run_in_executor(
+                    executor,
+                    bind_context(functools.partial(
+                        run_debate,
+                        proposition_model=job.proposition_model,
+                        opposition_model=job.opposition_model,
+                        motion=job.motion,
+                        prompts=prompts,
+                        path=job.path,
+                        judge_models=judge_models,
+                        client=client,
+                        cache=cache,
+                        resume=resume,
+                        stream=stream,
+                        structured_judging=structured_judging,
+                        adaptive_judging=adaptive_judging,
+                        stop_confidence=stop_confidence,
+                    )),
+                )
+            except Exception as e:
+                outcomes[id(job)] = e
+            if budget:
+                projected = sum(estimate_cost(queued) for queued in queue)
+                logger.info(f"Spent ${budget.spent:.4f}, projected ${projected:.4f} for the {len(queue)} debates left")
+
+    try:
+        with span("tournament", debates=len(pending)):
+            with ThreadPoolExecutor(max_workers=max_concurrent_debates) as executor:
+                await asyncio.gather(*(run_jobs() for _ in range(min(max_concurrent_debates, len(pending)))))
+    finally:
+        if owns_client:
+            client.close()
+
+    results = []
+    for job in pending:
+        if id(job) not in outcomes:
+            continue
+        outcome = outcomes[id(job)]
+        if isinstance(outcome, BaseException):
+            logger.error(
+                f"Debate {job.proposition_model} vs {job.opposition_model} failed: {outcome}",
+                exc_info=outcome,
+            )
+            continue
+        results.append(outcome)
+
+    logger.info(f"Finished {len(results)}/{len(pending)} debates")
+    if cache:
+        logger.info(f"Response cache stats: {cache.get_stats()}")
+    if budget:
+        logger.info(f"Budget: {budget.get_summary()}")
+    return results
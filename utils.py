@@ -1,5 +1,5 @@
 from collections import Counter
-from typing import List
+from typing import Dict, List
 from models import Round, Side, SpeechType
 
 
@@ -24,3 +24,42 @@ def make_rounds() -> List[Round]:
             raise ValueError("Found duplicate speech type for a side in rounds")
 
     return [Round(side, speech_type) for side, speech_type in rounds]
+
+
+def get_round_dependencies(rounds: List[Round]) -> Dict[int, List[int]]:
+    """
+    Maps each round index to the indices of the rounds whose speeches it needs.
+    Mirrors DebateState.get_context_for_next_speech, which only includes
+    speeches of speech types earlier than the current one.
+    """
+    speech_order = {speech_type: i for i, speech_type in enumerate(SpeechType)}
+    dependencies: Dict[int, List[int]] = {}
+    for i, current in enumerate(rounds):
+        dependencies[i] = [
+            j for j, earlier in enumerate(rounds)
+            if speech_order[earlier.speech_type] < speech_order[current.speech_type]
+        ]
+    return dependencies
+
+
+def make_round_schedule(rounds: List[Round]) -> List[List[Round]]:
+    """
+    Groups rounds into layers that can be delivered concurrently.
+    Every round in a layer only depends on rounds in earlier layers, and rounds
+    keep their original order within a layer.
+    """
+    dependencies = get_round_dependencies(rounds)
+    scheduled: set[int] = set()
+    layers: List[List[Round]] = []
+
+    while len(scheduled) < len(rounds):
+        layer = [
+            i for i in range(len(rounds))
+            if i not in scheduled and all(dep in scheduled for dep in dependencies[i])
+        ]
+        if not layer:
+            raise ValueError("Rounds contain a dependency cycle")
+        scheduled.update(layer)
+        layers.append([rounds[i] for i in layer])
+
+    return layers
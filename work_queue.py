@@ -0,0 +1,499 @@
+"""
+Shared work queue for running one tournament from many worker processes.
+
+The tournament plan is written to a SQLite queue once, then any number of
+workers, on one machine or several sharing the filesystem, claim debates from
+it. A claim is a lease: the claiming worker renews it with heartbeats while the
+debate runs, and a lease that expires (the worker crashed or hung) is claimed
+again by another worker, which resumes the debate from its journal. Claims run
+in BEGIN IMMEDIATE transactions, so no two workers ever hold the same debate. A
+worker checks its lease before every round and journal write, and stops a debate
+as soon as the lease has run out or another worker took it over.
+
+The queue uses SQLite's rollback journal rather than WAL, which needs shared
+memory between the processes and does not work across machines. For the same
+reason, workers open the response cache and the review queue without WAL.
+
+    python work_queue.py plan debate_test_judges
+    python work_queue.py work --concurrency 4      # in as many processes as wanted
+    python work_queue.py status
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+from pathlib import Path
+import socket
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Union
+import uuid
+
+from dotenv import load_dotenv
+
+from cost_engine import CostEngine
+from debate_journal import LeaseLostError
+from models import DebatePrompts, DebateTopic, TopicCategory
+from openrouter_client import OpenRouterClient
+from rate_limiter import ModelRateLimiter
+from response_cache import ResponseCache
+from review_queue import ReviewQueue
+from run_debate import run_debate
+from telemetry import bind_context, span, start_telemetry_from_env
+from tournament import DebateJob, is_debate_complete
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORK_QUEUE_PATH = Path(".cache") / "work_queue.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    proposition_model TEXT NOT NULL,
+    opposition_model TEXT NOT NULL,
+    topic_description TEXT NOT NULL,
+    category TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+CREATE TABLE IF NOT EXISTS worker_spend (
+    worker TEXT PRIMARY KEY,
+    spent REAL NOT NULL,
+    reserved REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class ClaimedJob(NamedTuple):
+    id: int
+    job: DebateJob
+    lease_expires: float
+
+
+def get_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class WorkQueue:
+    """
+    Debates to run, each pending, claimed (under a lease until lease_expires),
+    done or failed. A failed attempt goes back to pending until max_attempts.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_WORK_QUEUE_PATH,
+        lease_seconds: float = 300.0,
+        max_attempts: int = 3,
+    ):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode, so every write below controls its own transaction
+        self._connection = sqlite3.connect(
+            str(self.path), check_same_thread=False, timeout=60, isolation_level=None
+        )
+        self._connection.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> "WorkQueue":
+        return cls(os.environ.get("DEBATEBET_WORK_QUEUE", DEFAULT_WORK_QUEUE_PATH))
+
+    def add_jobs(self, jobs: List[DebateJob]) -> int:
+        """Adds jobs to the plan and returns how many were new; a path already queued is kept as it is."""
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            before = self._connection.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO jobs (path, proposition_model, opposition_model, topic_description, "
+                "category, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        str(job.path),
+                        job.proposition_model,
+                        job.opposition_model,
+                        job.motion.topic_description,
+                        job.motion.category.value,
+                        now,
+                    )
+                    for job in jobs
+                ],
+            )
+            after = self._connection.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            self._connection.execute("COMMIT")
+        return after - before
+
+    def claim(self, worker: str) -> Optional[ClaimedJob]:
+        """
+        Leases the oldest pending job, or one whose lease expired, to the worker. An
+        expired job that already used max_attempts is marked failed instead, so a
+        debate that keeps crashing or hanging its workers is not retried forever.
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.execute(
+                    "UPDATE jobs SET status = 'failed', lease_expires = NULL, updated_at = ?, "
+                    "error = 'Lease expired on the last attempt' "
+                    "WHERE status = 'claimed' AND lease_expires < ? AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                row = self._connection.execute(
+                    "SELECT id, path, proposition_model, opposition_model, topic_description, category, status, worker "
+                    "FROM jobs WHERE status = 'pending' OR (status = 'claimed' AND lease_expires < ?) "
+                    "ORDER BY id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._connection.execute("COMMIT")
+                    return None
+                job_id, path, proposition, opposition, topic, category, status, previous_worker = row
+                self._connection.execute(
+                    "UPDATE jobs SET status = 'claimed', worker = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (worker, now + self.lease_seconds, now, job_id),
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+        if status == "claimed":
+            logger.warning(f"Reclaimed {path} from {previous_worker}, whose lease expired")
+        return ClaimedJob(
+            id=job_id,
+            job=DebateJob(
+                proposition_model=proposition,
+                opposition_model=opposition,
+                motion=DebateTopic(topic_description=topic, category=TopicCategory(category)),
+                path=Path(path),
+            ),
+            lease_expires=now + self.lease_seconds,
+        )
+
+    def _update_claimed(self, job_id: int, worker: str, assignments: str, params: tuple) -> bool:
+        """Applies the update only while the worker still holds the lease; returns whether it did."""
+        with self._lock:
+            cursor = self._connection.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'claimed'",
+                (*params, time.time(), job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job_id: int, worker: str) -> Optional[float]:
+        """Renews the lease and returns its new expiry; None means another worker took the job."""
+        lease_expires = time.time() + self.lease_seconds
+        if self._update_claimed(job_id, worker, "lease_expires = ?", (lease_expires,)):
+            return lease_expires
+        return None
+
+    def complete(self, job_id: int, worker: str) -> bool:
+        return self._update_claimed(job_id, worker, "status = 'done', lease_expires = NULL, error = NULL", ())
+
+    def fail(self, job_id: int, worker: str, error: BaseException) -> bool:
+        return self._update_claimed(
+            job_id,
+            worker,
+            "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, lease_expires = NULL, error = ?",
+            (self.max_attempts, str(error)),
+        )
+
+    def share_spend(self, key: str, spent: float, reserved: float) -> float:
+        """
+        Publishes one worker process's spending under key and returns what every other
+        process has spent, plus what live ones have reserved for calls in flight, in dollars.
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO worker_spend (worker, spent, reserved, updated_at) VALUES (?, ?, ?, ?)",
+                    (key, spent, reserved, now),
+                )
+                others = self._connection.execute(
+                    "SELECT COALESCE(SUM(spent), 0), COALESCE(SUM(CASE WHEN updated_at > ? THEN reserved END), 0) "
+                    "FROM worker_spend WHERE worker != ?",
+                    (now - self.lease_seconds, key),
+                ).fetchone()
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return others[0] + others[1]
+
+    def get_spent(self) -> float:
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(SUM(spent), 0) FROM worker_spend").fetchone()[0]
+
+    def get_counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class Lease:
+    """A claimed job's lease as this worker last renewed it."""
+
+    def __init__(self, claimed: ClaimedJob):
+        self.claimed = claimed
+        self.expires = claimed.lease_expires
+        self.lost = False
+
+    def is_held(self) -> bool:
+        # Trust the local expiry too, so a worker cut off from the queue stops in time
+        return not self.lost and time.time() < self.expires
+
+
+class Heartbeat:
+    """
+    Background thread renewing the leases a worker holds every interval seconds.
+    With a budget, it also shares the worker's spending through the queue every
+    budget_interval seconds, so the limits cover all workers together.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        worker: str,
+        interval: float,
+        budget: Optional[CostEngine] = None,
+        budget_interval: float = 5.0,
+    ):
+        self.queue = queue
+        self.worker = worker
+        self.interval = interval
+        self.budget = budget
+        self.budget_interval = budget_interval
+        # Unique per process, so a restarted worker reusing its id keeps the old spending on the books
+        self.spend_key = f"{worker}-{uuid.uuid4().hex[:6]}"
+        self.held: Dict[int, Lease] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="work-queue-heartbeat", daemon=True)
+
+    def start(self) -> "Heartbeat":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.sync_budget()
+
+    def share_spend(self, spent: float, reserved: float) -> float:
+        """Publishes this process's spending and returns the other workers', or the last known figure on error."""
+        try:
+            return self.queue.share_spend(self.spend_key, spent, reserved)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not share spending through the work queue: {e}")
+            return self.budget.external_spent if self.budget else 0.0
+
+    def sync_budget(self) -> None:
+        if self.budget is not None:
+            self.budget.set_external_spent(self.share_spend(self.budget.spent, self.budget.reserved))
+
+    def hold(self, claimed: ClaimedJob) -> Lease:
+        lease = Lease(claimed)
+        with self._lock:
+            self.held[claimed.id] = lease
+        return lease
+
+    def release(self, claimed: ClaimedJob) -> None:
+        with self._lock:
+            self.held.pop(claimed.id, None)
+
+    def _run(self) -> None:
+        tick = min(self.interval, self.budget_interval) if self.budget else self.interval
+        next_renewal = time.time() + self.interval
+        while not self._stop.wait(tick):
+            self.sync_budget()
+            if time.time() < next_renewal:
+                continue
+            next_renewal = time.time() + self.interval
+            with self._lock:
+                held = list(self.held.items())
+            for job_id, lease in held:
+                path = lease.claimed.job.path
+                try:
+                    lease_expires = self.queue.heartbeat(job_id, self.worker)
+                except sqlite3.Error as e:
+                    logger.warning(f"Heartbeat for {path} failed: {e}")
+                    continue
+                if lease_expires is None:
+                    logger.warning(f"Lost the lease on {path} to another worker, stopping it here")
+                    lease.lost = True
+                else:
+                    lease.expires = lease_expires
+
+
+def run_worker(
+    queue: WorkQueue,
+    prompts: DebatePrompts,
+    judge_models: List[str],
+    worker: Optional[str] = None,
+    max_concurrent_debates: int = 4,
+    max_concurrent_calls: int = 16,
+    max_calls_per_model: int = 4,
+    cache: Optional[ResponseCache] = None,
+    review_queue: Optional[ReviewQueue] = None,
+    budget: Optional[CostEngine] = None,
+    poll_interval: float = 10.0,
+    **debate_options,
+) -> Dict[str, int]:
+    """
+    Claims and runs debates until the queue has nothing left to claim and no
+    other worker holds a lease that could still expire. Returns how many debates
+    this worker finished, failed and lost to another worker. With a budget, its
+    limits apply to the spending of every worker on the queue together.
+    debate_options go to run_debate.
+    """
+    worker = worker or get_worker_id()
+    client = OpenRouterClient(
+        pool_size=max_concurrent_calls,
+        limiter=ModelRateLimiter(max_concurrent_calls=max_concurrent_calls, max_calls_per_model=max_calls_per_model),
+        budget=budget,
+    )
+    heartbeat = Heartbeat(queue, worker, interval=queue.lease_seconds / 3, budget=budget).start()
+    if budget is not None:
+        budget.set_spend_sharing(heartbeat.share_spend)
+    counts = {"done": 0, "failed": 0, "lost": 0}
+    counts_lock = threading.Lock()
+
+    def next_claim() -> Optional[ClaimedJob]:
+        while True:
+            heartbeat.sync_budget()
+            if budget is not None and (budget.is_soft_limit_reached() or budget.refused_calls):
+                logger.warning(f"Budget limit reached (${budget.spent:.4f} spent), not claiming more debates")
+                return None
+            claimed = queue.claim(worker)
+            if claimed is not None or not queue.get_counts().get("claimed"):
+                return claimed
+            # Others still hold leases; wait in case one expires
+            time.sleep(poll_interval)
+
+    def run_claims() -> None:
+        while (claimed := next_claim()) is not None:
+            job = claimed.job
+            lease = heartbeat.hold(claimed)
+            try:
+                if not (job.path.exists() and is_debate_complete(job.path, judge_models)):
+                    logger.info(f"{worker} running {job.proposition_model} vs {job.opposition_model}")
+                    run_debate(
+                        proposition_model=job.proposition_model,
+                        opposition_model=job.opposition_model,
+                        motion=job.motion,
+                        prompts=prompts,
+                        path=job.path,
+                        judge_models=judge_models,
+                        client=client,
+                        cache=cache,
+                        review_queue=review_queue,
+                        resume=True,
+                        is_owner=lease.is_held,
+                        **debate_options,
+                    )
+                if queue.complete(claimed.id, worker):
+                    outcome = "done"
+                else:
+                    logger.warning(f"{worker} lost the lease on {job.path} before completing it")
+                    outcome = "lost"
+            except LeaseLostError as e:
+                logger.warning(str(e))
+                # Puts the job back if the lease only ran out locally and nobody took it yet
+                queue.fail(claimed.id, worker, e)
+                outcome = "lost"
+            except Exception as e:
+                logger.error(f"Debate {job.path} failed: {e}")
+                queue.fail(claimed.id, worker, e)
+                outcome = "failed"
+            finally:
+                heartbeat.release(claimed)
+            with counts_lock:
+                counts[outcome] += 1
+
+    try:
+        with span("worker", worker=worker), ThreadPoolExecutor(max_workers=max_concurrent_debates) as executor:
+            for future in [executor.submit(bind_context(run_claims)) for _ in range(max_concurrent_debates)]:
+                future.result()
+    finally:
+        heartbeat.stop()
+        if budget is not None:
+            budget.set_spend_sharing(None)
+        client.close()
+
+    logger.info(f"Worker {worker} finished: {counts}, queue {queue.get_counts()}")
+    return counts
+
+
+def main() -> None:
+    from debate_prompts import get_debate_prompt
+    from load_topics import get_all_topics
+    from stage_one import get_debate_pairs, get_judge_models, load_models_pricing
+    from tournament import get_debate_path
+
+    parser = argparse.ArgumentParser(description="Run a tournament from several worker processes")
+    parser.add_argument("--queue", type=Path, default=None, help="Defaults to DEBATEBET_WORK_QUEUE or .cache")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    plan_parser = subcommands.add_parser("plan", help="Queue every pair of models in api_pricing.json")
+    plan_parser.add_argument("folder", type=Path)
+    work_parser = subcommands.add_parser("work", help="Claim and run debates until none are left")
+    work_parser.add_argument("--concurrency", type=int, default=4, help="Debates this worker runs at once")
+    work_parser.add_argument("--worker-id", default=None)
+    subcommands.add_parser("status", help="Show how many debates are in each state")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    queue = WorkQueue(args.queue) if args.queue else WorkQueue.from_env()
+    if args.command == "plan":
+        args.folder.mkdir(exist_ok=True)
+        models = list(load_models_pricing("api_pricing.json").keys())
+        jobs = [
+            DebateJob(proposition, opposition, topic, get_debate_path(args.folder, proposition, opposition))
+            for proposition, opposition, topic in get_debate_pairs(models, get_all_topics())
+        ]
+        print(f"Queued {queue.add_jobs(jobs)} new debates")
+    elif args.command == "work":
+        start_telemetry_from_env()
+        run_worker(
+            queue,
+            get_debate_prompt(),
+            get_judge_models("judge_models.json"),
+            worker=args.worker_id,
+            max_concurrent_debates=args.concurrency,
+            # Workers may share these over a network filesystem, where WAL does not work
+            cache=ResponseCache.from_env(wal=False),
+            review_queue=ReviewQueue.from_env(wal=False),
+            budget=CostEngine.from_env(),
+            stream=os.environ.get("DEBATEBET_STREAM") == "1",
+            structured_judging=os.environ.get("DEBATEBET_STRUCTURED_JUDGING") == "1",
+            adaptive_judging=os.environ.get("DEBATEBET_ADAPTIVE_JUDGING") == "1",
+            stop_confidence=float(os.environ["DEBATEBET_STOP_CONFIDENCE"]) if os.environ.get("DEBATEBET_STOP_CONFIDENCE") else None,
+        )
+    elif args.command == "status":
+        print(queue.get_counts())
+        print(f"Spent ${queue.get_spent():.4f} across workers")
+    queue.close()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    main()